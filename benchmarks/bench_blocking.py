@@ -0,0 +1,82 @@
+'''
+Benchmark of the surname blocking index of get_close_matches on large qualifiers tables.
+Queries are misspelt first names and surnames, ranked like find_swimmer does (a page of candidates with at
+least CANDIDATE_MIN_SCORE similarity). Measures the time per query, how many rows are scored, and the
+recall@k of the blocked and exhaustive searches: how often the misspelt swimmer is in their best k.
+
+Usage: python benchmarks/bench_blocking.py
+'''
+
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "main"))
+
+from reusables.matching import rank_close_matches, NameIndex, CANDIDATE_MIN_SCORE, CANDIDATE_PAGE_SIZE
+from synthetic import swimmer_names, misspell
+
+SIZES = [2_000, 10_000, 50_000]
+NUM_QUERIES = 200
+
+
+def make_queries(names, rng):
+    '''
+    Misspell the first name, the surname or both of randomly picked swimmers.
+    '''
+    queries = []
+    for first, surname in rng.sample(names, NUM_QUERIES):
+        swimmer = (first, surname)
+        edit = rng.choice(["first", "surname", "both"])
+        if edit in ("first", "both"):
+            first = misspell(first, rng)
+        if edit in ("surname", "both"):
+            surname = misspell(surname, rng)
+        queries.append((first, surname, swimmer))
+    return queries
+
+
+def run(table, queries, blocking: bool):
+    name_index = NameIndex(table)
+    start = time.perf_counter()
+    results = [
+        rank_close_matches(name_index, first, surname, (), CANDIDATE_MIN_SCORE, CANDIDATE_PAGE_SIZE, blocked=blocking)
+        for first, surname, _ in queries
+    ]
+    return results, (time.perf_counter() - start) / len(queries)
+
+
+def recall(results, queries, k: int) -> float:
+    '''
+    Fraction of the queries whose swimmer is among the best k candidates.
+    '''
+    return sum(swimmer in [name[:2] for name in page[:k]] for (page, _), (_, _, swimmer) in zip(results, queries)) / len(queries)
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{NUM_QUERIES} misspelt queries per size")
+    for size in SIZES:
+        names = swimmer_names(size, seed=size)
+        table = pd.DataFrame(names, columns=["First name", "Surname"])
+        queries = make_queries(names, rng)
+
+        exhaustive, exhaustive_time = run(table, queries, blocking=False)
+        blocked, blocked_time = run(table, queries, blocking=True)
+
+        # A blocked search that fell back to scoring every row has the same total as the exhaustive one
+        fallbacks = sum(b_total == e_total for (_, b_total), (_, e_total) in zip(blocked, exhaustive)) / len(queries)
+        blocking = NameIndex(table).blocking
+        candidates = sum(len(blocking.get_candidates(surname)) for _, surname, _ in queries) / len(queries)
+
+        print(f"{size:6d} candidates  exhaustive {exhaustive_time * 1000:6.2f} ms/query  blocked {blocked_time * 1000:6.2f} ms/query"
+              f"  ~{candidates:.0f} in block  {fallbacks:.0%} fall back")
+        for k in (1, 10, CANDIDATE_PAGE_SIZE):
+            print(f"{'':6s}  recall@{k:<2d}  exhaustive {recall(exhaustive, queries, k):.3f}  blocked {recall(blocked, queries, k):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+'''
+Benchmark of get_close_matches for 100 to 10,000 candidates.
+Compares the batch scorer with the previous iterrows/fuzz.ratio loop, and checks they agree.
+
+Usage: python benchmarks/bench_close_matches.py
+'''
+
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+from fuzzywuzzy import fuzz
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "main"))
+
+from reusables.matching import get_close_matches, NameIndex
+from synthetic import swimmer_names, misspell
+
+SIZES = [100, 1_000, 10_000]
+NUM_QUERIES = 20
+NUM_MATCHED = 50 # Names already matched, excluded from the candidates
+
+
+def legacy_get_close_matches(qualifiers_table, lfirst_name, lsurname, automatic_matches, manual_matches):
+    '''
+    get_close_matches before the batch scorer.
+    '''
+    scores = []
+    for _, srow in qualifiers_table.iterrows():
+        if (srow["First name"], srow["Surname"]) in automatic_matches.values() or \
+            (srow["First name"], srow["Surname"]) in manual_matches.values():
+            continue
+        scores.append((srow["First name"], srow["Surname"], fuzz.ratio(lfirst_name + " " + lsurname, srow["First name"].lower() + " " + srow["Surname"].lower())))
+    scores.sort(key=lambda x: x[2], reverse=True)
+    return scores
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{NUM_QUERIES} queries per size")
+    for size in SIZES:
+        names = swimmer_names(size, seed=size)
+        table = pd.DataFrame(names, columns=["First name", "Surname"])
+        automatic_matches = {("x", str(i)): name for i, name in enumerate(names[:NUM_MATCHED])}
+        queries = [(first, misspell(surname, rng)) for first, surname in rng.sample(names, NUM_QUERIES)]
+
+        start = time.perf_counter()
+        legacy = [legacy_get_close_matches(table, first, surname, automatic_matches, {}) for first, surname in queries]
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        name_index = NameIndex(table)
+        batch = [get_close_matches(table, first, surname, automatic_matches, {}, name_index=name_index) for first, surname in queries]
+        batch_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        top = [get_close_matches(table, first, surname, automatic_matches, {}, score_cutoff=60, limit=10, name_index=name_index) for first, surname in queries]
+        top_time = time.perf_counter() - start
+
+        if legacy != batch:
+            raise AssertionError(f"Batch scores differ from the legacy loop for {size} candidates")
+        if any(t != [s for s in b if s[2] >= 60][:10] for t, b in zip(top, batch)):
+            raise AssertionError(f"Top-k scores differ from the full list for {size} candidates")
+
+        print(f"{size:6d} candidates  legacy {legacy_time * 1000:9.1f} ms  batch {batch_time * 1000:7.1f} ms"
+              f"  (x{legacy_time / batch_time:.0f})  top-10 >= 60 {top_time * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
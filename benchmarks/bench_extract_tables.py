@@ -0,0 +1,71 @@
+'''
+Benchmark of splitting a 20,000-row qualifiers sheet into its tables.
+Compares the masked split_tables with the previous iterrows loop, and checks they agree.
+
+Usage: python benchmarks/bench_extract_tables.py
+'''
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "main"))
+
+from leahify_qualifiers.extract_tables import split_tables, get_table_context
+from synthetic import qualifiers_sheet
+
+NUM_ROWS = 20_000
+HEADER_IDENTIFIERS = [("First name", 0)]
+
+
+def legacy_split_tables(df, header_identifiers):
+    '''
+    extract_tables before the masks, without events.
+    '''
+    def is_header(row):
+        return any(identifier.lower() in str(row.iloc[col]).lower() for identifier, col in header_identifiers)
+
+    tables, current_table, swimmer_info = [], [], {}
+    headers_found = False
+    for idx, row in df.iterrows():
+        if is_header(row):
+            current_table.insert(0, row.to_list())
+            headers_found = True
+            if idx > 0:
+                context = get_table_context(df.iloc[idx - 1][0])
+        elif headers_found and not row.isnull().all():
+            current_table.append(row.to_list())
+            swimmer_info[(row[0], row[1])] = context
+        elif row.isnull().all() and current_table:
+            tables.append(pd.DataFrame(current_table[1:], columns=current_table[0]))
+            current_table = []
+            headers_found = False
+    if current_table:
+        tables.append(pd.DataFrame(current_table[1:], columns=current_table[0]))
+    return [table for table in tables if not table.empty], [], swimmer_info
+
+
+def main():
+    df = pd.DataFrame(qualifiers_sheet(NUM_ROWS))
+
+    start = time.perf_counter()
+    legacy_tables, _, legacy_info = legacy_split_tables(df, HEADER_IDENTIFIERS)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tables, _, swimmer_info = split_tables(df, HEADER_IDENTIFIERS)
+    masked_time = time.perf_counter() - start
+
+    if legacy_info != swimmer_info or len(legacy_tables) != len(tables):
+        raise AssertionError("Masked split differs from the legacy loop")
+    for legacy_table, table in zip(legacy_tables, tables):
+        pd.testing.assert_frame_equal(legacy_table, table)
+
+    print(f"{NUM_ROWS} rows, {len(tables)} tables  legacy {legacy_time * 1000:8.1f} ms  masked {masked_time * 1000:7.1f} ms"
+          f"  (x{legacy_time / masked_time:.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+'''
+Benchmark how read_pdf page extraction scales with the number of worker processes.
+
+Usage: python benchmarks/bench_pdf_extraction.py [results.pdf]
+Without a PDF, a synthetic results file is generated.
+'''
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "main"))
+
+from reusables.parsing import read_pdf
+from synthetic import write_results_pdf
+
+SYNTHETIC_LINES = 24_000
+
+
+def main():
+    if len(sys.argv) > 1:
+        pdf_path = sys.argv[1]
+    else:
+        pdf_path = os.path.join(tempfile.mkdtemp(), "synthetic_results.pdf")
+        num_pages = write_results_pdf(pdf_path, SYNTHETIC_LINES)
+        print(f"Generated {pdf_path} ({num_pages} pages)")
+
+    baseline = None
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for workers in worker_counts:
+        start = time.perf_counter()
+        tables = read_pdf(pdf_path, isQualifiers=True, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        if baseline is None:
+            baseline, reference = elapsed, tables
+        elif len(tables) != len(reference) or not all(a.equals(b) for a, b in zip(tables, reference)):
+            raise AssertionError(f"Tables differ with {workers} workers")
+
+        print(f"workers={workers:>2}  {elapsed:7.2f}s  speedup x{baseline / elapsed:.2f}  ({len(tables)} tables)")
+
+
+if __name__ == "__main__":
+    main()
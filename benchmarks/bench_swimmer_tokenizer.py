@@ -0,0 +1,78 @@
+'''
+Microbenchmark of swimmer-line parsing on a synthetic 50k-line results file.
+Compares the single-pass scanner with the previous re.split/pop(0) tokenizer, and checks they agree.
+
+Usage: python benchmarks/bench_swimmer_tokenizer.py
+'''
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "main"))
+
+from reusables.parsing import scan_swimmer_line, extract_keyword
+from synthetic import results_lines
+
+NUM_LINES = 50_000
+REPEATS = 5
+
+
+def legacy_is_time(s):
+    return re.match(r'^\d{1,2}[:.]\d{2}([:.]\d{2})?$', s) is not None or re.match(r'^\d{1,2}[:.]\d{2}$', s) is not None
+
+
+def legacy_parse_line(line):
+    '''
+    The tokenizer read_pdf used before scan_swimmer_line (is_swimmer_line + parse_swimmer).
+    '''
+    tokens = re.split(r'(\s+|,)', line)
+    if not (len(tokens) > 1 and tokens[0] in ("Acton", "Ealing") and any(c.isdigit() for c in tokens[2])):
+        return None
+    tokens = re.split(r'(\s+|,)', line)
+    tokens.pop(0)
+    while tokens and not re.search(r'[A-Za-z]', tokens[0]):
+        tokens.pop(0)
+    comma_index = tokens.index(",")
+    last_names = [token.strip() for token in tokens[:comma_index] if re.search(r'[A-Za-z]', token)]
+    tokens = tokens[comma_index + 1:]
+    first_name = []
+    while tokens and not legacy_is_time(tokens[0]) and extract_keyword(tokens[0]) is None:
+        token = tokens.pop(0).strip()
+        if token:
+            first_name.append(token)
+    name = f"{' '.join(last_names)}, {' '.join(first_name)}"
+    achieved_time = tokens.pop(0).strip()
+    while tokens and not legacy_is_time(tokens[0]) and extract_keyword(tokens[0]) is None:
+        tokens.pop(0)
+    seed_time = tokens.pop(0).strip() if tokens else None
+    return name, seed_time, achieved_time
+
+
+def best_time(parse, lines):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        results = [parse(line) for line in lines]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main():
+    lines = results_lines(NUM_LINES)
+
+    legacy_time, legacy_results = best_time(legacy_parse_line, lines)
+    scan_time, scan_results = best_time(scan_swimmer_line, lines)
+
+    if legacy_results != scan_results:
+        raise AssertionError("Scanner results differ from the legacy tokenizer")
+
+    swimmers = sum(result is not None for result in scan_results)
+    print(f"{len(lines)} lines, {swimmers} swimmer lines (best of {REPEATS})")
+    print(f"legacy tokenizer  {legacy_time * 1000:8.1f} ms")
+    print(f"scanner           {scan_time * 1000:8.1f} ms  speedup x{legacy_time / scan_time:.2f}")
+
+
+if __name__ == "__main__":
+    main()
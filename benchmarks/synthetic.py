@@ -0,0 +1,139 @@
+'''
+Synthetic gala results used by the benchmarks.
+'''
+
+import random
+
+CLUBS = ["Acton", "Ealing", "Northolt", "St Helens"]
+SURNAMES = ["Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Johnson", "Davies", "Robinson", "Wright", "O'Neil", "Van Der Berg"]
+FIRST_NAMES = ["Jane", "John", "Sam", "Samuel", "Ann", "Olivia", "Amelia", "Isla", "Noah", "Oliver", "Leo", "Sofia"]
+STROKES = ["Freestyle", "Backstroke", "Breaststroke", "Butterfly"]
+
+LINES_PER_PAGE = 60
+
+
+def random_time(rng: random.Random) -> str:
+    seconds = rng.uniform(15, 150)
+    minutes, seconds = divmod(seconds, 60)
+    if minutes:
+        return f"{int(minutes)}:{seconds:05.2f}"
+    return f"{seconds:.2f}"
+
+
+def results_lines(num_lines: int, seed: int = 0) -> list[str]:
+    '''
+    Return roughly num_lines lines in the layout pypdf extracts from a heat results PDF.
+    '''
+    rng = random.Random(seed)
+    lines = []
+    event = 0
+    while len(lines) < num_lines:
+        event += 1
+        lines.append(f"Event  {event}   Girls 9-10 {rng.choice(['25', '50', '100'])} SC Meter {rng.choice(STROKES)}")
+        lines.append("Name Age Team Seed Time Finals Time")
+        for _ in range(rng.randint(8, 40)):
+            club = rng.choice(CLUBS)
+            name = f"{rng.choice(SURNAMES)}, {rng.choice(FIRST_NAMES)}"
+            seed_time = rng.choice([random_time(rng), "NT"])
+            time = rng.choice([random_time(rng)] * 8 + ["NS", "DQ"])
+            lines.append(f"{club} {rng.randint(100, 999)} {name} {time}  {seed_time}")
+    return lines[:num_lines]
+
+
+SYLLABLES = ["ab", "ber", "cha", "dal", "el", "fin", "gar", "han", "ish", "jo", "kel", "lan", "mor", "nov", "ol", "pat", "quin", "ros", "sen", "tay", "ur", "vic", "wal", "yam", "zel"]
+
+
+def swimmer_names(num_names: int, seed: int = 0) -> list[tuple[str, str]]:
+    '''
+    Return num_names (first name, surname) pairs in lowercase, with surnames made up from syllables
+    so that large lists are not just repeats of a few names.
+    '''
+    rng = random.Random(seed)
+    names = []
+    for _ in range(num_names):
+        surname = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        names.append((rng.choice(FIRST_NAMES).lower(), surname))
+    return names
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    '''
+    Return the name with one letter dropped, doubled or swapped with the next one.
+    '''
+    if len(name) < 3:
+        return name
+    i = rng.randrange(len(name) - 1)
+    edit = rng.choice(["drop", "double", "swap"])
+    if edit == "drop":
+        return name[:i] + name[i + 1:]
+    if edit == "double":
+        return name[:i] + name[i] + name[i:]
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_results_pdf(path: str, num_lines: int, seed: int = 0) -> int:
+    '''
+    Write a plain-text results PDF with LINES_PER_PAGE lines per page.
+    Returns the number of pages.
+    '''
+    lines = results_lines(num_lines, seed)
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+
+    # Objects: 1 catalog, 2 pages, 3 font, then a (page, content) pair per page
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for page_idx, page_lines in enumerate(pages):
+        page_num = 4 + 2 * page_idx
+        content_num = page_num + 1
+        kids.append(f"{page_num} 0 R")
+        text = "BT /F1 10 Tf 12 TL 40 800 Td\n" + "".join(f"({_escape(line)}) '\n" for line in page_lines) + "ET"
+        stream = text.encode("latin-1")
+        objects[page_num] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_num} 0 R >>"
+        ).encode()
+        objects[content_num] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for num in sorted(objects):
+        offsets[num] = len(out)
+        out += b"%d 0 obj\n" % num + objects[num] + b"\nendobj\n"
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for num in sorted(objects):
+        out += b"%010d 00000 n \n" % offsets[num]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+
+    with open(path, "wb") as f:
+        f.write(bytes(out))
+    return len(pages)
+
+
+AGE_GROUPS = ["8 & Under", "9-10", "11/12", "13-14", "15 & Over"]
+
+
+def qualifiers_sheet(num_rows: int, seed: int = 0) -> list[list]:
+    '''
+    Return roughly num_rows rows of a group sheet of Sammy's qualifiers, as read without headers:
+    a "<group> <gender> <ages>" label, a "First name" header, the swimmers and an empty row per table.
+    '''
+    rng = random.Random(seed)
+    width = 3 + len(STROKES)
+    rows = []
+    while len(rows) < num_rows:
+        rows.append([f"Seals {rng.choice(['Girls', 'Boys'])} {rng.choice(AGE_GROUPS)}"] + [None] * (width - 1))
+        rows.append(["First name", "Surname", "ASA"] + [f"50m {stroke}" for stroke in STROKES])
+        for first, surname in swimmer_names(rng.randint(10, 60), seed=rng.randrange(1 << 30)):
+            times = [rng.choice([random_time(rng), None, "DNS"]) for _ in STROKES]
+            rows.append([first.capitalize(), surname.capitalize(), rng.randint(100000, 999999)] + times)
+        rows.append([None] * width)
+    return rows[:num_rows]
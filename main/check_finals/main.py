@@ -1,10 +1,10 @@
 import pandas as pd
-from reusables import match_swimmer, parse_name, normalise_time, read_pdf, is_disqualification
+from reusables import match_swimmer, NameIndex, IdentityStore, parse_name, normalise_time, get_event_number, index_results, PDF_WORKERS, PdfTableCache, CLUBS, is_disqualification
 from discrepancies import display_discrepancies, TimeDiscrepancy, SwimmersNotFound
 
 def get_finals_tables(finals_file):
     """
-    Read the finals excel file and return the tables.
+    Read the finals excel file (a path, or a workbook already opened with pd.ExcelFile) and return the tables.
     """
     # Load the Excel file
     df = pd.read_excel(finals_file, sheet_name="Finals", header=None)
@@ -21,13 +21,16 @@ def get_finals_tables(finals_file):
         start_idx = event_starts[i]
         end_idx = event_starts[i + 1]
         block = df.iloc[start_idx:end_idx].reset_index(drop=True)
+        event_cell = next(cell for cell in block.iloc[0].astype(str) if cell.startswith("Event"))
         header_row = block.iloc[1] # Skip the first row which is the event name
         data = block[2:]
         data.columns = header_row
         data = data.dropna(how='all')  # Remove fully empty rows
         # Remove first row
         data = data.reset_index(drop=True)
-        tables.append(data.reset_index(drop=True))
+        # Keep the event number, used to find the event in the PDF
+        data.attrs["event_number"] = get_event_number(event_cell)
+        tables.append(data)
     return tables
 
 def get_event_name_from_finals(finals_table):
@@ -38,23 +41,55 @@ def get_event_name_from_finals(finals_table):
     # We get the index 7 column because that header is just the event name in the finals excel
     return str(finals_table.columns[7])
 
+def get_event_number_from_finals(finals_table):
+    """
+    Get the event number of a finals table, from the "Event N ..." row above it.
+    """
+    return finals_table.attrs["event_number"]
+
 def check_finals(
     finals_file,
     pdf_file,
     progress_callback,
     confirm_callback,
     error_callback,
+    events: set[int] | None = None,
+    clubs=CLUBS,
+    identity_store: IdentityStore | None = None,
+    cache: PdfTableCache | None = None,
 ):
     """
-    Check the finals results against the full results PDF.
+    Check the finals results against the full results PDF (or its Lenex/SDIF export).
+    If `events` is given, only those event numbers are checked. A PDF that is not cached yet is still read
+    in full, so that the next run gets all of its tables from the cache (see iter_pdf_tables).
+    Only the swimmers of `clubs` are read from the PDF.
+    The identity store and PDF cache default to the ones in the app's data and cache directories;
+    a store that is passed in is left open for the caller.
     """
+    # Manual matches confirmed in previous runs, of any tool, are remembered
+    owns_identity_store = identity_store is None
+    if owns_identity_store:
+        identity_store = IdentityStore()
+    if cache is None:
+        cache = PdfTableCache()
     try:
         # Read the finals results from the Excel file
         # We have 45 tables, each with shape (7 rows, 9 columns)
         finals_tables = get_finals_tables(finals_file)
+
+        # Only check the selected events, if any
+        if events is not None:
+            finals_tables = [finals_table for finals_table in finals_tables if get_event_number_from_finals(finals_table) in events]
     
-        # Read pdf
-        pdf_tables = read_pdf(pdf_file, isQualifiers=False)
+        # Index the pdf finals tables by event number. The pdf is read lazily as events are looked up.
+        pdf_index = index_results(
+            pdf_file,
+            isQualifiers=False,
+            events={get_event_number_from_finals(finals_table) for finals_table in finals_tables},
+            workers=PDF_WORKERS,
+            cache=cache,
+            clubs=clubs,
+        )
         
         # Compare finals table and pdf data and alert user of any differences
         
@@ -65,6 +100,7 @@ def check_finals(
         # Define automatic and manual matches
         manual_matches = {}
         automatic_matches = {}
+        known_matches = identity_store.get_matches()
         
         for tableIdx in range(len(finals_tables)):
             # Get event name from finals table
@@ -75,9 +111,13 @@ def check_finals(
             
             # Remove rows where both First name and Surname are NaN
             finals_df = finals_df.dropna(subset=["First name", "Surname"])
+            finals_index = NameIndex(finals_df)
 
             # Get pdf table
-            pdf_table = pdf_tables[tableIdx]
+            pdf_table = pdf_index.get(get_event_number_from_finals(finals_tables[tableIdx]))
+            if pdf_table is None:
+                progress_callback(f"No results found in PDF for: {event_name}", "yellow")
+                continue
             
             # Swimmers in finals table are in Sammy's format.
             # So we need to manually match those that don't match automatically
@@ -100,6 +140,8 @@ def check_finals(
                     manual_matches,
                     progress_callback=progress_callback,
                     confirm_callback=confirm_callback,
+                    name_index=finals_index,
+                    known_matches=known_matches,
                 )
 
                 if len(swimmer) > 0:
@@ -146,9 +188,19 @@ def check_finals(
                     # We don't have the swimmer's name in Sammy's format so we use the pdf name.
                     discrepancies.append(SwimmersNotFound([pdf_name]))
 
+            # Save this event's manual matches for the next run
+            identity_store.add_matches(manual_matches)
+
+        # Finish reading the PDF so all of its tables are cached for the next run, whatever events it checks.
+        # This reads nothing more when the tables came from the cache.
+        pdf_index.read_all()
+
         progress_callback("✅ FINALS CHECK COMPLETED!", "green")
 
         display_discrepancies(discrepancies, progress_callback)
     
     except Exception as e:
         error_callback(f"❌ ERROR: {str(e)}", "red")
+    finally:
+        if owns_identity_store:
+            identity_store.close()
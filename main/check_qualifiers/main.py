@@ -1,6 +1,6 @@
 import pandas as pd
 from leahify_qualifiers import get_leah_tables, TIME_COLUMN_INDEX
-from reusables import match_swimmer, get_event_name, parse_name, normalise_time, read_pdf, rename_final_column, is_disqualification
+from reusables import add_name_keys, get_key_rows, normalise_name, match_swimmer, NameIndex, IdentityStore, get_event_name, get_event_number, parse_name, normalise_time, index_results, PDF_WORKERS, PdfTableCache, CLUBS, rename_final_column, is_disqualification
 from discrepancies import display_discrepancies, TimeDiscrepancy, SwimmersNotFound
 
 
@@ -41,10 +41,25 @@ def check_qualifiers(
     progress_callback,
     confirm_callback,
     error_callback,
+    events: set[int] | None = None,
+    clubs=CLUBS,
+    identity_store: IdentityStore | None = None,
+    cache: PdfTableCache | None = None,
 ):
     """
-    Check the qualifiers excel sheet against the heat results PDF.
+    Check the qualifiers excel sheet against the heat results PDF (or its Lenex/SDIF export).
+    If `events` is given, only those event numbers are checked. A PDF that is not cached yet is still read
+    in full, so that the next run gets all of its tables from the cache (see iter_pdf_tables).
+    Only the swimmers of `clubs` are read from the PDF.
+    The identity store and PDF cache default to the ones in the app's data and cache directories;
+    a store that is passed in is left open for the caller.
     """
+    # Manual matches confirmed in previous runs, of any tool, are remembered
+    owns_identity_store = identity_store is None
+    if owns_identity_store:
+        identity_store = IdentityStore()
+    if cache is None:
+        cache = PdfTableCache()
     try:
         # Extract the tables using the get_leah_tables function
         # EXTRA rows will just be added at the end of each event table, so we can re-use the same function
@@ -56,8 +71,24 @@ def check_qualifiers(
         # Rename the "Finals" column to the time column name in Leah's tables
         rename_final_column(leah_tables, time_column_name)
 
-        # Read the PDF file
-        pdf_tables = read_pdf(pdf_path, isQualifiers=True)
+        # Event number of each of Leah's tables, used to look up the matching PDF table
+        event_numbers = [get_event_number(leah_table.iloc[0]['Lane']) for leah_table in leah_tables]
+
+        # Only check the selected events, if any
+        if events is not None:
+            table_indices = [tableIdx for tableIdx in range(len(leah_tables)) if event_numbers[tableIdx] in events]
+        else:
+            table_indices = list(range(len(leah_tables)))
+
+        # Index the PDF tables by event number. The PDF is read lazily as events are looked up.
+        pdf_index = index_results(
+            pdf_path,
+            isQualifiers=True,
+            events={event_numbers[tableIdx] for tableIdx in table_indices},
+            workers=PDF_WORKERS,
+            cache=cache,
+            clubs=clubs,
+        )
 
         # Compare output table and pdf data and alert user of any differences
 
@@ -82,13 +113,22 @@ def check_qualifiers(
         # Define automatic and manual matches
         manual_matches = {}
         automatic_matches = {}
+        known_matches = identity_store.get_matches()
 
-        for tableIdx in range(len(leah_tables)):
+        for tableIdx in table_indices:
             # Get event name
             event_name = get_event_name(leah_tables[tableIdx].iloc[0]['Lane'])
 
             # Split table into normal and extra rows
             leah_normal_df, leah_extra_df = split_extra_rows(leah_tables[tableIdx])
+
+            # Match only with the corresponding event table
+            pdf_table = pdf_index.get(event_numbers[tableIdx])
+            if pdf_table is None:
+                pdf_table = pd.DataFrame(columns=["Name", "Seed Time", "Time"])
+
+            # Normalised name keys of the PDF swimmers, computed once for the table
+            pdf_rows = get_key_rows(add_name_keys(pdf_table))
             
             # For normal rows, match swimmer names and times directly
             for _, row in leah_normal_df.iterrows():
@@ -106,13 +146,11 @@ def check_qualifiers(
                 if not has_recorded_time(time):
                     continue
 
-                # Match only with the corresponding event table
-                pdf_table = pdf_tables[tableIdx]
-
-                clean_pdf_names = [clean_name(n) for n in pdf_table['Name'].values]
+                # Rows of the PDF with the same name, not matched yet
+                matched_labels = pdf_rows.pop(normalise_name(name), None)
 
-                if name in clean_pdf_names:
-                    matched_pdf_row = pdf_table[pdf_table['Name'].apply(clean_name) == name]
+                if matched_labels is not None:
+                    matched_pdf_row = pdf_table.loc[matched_labels]
                     if not matched_pdf_row.empty:
                         # If we have NS in PDF and DNS in Leah, we consider them equal
                         if matched_pdf_row['Time'].values[0] == "NS" and row[time_column_name] == "DNS":
@@ -161,6 +199,7 @@ def check_qualifiers(
             # Sammy's format, and the pdf tables are in Leah's format.
             # So we use the match_swimmer function but "flip" the arguments.
             # For each row left in the pdf table (extra rows), we try to match it with a swimmer in Leah's extra rows.
+            extra_index = NameIndex(leah_extra_df, sfirst_name_col="Lane", ssurname_col="Name")
             for _, pdf_row in pdf_table.iterrows():
                 # Match name and time
                 pdf_name = pdf_row['Name']
@@ -182,6 +221,8 @@ def check_qualifiers(
                     confirm_callback=confirm_callback,
                     sfirst_name_col="Lane",
                     ssurname_col="Name",
+                    name_index=extra_index,
+                    known_matches=known_matches,
                 )
 
                 if len(swimmer) > 0:
@@ -218,9 +259,19 @@ def check_qualifiers(
             if not pdf_table.empty:
                 discrepancies.append(SwimmersNotFound(pdf_table['Name'].apply(clean_name).tolist(), pdf=False))
 
+            # Save this event's manual matches for the next run
+            identity_store.add_matches(manual_matches)
+
+        # Finish reading the PDF so all of its tables are cached for the next run, whatever events it checks.
+        # This reads nothing more when the tables came from the cache.
+        pdf_index.read_all()
+
         progress_callback("✅ QUALIFIER CHECK COMPLETED!", "green")
 
         display_discrepancies(discrepancies, progress_callback)
     
     except Exception as e:
         error_callback(f"❌ ERROR: {str(e)}", "red")
+    finally:
+        if owns_identity_store:
+            identity_store.close()
@@ -15,6 +15,8 @@ from leahify_qualifiers import leahify_qualifiers
 from generate_rankings import generate_rankings
 from check_qualifiers import check_qualifiers
 from check_finals import check_finals
+from ingest_results import ingest_results
+from reusables import parse_event_selection, RESULTS_FILETYPES
 from amindefy_timesheets import amindefy_timesheets
 from check_timesheets import check_timesheets
 from constants import MONTHS, RATE_LEVELS
@@ -50,6 +52,8 @@ class SwimmingResultsApp:
             'heat_results_pdf': None,
             'finals_excel': None,
             'full_results_pdf': None,
+            'results_folder': None,
+            'results_store_file': None,
             'timesheets_folder': None,
             'amindefied_excel': None,
             'sign_in_sheet': None,
@@ -212,6 +216,9 @@ class SwimmingResultsApp:
         # Tab 4: Check Finals
         self.create_check_finals_tab()
 
+        # Tab 5: Ingest Results
+        self.create_ingest_results_tab()
+
         # Output panel on right side
         self.create_house_champs_output_panel(right_frame)
 
@@ -351,6 +358,97 @@ class SwimmingResultsApp:
         output_widget.see(tk.END)
         output_widget.config(state='disabled')
     
+    def create_candidate_paging(self, parent, tree, candidate_by_id):
+        """
+        Create the search and "Load more" controls of a candidate tree.
+        Returns the controls' frame, and a function showing the candidates of a confirmation request in the tree:
+        only the first page at first, then more pages or search results on demand (see reusables.get_candidate_data).
+        """
+        controls = tk.Frame(parent)
+        search_var = tk.StringVar()
+        count_var = tk.StringVar()
+        # The request shown, how many of its pages of candidates are shown, and whether search results are shown instead
+        state = {"data": {}, "shown": 0, "searching": False}
+
+        def fill(candidates, append=False):
+            if not append:
+                tree.delete(*tree.get_children())
+                candidate_by_id.clear()
+            for candidate in candidates:
+                row_id = tree.insert("", tk.END, values=(candidate["sammy_name"], f"{candidate['similarity']}%"))
+                candidate_by_id[row_id] = candidate
+            first_rows = tree.get_children()
+            if first_rows and not append:
+                tree.selection_set(first_rows[0])
+                tree.focus(first_rows[0])
+
+        def update_count():
+            data = state["data"]
+            total = data.get("total_candidates", state["shown"])
+            if state["searching"]:
+                count_var.set(f"{len(candidate_by_id)} swimmers found")
+            else:
+                count_var.set(f"Showing {state['shown']} of {total} candidates")
+            can_load_more = not state["searching"] and "more_candidates" in data and state["shown"] < total
+            load_more_btn.config(state=tk.NORMAL if can_load_more else tk.DISABLED)
+
+        def show(data):
+            candidates = list(data.get("candidates", []))
+            state.update(data=data, shown=len(candidates), searching=False)
+            search_var.set("")
+            fill(candidates)
+            update_count()
+
+        def load_more():
+            more_candidates = state["data"].get("more_candidates")
+            if more_candidates is None or state["searching"]:
+                return
+            candidates = more_candidates(state["shown"])
+            state["shown"] += len(candidates)
+            fill(candidates, append=True)
+            update_count()
+
+        def search(_event=None):
+            search_candidates = state["data"].get("search_candidates")
+            if search_candidates is None:
+                return
+            if not search_var.get().strip():
+                show(state["data"])
+                return
+            state["searching"] = True
+            fill(search_candidates(search_var.get()))
+            update_count()
+
+        tk.Label(controls, text="Search:", font=("Segoe UI", 10)).pack(side=tk.LEFT)
+        search_entry = tk.Entry(controls, textvariable=search_var, font=("Segoe UI", 10), width=30)
+        search_entry.pack(side=tk.LEFT, padx=(5, 5))
+        search_entry.bind("<Return>", search)
+
+        for text, command in [("Search", search), ("Clear", lambda: show(state["data"]))]:
+            Button(
+                controls,
+                text=text,
+                command=command,
+                font=("Segoe UI", 10),
+                bg=NOTEBOOK_TAB_BACKGROUND,
+                padx=10,
+                pady=4,
+            ).pack(side=tk.LEFT, padx=(0, 5))
+
+        load_more_btn = Button(
+            controls,
+            text="Load More",
+            command=load_more,
+            font=("Segoe UI", 10),
+            bg=NOTEBOOK_TAB_BACKGROUND,
+            padx=10,
+            pady=4,
+        )
+        load_more_btn.pack(side=tk.RIGHT)
+        tk.Label(controls, textvariable=count_var, fg=LABEL_FOREGROUND, font=("Segoe UI", 10)).pack(side=tk.RIGHT, padx=(0, 10))
+
+        return controls, show
+
     def show_confirmation_dialog(self, data: dict):
         """
         Show confirmation dialog and return user's choice
@@ -358,6 +456,10 @@ class SwimmingResultsApp:
         Args:
 
         """
+        # All of the unmatched swimmers reviewed at once
+        if data.get("mode") == "manual_match_batch":
+            return self.show_batch_review_dialog(data)
+
         # This will be called from a background thread, so we need to use a queue
         import queue
         result_queue = queue.Queue()
@@ -389,8 +491,6 @@ class SwimmingResultsApp:
             
             dialog.geometry(f"{dialog_width}x{dialog_height}+{x}+{y}")
 
-            candidates = list(data.get("candidates", []))
-
             outer = tk.Frame(dialog, padx=16, pady=14)
             outer.pack(expand=True, fill='both')
 
@@ -403,7 +503,7 @@ class SwimmingResultsApp:
 
             subtitle = tk.Label(
                 outer,
-                text="Select a swimmer from the full candidate list. Accept moves to the next swimmer. Undo clears the current selection, or Ignore to skip this swimmer.",
+                text="Select a swimmer from the closest candidates, or load more or search for them. Accept moves to the next swimmer. Undo clears the current selection, or Ignore to skip this swimmer.",
                 font=("Segoe UI", 10),
                 fg=LABEL_FOREGROUND,
                 wraplength=700,
@@ -427,13 +527,9 @@ class SwimmingResultsApp:
             scrollbar.pack(side=tk.RIGHT, fill='y')
 
             row_by_id = {}
-            for candidate in candidates:
-                row_id = tree.insert(
-                    "",
-                    tk.END,
-                    values=(candidate["sammy_name"], f"{candidate['similarity']}%")
-                )
-                row_by_id[row_id] = candidate
+            paging_frame, show_candidates = self.create_candidate_paging(outer, tree, row_by_id)
+            paging_frame.pack(fill=tk.X, pady=(8, 0))
+            show_candidates(data)
 
             status_var = tk.StringVar(value="Select a candidate and press Accept.")
             status_label = tk.Label(outer, textvariable=status_var, fg=LABEL_FOREGROUND, font=("Segoe UI", 10))
@@ -519,11 +615,6 @@ class SwimmingResultsApp:
             )
             cancel_btn.pack(side=tk.LEFT, padx=5)
 
-            first_rows = tree.get_children()
-            if first_rows:
-                tree.selection_set(first_rows[0])
-                tree.focus(first_rows[0])
-
             dialog.deiconify()
             dialog.lift()
             dialog.focus_force()
@@ -540,6 +631,220 @@ class SwimmingResultsApp:
             except queue.Empty:
                 continue
     
+    def show_batch_review_dialog(self, data: dict):
+        """
+        Show one dialog to review every unmatched swimmer, and return the decisions for all of them.
+        Called from a background thread, like show_confirmation_dialog.
+        """
+        import queue
+        result_queue = queue.Queue()
+
+        swimmers = list(data.get("swimmers", []))
+        # Decision for each swimmer, by position: None until accepted or ignored
+        decisions = [None] * len(swimmers)
+
+        def show_dialog():
+            dialog = tk.Toplevel(self.root)
+            dialog.title("Review Swimmer Matches")
+            dialog.resizable(False, False)
+            dialog.transient(self.root)
+            dialog.grab_set()
+
+            dialog_width = 1100
+            dialog_height = 680
+
+            # Center the dialog
+            self.root.update_idletasks()
+            x = self.root.winfo_x() + (self.root.winfo_width() - dialog_width) // 2
+            y = self.root.winfo_y() + (self.root.winfo_height() - dialog_height) // 2
+            dialog.geometry(f"{dialog_width}x{dialog_height}+{x}+{y}")
+
+            outer = tk.Frame(dialog, padx=16, pady=14)
+            outer.pack(expand=True, fill='both')
+
+            header = tk.Label(
+                outer,
+                text=f"Review Unmatched Swimmers ({len(swimmers)})",
+                font=("Segoe UI", 14, "bold"),
+            )
+            header.pack(anchor=tk.W, pady=(0, 8))
+
+            subtitle = tk.Label(
+                outer,
+                text="Pick a swimmer on the left, then a candidate on the right. Accept or Ignore moves to the next swimmer. "
+                     "Accept All Best accepts the best candidate of every swimmer left. Swimmers left undecided are ignored.",
+                font=("Segoe UI", 10),
+                fg=LABEL_FOREGROUND,
+                wraplength=1000,
+                justify=tk.LEFT,
+            )
+            subtitle.pack(anchor=tk.W, pady=(0, 10))
+
+            tables_frame = tk.Frame(outer)
+            tables_frame.pack(expand=True, fill='both')
+
+            swimmer_tree = ttk.Treeview(tables_frame, columns=("leah_name", "events", "decision"), show="headings", selectmode="browse")
+            swimmer_tree.heading("leah_name", text="Leah Swimmer")
+            swimmer_tree.heading("events", text="Events")
+            swimmer_tree.heading("decision", text="Decision")
+            swimmer_tree.column("leah_name", width=180, anchor=tk.W)
+            swimmer_tree.column("events", width=220, anchor=tk.W)
+            swimmer_tree.column("decision", width=180, anchor=tk.W)
+            swimmer_tree.pack(side=tk.LEFT, expand=True, fill='both', padx=(0, 10))
+
+            candidate_tree = ttk.Treeview(tables_frame, columns=("sammy_name", "similarity"), show="headings", selectmode="browse")
+            candidate_tree.heading("sammy_name", text="Available Sammy Swimmers")
+            candidate_tree.heading("similarity", text="Similarity")
+            candidate_tree.column("sammy_name", width=280, anchor=tk.W)
+            candidate_tree.column("similarity", width=100, anchor=tk.CENTER)
+
+            scrollbar = ttk.Scrollbar(tables_frame, orient="vertical", command=candidate_tree.yview)
+            candidate_tree.configure(yscrollcommand=scrollbar.set)
+            candidate_tree.pack(side=tk.LEFT, expand=True, fill='both')
+            scrollbar.pack(side=tk.RIGHT, fill='y')
+
+            swimmer_ids = [
+                swimmer_tree.insert("", tk.END, values=(swimmer["leah_name"], ", ".join(swimmer.get("events", [])), ""))
+                for swimmer in swimmers
+            ]
+            candidate_by_id = {}
+            paging_frame, show_swimmer_candidates = self.create_candidate_paging(outer, candidate_tree, candidate_by_id)
+            paging_frame.pack(fill=tk.X, pady=(8, 0))
+
+            status_var = tk.StringVar(value="Select a candidate and press Accept.")
+            status_label = tk.Label(outer, textvariable=status_var, fg=LABEL_FOREGROUND, font=("Segoe UI", 10))
+            status_label.pack(anchor=tk.W, pady=(8, 10))
+
+            def current_swimmer():
+                selected = swimmer_tree.selection()
+                return swimmer_ids.index(selected[0]) if selected else None
+
+            def show_candidates(_event=None):
+                index = current_swimmer()
+                show_swimmer_candidates(swimmers[index] if index is not None else {})
+
+            def set_decision(index, decision):
+                decisions[index] = decision
+                if decision is None:
+                    label = ""
+                elif decision["action"] == "accept":
+                    label = f"{decision['sfirst_name'].capitalize()} {decision['ssurname'].capitalize()}"
+                else:
+                    label = "Ignored"
+                swimmer_tree.set(swimmer_ids[index], "decision", label)
+
+            def next_swimmer(index):
+                # Move to the next undecided swimmer, if any
+                for next_index in list(range(index + 1, len(swimmers))) + list(range(index)):
+                    if decisions[next_index] is None:
+                        swimmer_tree.selection_set(swimmer_ids[next_index])
+                        swimmer_tree.see(swimmer_ids[next_index])
+                        return
+                status_var.set("Every swimmer has been reviewed. Press Finish.")
+
+            def accepted_by(candidate, index):
+                # The Leah swimmer this candidate was already accepted for, if not this one
+                for other, decision in enumerate(decisions):
+                    if other != index and decision is not None and decision["action"] == "accept" \
+                            and (decision["sfirst_name"], decision["ssurname"]) == (candidate["sfirst_name"], candidate["ssurname"]):
+                        return swimmers[other]["leah_name"]
+                return None
+
+            def accept_selected():
+                index = current_swimmer()
+                selected = candidate_tree.selection()
+                if index is None or not selected:
+                    status_var.set("Select a candidate before accepting.")
+                    return
+                candidate = candidate_by_id[selected[0]]
+                other = accepted_by(candidate, index)
+                if other is not None:
+                    status_var.set(f"{candidate['sammy_name']} is already matched to {other}.")
+                    return
+                set_decision(index, {"action": "accept", "sfirst_name": candidate["sfirst_name"], "ssurname": candidate["ssurname"]})
+                next_swimmer(index)
+
+            def accept_all_best():
+                num_accepted = 0
+                for index, swimmer in enumerate(swimmers):
+                    if decisions[index] is not None:
+                        continue
+                    for candidate in swimmer.get("candidates", []):
+                        if accepted_by(candidate, index) is None:
+                            set_decision(index, {"action": "accept", "sfirst_name": candidate["sfirst_name"], "ssurname": candidate["ssurname"]})
+                            num_accepted += 1
+                            break
+                status_var.set(f"Accepted the best candidate of {num_accepted} swimmers. Check them, then press Finish.")
+
+            def ignore():
+                index = current_swimmer()
+                if index is None:
+                    return
+                set_decision(index, {"action": "ignore"})
+                next_swimmer(index)
+
+            def undo():
+                index = current_swimmer()
+                if index is None or decisions[index] is None:
+                    status_var.set("Nothing to undo.")
+                    return
+                set_decision(index, None)
+                status_var.set("Decision cleared.")
+
+            def finish():
+                result_queue.put({
+                    "action": "accept",
+                    "decisions": [decision or {"action": "ignore"} for decision in decisions],
+                })
+                dialog.destroy()
+
+            def cancel():
+                result_queue.put({"action": "exit"})
+                dialog.destroy()
+
+            swimmer_tree.bind("<<TreeviewSelect>>", show_candidates)
+            candidate_tree.bind("<Double-1>", lambda _event: accept_selected())
+            dialog.protocol("WM_DELETE_WINDOW", cancel)
+
+            button_frame = tk.Frame(outer)
+            button_frame.pack(anchor=tk.E)
+
+            for text, command, colour in [
+                ("Accept", accept_selected, GREEN),
+                ("Accept All Best", accept_all_best, GREEN),
+                ("Undo", undo, YELLOW),
+                ("Ignore", ignore, YELLOW),
+                ("Finish", finish, GREEN),
+                ("Cancel", cancel, NOTEBOOK_TAB_BACKGROUND),
+            ]:
+                Button(
+                    button_frame,
+                    text=text,
+                    command=command,
+                    font=("Segoe UI", 10, "bold"),
+                    bg=colour,
+                    padx=14,
+                    pady=8,
+                ).pack(side=tk.LEFT, padx=5)
+
+            if swimmer_ids:
+                swimmer_tree.selection_set(swimmer_ids[0])
+                swimmer_tree.focus(swimmer_ids[0])
+
+            dialog.deiconify()
+            dialog.lift()
+            dialog.focus_force()
+
+        # Show dialog on main thread
+        self.root.after(0, show_dialog)
+
+        # Wait for result
+        while True:
+            try:
+                return result_queue.get(timeout=0.1) # check for result every 100ms
+            except queue.Empty:
+                continue
+
     def create_leahify_tab(self):
         frame = tk.Frame(self.house_champs_notebook, bg=NOTEBOOK_TAB_BACKGROUND)
         self.house_champs_notebook.add(frame, text="1. Leahify Qualifiers")
@@ -561,6 +866,29 @@ class SwimmingResultsApp:
 
         # Output file selection
         self.create_output_file_input(frame, "Output EXCEL", 'leahify_output_file', [('Excel files', '*.xlsx')], 'output.xlsx')
+
+        # Review the swimmers that can't be matched automatically in one go, at the end, instead of one by one
+        self.batch_review_var = tk.BooleanVar(value=False)
+        batch_review_check = tk.Checkbutton(
+            frame,
+            text="Review unmatched swimmers all at once",
+            variable=self.batch_review_var,
+            bg=NOTEBOOK_TAB_BACKGROUND,
+            activeforeground=LABEL_FOREGROUND,
+        )
+        batch_review_check.pack(pady=(10, 0))
+
+        # Match close names automatically when the optimal assignment is confident. Off by default, since
+        # those matches are not confirmed by anyone.
+        self.assignment_var = tk.BooleanVar(value=False)
+        assignment_check = tk.Checkbutton(
+            frame,
+            text="Match close names automatically",
+            variable=self.assignment_var,
+            bg=NOTEBOOK_TAB_BACKGROUND,
+            activeforeground=LABEL_FOREGROUND,
+        )
+        assignment_check.pack()
         
         # Process button
         process_btn = Button(
@@ -589,7 +917,8 @@ class SwimmingResultsApp:
         
         # File input areas
         self.create_file_input(frame, "Generated Output EXCEL", 'output_excel', [('Excel files', '*.xls *.xlsx')])
-        self.create_file_input(frame, "Heat Results PDF", 'heat_results_pdf', [('PDF files', '*.pdf')])
+        self.create_file_input(frame, "Heat Results (PDF, Lenex or SDIF)", 'heat_results_pdf', RESULTS_FILETYPES)
+        self.create_text_input(frame, "Events to check (optional, e.g. 12-15, 20)", 'check_qualifiers_events')
         
         # Process button
         process_btn = Button(
@@ -618,7 +947,8 @@ class SwimmingResultsApp:
         
         # File input areas
         self.create_file_input(frame, "Finals EXCEL", 'finals_excel', [('Excel files', '*.xlsx')])
-        self.create_file_input(frame, "Full Results PDF", 'full_results_pdf', [('PDF files', '*.pdf')])
+        self.create_file_input(frame, "Full Results (PDF, Lenex or SDIF)", 'full_results_pdf', RESULTS_FILETYPES)
+        self.create_text_input(frame, "Events to check (optional, e.g. 12-15, 20)", 'check_finals_events')
         
         # Process button
         process_btn = Button(
@@ -630,6 +960,37 @@ class SwimmingResultsApp:
         )
         process_btn.pack(pady=30)
 
+    def create_ingest_results_tab(self):
+        frame = tk.Frame(self.house_champs_notebook, bg=NOTEBOOK_TAB_BACKGROUND)
+        self.house_champs_notebook.add(frame, text="5. Ingest Results")
+
+        # Instructions
+        instructions = tk.Label(
+            frame,
+            text="Load every results PDF in a folder into one results database, tagged by meet (the PDF name)",
+            font=("Segoe UI", 12),
+            fg=LABEL_FOREGROUND,
+            bg=NOTEBOOK_TAB_BACKGROUND,
+            wraplength=500
+        )
+        instructions.pack(pady=20)
+
+        # Folder input area
+        self.create_folder_input(frame, "Results PDFs Folder", 'results_folder')
+
+        # Output file selection
+        self.create_output_file_input(frame, "Results Database", 'results_store_file', [('SQLite databases', '*.db')], 'results.db')
+
+        # Process button
+        process_btn = Button(
+            frame,
+            text="Ingest Results",
+            command=self.run_ingest_results,
+            highlightbackground=NOTEBOOK_TAB_BACKGROUND,
+            focusthickness=0,
+        )
+        process_btn.pack(pady=30)
+
     def create_generate_rankings_tab(self):
         frame = tk.Frame(self.house_champs_notebook, bg=NOTEBOOK_TAB_BACKGROUND)
         self.house_champs_notebook.add(frame, text="2. Generate Rankings")
@@ -997,6 +1358,23 @@ class SwimmingResultsApp:
         # Store references
         setattr(self, f'{key}_var', path_var)
 
+    def create_text_input(self, parent, label_text, key):
+        # Container frame
+        container = tk.Frame(parent, relief=tk.RAISED, bd=1)
+        container.pack(fill=tk.X, padx=10, pady=10)
+        
+        # Label
+        label = tk.Label(container, text=label_text, font=("Arial", 10, "bold"))
+        label.pack(anchor=tk.W, padx=10, pady=(10, 5))
+        
+        # Text entry
+        text_var = tk.StringVar()
+        entry = tk.Entry(container, textvariable=text_var, font=("Segoe UI", 10))
+        entry.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        # Store references
+        setattr(self, f'{key}_var', text_var)
+
     def create_output_file_input(self, parent, label_text, key, filetypes, default_name):
         # Container frame
         container = tk.Frame(parent, relief=tk.RAISED, bd=1)
@@ -1031,7 +1409,7 @@ class SwimmingResultsApp:
     def browse_output_file(self, key, filetypes):
         filename = filedialog.asksaveasfilename(
             title=f"Choose output file location",
-            defaultextension=".xlsx",
+            defaultextension=filetypes[0][1].split()[0].lstrip('*'),
             filetypes=filetypes + [('All files', '*.*')]
         )
         if filename:
@@ -1064,6 +1442,8 @@ class SwimmingResultsApp:
         
         # Get output path or use default (use the Leahify-specific key)
         output_path = self.file_paths.get('leahify_output_file') or 'output.xlsx'
+        batch_review = self.batch_review_var.get()
+        assignment = self.assignment_var.get()
         
         def process():
             try:
@@ -1087,6 +1467,8 @@ class SwimmingResultsApp:
                     confirm_callback=confirm_callback,
                     error_callback=error_callback,
                     output_path=output_path,
+                    batch_review=batch_review,
+                    assignment=assignment,
                 )
                 
             except KeyboardInterrupt:
@@ -1100,7 +1482,13 @@ class SwimmingResultsApp:
     def run_check_qualifiers(self):
         output_path = self.file_paths.get('output_excel') or 'output.xlsx'
         if not self.file_paths['heat_results_pdf']:
-            messagebox.showerror("Error", "Please select the heat results PDF file")
+            messagebox.showerror("Error", "Please select the heat results file")
+            return
+
+        try:
+            events = parse_event_selection(self.check_qualifiers_events_var.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
             return
         
         def process():
@@ -1122,7 +1510,8 @@ class SwimmingResultsApp:
                     self.file_paths['heat_results_pdf'],
                     progress_callback=progress_callback,
                     confirm_callback=confirm_callback,
-                    error_callback=error_callback
+                    error_callback=error_callback,
+                    events=events,
                 )
                 
             except KeyboardInterrupt:
@@ -1167,6 +1556,12 @@ class SwimmingResultsApp:
         if not self.file_paths['finals_excel'] or not self.file_paths['full_results_pdf']:
             messagebox.showerror("Error", "Please select both required files")
             return
+
+        try:
+            events = parse_event_selection(self.check_finals_events_var.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
         
         def process():
             try:
@@ -1187,7 +1582,8 @@ class SwimmingResultsApp:
                     self.file_paths['full_results_pdf'],
                     progress_callback=progress_callback,
                     confirm_callback=confirm_callback,
-                    error_callback=error_callback
+                    error_callback=error_callback,
+                    events=events,
                 )
                 
             except KeyboardInterrupt:
@@ -1197,6 +1593,37 @@ class SwimmingResultsApp:
         
         threading.Thread(target=process, daemon=True).start()
     
+    def run_ingest_results(self):
+        if not self.file_paths['results_folder']:
+            messagebox.showerror("Error", "Please select a folder")
+            return
+
+        store_path = self.file_paths.get('results_store_file') or 'results.db'
+
+        def process():
+            try:
+                self.clear_output()
+
+                def progress_callback(message, color=None):
+                    self.append_output(message, color)
+
+                def error_callback(message, color=None):
+                    self.append_output(message, color or "red")
+
+                ingest_results(
+                    self.file_paths['results_folder'],
+                    store_path,
+                    progress_callback=progress_callback,
+                    error_callback=error_callback,
+                )
+
+            except KeyboardInterrupt:
+                self.append_output("Operation cancelled by user", "red")
+            except Exception as e:
+                self.append_output(f"❌ ERROR: {str(e)}", "red")
+
+        threading.Thread(target=process, daemon=True).start()
+
     def run_amindefy(self):
         if not self.file_paths['timesheets_folder']:
             messagebox.showerror("Error", "Please select a folder")
@@ -0,0 +1,83 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from reusables import read_results, file_sha256, ResultsStore, PDF_WORKERS, CLUBS, LENEX_EXTENSIONS, SDIF_EXTENSIONS
+
+RESULTS_EXTENSIONS = (".pdf",) + LENEX_EXTENSIONS + SDIF_EXTENSIONS
+
+
+def read_results_file(pdf_path, clubs=CLUBS):
+    """
+    Read all of the event tables of a heat results or full results PDF (or its Lenex/SDIF export),
+    prelims and finals included. Run in a worker process, so each PDF is extracted on its own.
+    The PDF cache is not used: each file is only ingested once, and old results would push out the tables
+    the check tools rely on.
+    """
+    return read_results(pdf_path, isQualifiers=True, cache=None, clubs=clubs, all_rounds=True)
+
+def get_meet_name(pdf_path) -> str:
+    """
+    The meet a PDF is tagged with in the results store: its file name without the extension.
+    """
+    return os.path.splitext(os.path.basename(pdf_path))[0]
+
+def ingest_results(
+    results_folder: str,
+    store_path: str,
+    progress_callback,
+    error_callback,
+    workers: int = PDF_WORKERS,
+    clubs=CLUBS,
+):
+    """
+    Read every results PDF in a folder into one results store.
+    PDFs are read concurrently by up to `workers` processes, and PDFs whose content has already been
+    ingested (under any name) are skipped.
+    """
+    try:
+        pdf_paths = sorted(
+            os.path.join(results_folder, f) for f in os.listdir(results_folder) if f.lower().endswith(RESULTS_EXTENSIONS)
+        )
+
+        with ResultsStore(store_path) as store:
+            # Only read the PDFs that are not in the store yet
+            new_files = {}
+            for pdf_path in pdf_paths:
+                sha256 = file_sha256(pdf_path)
+                if store.has_file(sha256) or sha256 in new_files.values():
+                    progress_callback(f"Skipped (already ingested): {os.path.basename(pdf_path)}")
+                    continue
+                new_files[pdf_path] = sha256
+
+            if not new_files:
+                progress_callback("\n✅ NO NEW RESULTS TO INGEST!", "green")
+                return
+
+            def add_results(pdf_path, tables):
+                num_results = store.add_tables(new_files[pdf_path], get_meet_name(pdf_path), pdf_path, tables)
+                progress_callback(f"Ingested {os.path.basename(pdf_path)}: {len(tables)} events, {num_results} results")
+
+            failed = 0
+            if workers <= 1 or len(new_files) == 1:
+                for pdf_path in new_files:
+                    try:
+                        add_results(pdf_path, read_results_file(pdf_path, clubs))
+                    except Exception as e:
+                        failed += 1
+                        error_callback(f"❌ ERROR reading '{os.path.basename(pdf_path)}': {str(e)}", "red")
+            else:
+                # Each worker reads a whole PDF, and the results are written as soon as a PDF is read
+                with ProcessPoolExecutor(max_workers=min(workers, len(new_files))) as executor:
+                    futures = {executor.submit(read_results_file, pdf_path, clubs): pdf_path for pdf_path in new_files}
+                    for future in as_completed(futures):
+                        pdf_path = futures[future]
+                        try:
+                            add_results(pdf_path, future.result())
+                        except Exception as e:
+                            failed += 1
+                            error_callback(f"❌ ERROR reading '{os.path.basename(pdf_path)}': {str(e)}", "red")
+
+        ingested = len(new_files) - failed
+        progress_callback(f"\n✅ RESULTS INGESTED! {ingested} new PDF(s) added to {store_path}", "green")
+
+    except Exception as e:
+        error_callback(f"❌ ERROR: {str(e)}", "red")
@@ -2,6 +2,7 @@
 Read the qualifiers excel sheet and store the data.
 '''
 
+import numpy as np
 import pandas as pd
 import re
 from reusables import is_final
@@ -9,108 +10,117 @@ from reusables import is_final
 REGEX_AGE_RANGE_SAMMY = r"\b\d{1,2}\s*&\s*(Under|Over|under|over)|\b\d{1,2}\s*(-|/)\s*\d{1,2}"
 
 
-def extract_tables(
-        file: str,
-        sheet_name: str,
+def get_table_context(cell) -> tuple[int, int, str]:
+    '''
+    Extract the age range and gender of a table from the label in the row above its header,
+    e.g. "Dolphins Girls 9-10" -> (9, 10, "girls"). Finals are for all ages.
+    '''
+    if "boys" in str(cell).lower():
+        gender = "boys"
+    elif "girls" in str(cell).lower():
+        gender = "girls"
+    else:
+        raise ValueError(f"Could not extract gender \"boys\" or \"girls\": {cell}")
+
+    # Extract the age range
+    age_range = re.search(REGEX_AGE_RANGE_SAMMY, cell)
+    if age_range:
+        age_range = age_range.group(0)
+        if "under" in age_range.lower():
+            age_from = 0
+            age_to = int(age_range.split("&")[0].strip())
+        elif "over" in age_range.lower():
+            age_from = int(age_range.split("&")[0].strip())
+            age_to = 99
+        else:
+            if "-" in age_range:
+                age_from, age_to = map(int, age_range.split("-"))
+            elif "/" in age_range:
+                age_from, age_to = map(int, age_range.split("/"))
+            else:
+                raise ValueError(f"Could not extract age range. Did not find - or /: {cell}")
+    # Finals don't have age ranges
+    elif is_final(cell):
+        age_from = 0
+        age_to = 99
+    else:
+        raise ValueError(f"Could not extract age range: {cell}")
+
+    return age_from, age_to, gender
+
+
+def split_tables(
+        df: pd.DataFrame,
         header_identifiers: list[(str, int)],
         get_events: bool = False,
 ) -> tuple[list[pd.DataFrame], list[str], dict[str, (int, int, str)]]:
     '''
-    Extracts all tables from the given excel sheet.
-    Each table must have a row where the first cell contains "first" and "name".
-    This is how we identify the start of a new table.
-    The end of a table is identified by an empty row.
+    Split a sheet read without headers into its tables (see extract_tables).
+    The event, header and empty rows are found with one mask per column, and only those rows are
+    visited one by one: the swimmer rows between them are added to the tables a block at a time.
     '''
-
-    def is_header(row: pd.Series) -> bool:
-        '''
-        Returns true if and only if the row is a header.
-        '''
-        for identifier, col in header_identifiers:
-            cell = str(row.iloc[col]).lower()
-            if identifier.lower() in cell:
-                return True
-        return False
-    
-    # Read the excel file
-    df = pd.read_excel(file, sheet_name=sheet_name or 0, header=None)
+    first_cells = df.iloc[:, 0].map(str)
+    is_event = first_cells.str.startswith("Event").to_numpy(dtype=bool) if get_events else np.zeros(len(df), dtype=bool)
+    # A header has one of the identifiers in its column
+    is_header = np.zeros(len(df), dtype=bool)
+    for identifier, col in header_identifiers:
+        is_header |= df.iloc[:, col].map(str).str.lower().str.contains(identifier.lower(), regex=False).to_numpy(dtype=bool)
+    is_header &= ~is_event
+    is_empty = df.isnull().all(axis=1).to_numpy(dtype=bool)
+
+    values = df.to_numpy(dtype=object)
+    first_names, surnames = values[:, 0], values[:, 1]
 
     tables: list[pd.DataFrame] = []  # To store individual tables
-    current_table = []  # Temporary storage for the current table
+    current_table = []  # Positions of the rows of the current table, header first
     events = []  # To store the event names
 
     swimmer_info = {} # To store swimmer info (age from, age to, gender)
+    context = None # Age from, age to and gender of the current table
 
     headers_found = False
 
-    # Iterate through each row
-    for idx, row in df.iterrows():
-        # If we are looking for events and the line contains "Event", then extract the event names
-        first_cell_str = str(row.iloc[0])
-        if get_events and first_cell_str.startswith("Event"):
-            events.append(first_cell_str)
-
-            # If we have found the headers, then add the row to the current table.
+    def save_table(positions: list[int]):
+        tables.append(pd.DataFrame(values[positions[1:]].tolist(), columns=values[positions[0]].tolist()))
+
+    def add_swimmers(start: int, end: int):
+        # Add the swimmer rows between two marked rows to the current table, and to the swimmer info
+        if start >= end or not headers_found:
+            return
+        if context is None:
+            raise ValueError("Could not extract age range and gender: the header is on the first row")
+        current_table.extend(range(start, end))
+        swimmer_info.update(dict.fromkeys(zip(first_names[start:end], surnames[start:end]), context))
+
+    # Only the event, header and empty rows change the current table
+    previous = 0
+    for idx in np.flatnonzero(is_event | is_header | is_empty):
+        add_swimmers(previous, idx)
+        previous = idx + 1
+        # If the row is an event, then start a new table with it
+        if is_event[idx]:
+            events.append(first_cells.iloc[idx])
             if current_table:
-                tables.append(pd.DataFrame(current_table[1:], columns=current_table[0]))
-            current_table = [row.to_list()]
+                save_table(current_table)
+            current_table = [idx]
             headers_found = False
-        # If the row is a header, then put it at the start of the current table.
-        elif is_header(row):
-            current_table.insert(0, row.to_list())
+        # If the row is a header, then put it at the start of the current table
+        elif is_header[idx]:
+            current_table.insert(0, idx)
             headers_found = True
-
             if idx > 0:
-                # Look at the row above to extract the gender
-                cell = df.iloc[idx - 1][0]
-                if "boys" in str(cell).lower():
-                    current_gender = "boys"
-                elif "girls" in str(cell).lower():
-                    current_gender = "girls"
-                else:
-                    raise ValueError(f"Could not extract gender \"boys\" or \"girls\": {cell}")
-                
-                # Extract the age range from the row above
-                age_range = re.search(REGEX_AGE_RANGE_SAMMY, cell)
-                if age_range:
-                    age_range = age_range.group(0)
-                    if "under" in age_range.lower():
-                        current_age_from = 0
-                        current_age_to = int(age_range.split("&")[0].strip())
-                    elif "over" in age_range.lower():
-                        current_age_from = int(age_range.split("&")[0].strip())
-                        current_age_to = 99
-                    else:
-                        if "-" in age_range:
-                            current_age_from, current_age_to = map(int, age_range.split("-"))
-                        elif "/" in age_range:
-                            current_age_from, current_age_to = map(int, age_range.split("/"))
-                        else:
-                            raise ValueError(f"Could not extract age range. Did not find - or /: {cell}")
-                # Finals don't have age ranges
-                elif is_final(cell):
-                    current_age_from = 0
-                    current_age_to = 99
-                else:
-                    raise ValueError(f"Could not extract age range: {cell}")
-                
-        # If we have found the headers, then add the swimmer row to the current table.
-        elif headers_found and not row.isnull().all():
-            current_table.append(row.to_list())
-            # Also add it to the swimmer info
-            first_name, surname = row[0], row[1]
-            swimmer_info[(first_name, surname)] = (current_age_from, current_age_to, current_gender)
-
-        # If the row is empty, then we have reached the end of the table.
-        elif row.isnull().all() and current_table:
-            tables.append(pd.DataFrame(current_table[1:], columns=current_table[0]))
+                # The row above has the gender and age range
+                context = get_table_context(values[idx - 1, 0])
+        # If the row is empty, then we have reached the end of the table
+        elif current_table:
+            save_table(current_table)
             current_table = []
             headers_found = False
-        
+    add_swimmers(previous, len(df))
 
     # Save the last table
     if current_table:
-        tables.append(pd.DataFrame(current_table[1:], columns=current_table[0]))
+        save_table(current_table)
 
     # Filter out empty tables
     tables = [table for table in tables if not table.empty]
@@ -118,6 +128,24 @@ def extract_tables(
     return tables, events, swimmer_info
 
 
+def extract_tables(
+        file: str | pd.ExcelFile,
+        sheet_name: str,
+        header_identifiers: list[(str, int)],
+        get_events: bool = False,
+) -> tuple[list[pd.DataFrame], list[str], dict[str, (int, int, str)]]:
+    '''
+    Extracts all tables from the given excel sheet.
+    Each table must have a row where the first cell contains "first" and "name".
+    This is how we identify the start of a new table.
+    The end of a table is identified by an empty row.
+    `file` can be a workbook already opened with pd.ExcelFile, to read several of its sheets from a single parse.
+    '''
+    # Read the excel file
+    df = pd.read_excel(file, sheet_name=sheet_name or 0, header=None)
+    return split_tables(df, header_identifiers, get_events)
+
+
 def concat_tables(tables: list[pd.DataFrame]) -> pd.DataFrame:
     '''
     Concatenate all tables into a single table.
@@ -6,7 +6,8 @@ time in Sammy's version and add it to the dictionary.
 '''
 
 from .extract_tables import extract_tables, concat_tables
-from reusables import match_swimmer, parse_name, get_event_name, is_final, rename_final_column
+from reusables import match_swimmer, find_swimmer, prompt_manual_match, prompt_batch_review, assign_matches, ASSIGNMENT_MIN_SCORE, NameIndex, IdentityStore, parse_name, get_event_name, is_final, rename_final_column
+import numpy as np
 import pandas as pd
 from openpyxl import Workbook
 from openpyxl.styles import Border, Side, Font, PatternFill
@@ -23,14 +24,14 @@ LEAH_TABLE_ID = "Lane"        # Identifier for the normal tables
 REGEX_AGE_RANGE_LEAH = r"\b\d{1,2}\s*&\s*(Under|Over|under|over)|\b\d{1,2}\s*-\s*\d{1,2}" # Regex for age range
 
 
-def get_qualifiers_table(file: str, sheet_name: str) -> tuple[pd.DataFrame, list[str]]:
+def get_qualifiers_table(file: str | pd.ExcelFile, sheet_name: str) -> tuple[pd.DataFrame, list[str]]:
     '''
     Extract the tables from Sammy's version of the qualifiers.
     '''
     qualifiers_table, _, s_info = extract_tables(file, sheet_name, [(QUAL_TABLE_ID, 0)])
     return concat_tables(qualifiers_table), s_info
 
-def get_leah_tables(file: str, sheet_name: str) -> tuple[list[pd.DataFrame], list[str], dict[str, (int, int, str)]]:
+def get_leah_tables(file: str | pd.ExcelFile, sheet_name: str) -> tuple[list[pd.DataFrame], list[str], dict[str, (int, int, str)]]:
     '''
     Extract the tables from Leah's version of the qualifiers.
     
@@ -47,18 +48,51 @@ def get_leah_tables(file: str, sheet_name: str) -> tuple[list[pd.DataFrame], lis
 def load_qualifiers(sfile: str) -> tuple[pd.DataFrame, dict]:
     '''
     Load all qualifiers tables and swimmer info (age from, age to, gender) from the Excel file.
+    The workbook is only opened and parsed once for all of the groups.
     '''
     qualifiers_tables = []
     swimmer_info = {}
-    for group in GROUPS:
-        qualifiers_table, s_info = get_qualifiers_table(sfile, group)
-        qualifiers_tables.append(qualifiers_table)
-        swimmer_info.update(s_info)
+    with pd.ExcelFile(sfile) as workbook:
+        for group in GROUPS:
+            qualifiers_table, s_info = get_qualifiers_table(workbook, group)
+            qualifiers_tables.append(qualifiers_table)
+            swimmer_info.update(s_info)
     # Concatenate all tables into a single table
     qualifiers_tables = pd.concat(qualifiers_tables, ignore_index=True)
 
     return qualifiers_tables, swimmer_info
 
+def get_event_context(event_cell: str) -> tuple[int, int, str]:
+    '''
+    Extract the age range and gender of an event from its header in Leah's tables,
+    e.g. "Event 1 Girls 9-10 25 SC Meter Freestyle" -> (9, 10, "girls").
+    Finals are for all ages.
+    '''
+    age_range = re.search(REGEX_AGE_RANGE_LEAH, event_cell)
+    if age_range:
+        age_range = age_range.group(0)
+        if "under" in age_range.lower():
+            age_from = 0
+            age_to = int(age_range.split("&")[0].strip())
+        elif "over" in age_range.lower():
+            age_from = int(age_range.split("&")[0].strip())
+            age_to = 99
+        else:
+            if "-" in age_range:
+                age_from, age_to = map(int, age_range.split("-"))
+            elif "/" in age_range:
+                age_from, age_to = map(int, age_range.split("/"))
+            else:
+                raise ValueError(f"Could not extract age range. Did not find - or /: {event_cell}")
+    elif is_final(event_cell):
+        age_from = 0
+        age_to = 99
+    else:
+        raise ValueError(f"Could not extract age range from event name: {event_cell}")
+
+    gender = "boys" if "boys" in event_cell.lower() else "girls"
+    return age_from, age_to, gender
+
 def match_swimmers(
     qualifiers_table: pd.DataFrame,
     leah_tables: list[pd.DataFrame],
@@ -66,24 +100,51 @@ def match_swimmers(
     time_column_name: str,
     confirm_callback,
     progress_callback,
+    swimmer_info: dict | None = None,
+    identity_store: IdentityStore | None = None,
+    batch_review: bool = False,
+    assignment: bool = False,
 ) -> dict:
     '''
     Match swimmers from Leah's version to Sammy's version.
+    Swimmers are first paired by their ASA number, when both tables have one, and the others by name.
+    Given the swimmer info (age from, age to, gender) of Sammy's swimmers, each swimmer is only
+    matched among those who fit the age range and gender of the event.
+    Given an identity store, the matches it remembers are used, and the new manual matches are saved
+    to it after each event.
+    With batch_review, the swimmers that can't be matched automatically are not asked about one by one:
+    they are all reviewed at once, after every event has been matched.
+    With assignment, those swimmers are first assigned their candidates optimally over the whole run
+    (see assign_matches), and only the assignments below ASSIGNMENT_MIN_SCORE are left to confirm.
     Returns a dictionary mapping swimmer names (Sammy's version) to a list of events they swam.
     '''
     # For each swimmer in Leah's version, find the corresponding time in Sammy's version
     # Keep track of number of successful matches and number of ignored swimmers
-    total, num_matches, num_ignored = 0, 0, 0
+    total, num_matches, num_ignored, num_asa_matches = 0, 0, 0, 0
 
     # Keep track of manual and automatic matches
     manual_matches = {} # manual matches are from user input
     automatic_matches = {} # automatic matches are from exact matches
     ignored_swimmers = set() # keep track of ignored swimmers
 
+    # With batch review or assignment, swimmers left to match after every event, and their rows
+    defer = batch_review or assignment
+    unresolved = {} # Leah's name -> (scored candidates, events, event context of the first event)
+    deferred = [] # (table index, row index, event, Leah's first name, Leah's surname)
+
     # Keep track of which events have been matched.
     # This is for the extras table (i.e. which swimmers swam but did not sign up)
     matched_events = {}  # Map from swimmer name (sammy's version) to a list of events
 
+    # Times to write into each table, written all at once when the table is finished
+    time_writes = {} # Map from table index to a list of (row index, time)
+
+    # Index Sammy's names once, for all of the lookups
+    name_index = NameIndex(qualifiers_table, swimmer_info=swimmer_info)
+
+    # Matches confirmed in previous runs
+    known_matches = identity_store.get_matches() if identity_store is not None else None
+
     # Each table corresponds to an event
     # Iterate over each table and each row to get each swimmer
     for tableIdx in range(len(leah_tables)):
@@ -94,6 +155,12 @@ def match_swimmers(
 
         progress_callback(f"Processing event: {event}", "yellow")
 
+        # Age range and gender of the event, if the header has them
+        try:
+            event_context = get_event_context(ltable.iloc[0, 0])
+        except (ValueError, TypeError):
+            event_context = None
+
         # Iterate over each row in the table (i.e. each swimmer)
         for lrowIdx, lrow in ltable.iterrows():
             # Skip NAN rows
@@ -111,20 +178,59 @@ def match_swimmers(
             lfirst_names, lsurname = parse_name(lrow['Name'])
             lfirst_name = lfirst_names.split()[0]
 
+            # Pair the swimmer by ASA number, without looking at names
+            member_name = name_index.find_member(lrow["ASA"]) if "ASA" in ltable.columns else None
+            if member_name is not None:
+                automatic_matches.setdefault((lfirst_name, lsurname), member_name)
+                swimmer = name_index.get_swimmer(*member_name)
+                num_asa_matches += 1
+                progress_callback(f"Found ASA match: {lfirst_name.capitalize()} {lsurname.capitalize()} -> {member_name[0].capitalize()} {member_name[1].capitalize()}", "green")
+
             # check if swimmer has already been ignored
-            if (lfirst_name, lsurname) in ignored_swimmers:
+            elif (lfirst_name, lsurname) in ignored_swimmers:
+                continue
+
+            # Defer the swimmer to the review, if it is already waiting for it
+            elif defer and (lfirst_name, lsurname) in unresolved:
+                unresolved[(lfirst_name, lsurname)][1].append(event)
+                deferred.append((tableIdx, lrowIdx, event, lfirst_name, lsurname))
                 continue
 
+            # Match the swimmer to Sammy's version, without asking the user yet
+            elif defer:
+                swimmer, scores = find_swimmer(
+                    lfirst_name,
+                    lsurname,
+                    qualifiers_table,
+                    automatic_matches,
+                    manual_matches,
+                    progress_callback,
+                    name_index=name_index,
+                    event_context=event_context,
+                    known_matches=known_matches,
+                )
+                if swimmer is None and scores:
+                    unresolved[(lfirst_name, lsurname)] = (scores, [event], event_context)
+                    deferred.append((tableIdx, lrowIdx, event, lfirst_name, lsurname))
+                    continue
+                if swimmer is None:
+                    progress_callback(f"No potential matches found in qualifiers table for: {lfirst_name.capitalize()} {lsurname.capitalize()}", "red")
+                    swimmer = pd.DataFrame()
+
             # Match the swimmer to Sammy's version
-            swimmer = match_swimmer(
-                lfirst_name,
-                lsurname,
-                qualifiers_table,
-                automatic_matches,
-                manual_matches,
-                progress_callback=progress_callback,
-                confirm_callback=confirm_callback
-            )
+            else:
+                swimmer = match_swimmer(
+                    lfirst_name,
+                    lsurname,
+                    qualifiers_table,
+                    automatic_matches,
+                    manual_matches,
+                    progress_callback=progress_callback,
+                    confirm_callback=confirm_callback,
+                    name_index=name_index,
+                    event_context=event_context,
+                    known_matches=known_matches,
+                )
             # Check if swimmer was ignored
             if swimmer.empty:
                 ignored_swimmers.add((lfirst_name, lsurname))
@@ -134,42 +240,150 @@ def match_swimmers(
             # Increment number of matches
             num_matches += 1
 
-            # Add the event to the matched events
-            sfirst_name = swimmer["First name"].values[0]
-            ssurname = swimmer["Surname"].values[0]
-            key = (sfirst_name, ssurname)
-            matched_events.setdefault(key, []).append(event)
+            record_match(time_writes, tableIdx, lrowIdx, swimmer, event, matched_events)
 
             progress_callback(f"Successfully matched: {lfirst_name.capitalize()} {lsurname.capitalize()}", "green")
 
-            # Get the time
-            time = swimmer[event].values[0]
+        # Write this event's times
+        write_times(leah_tables, time_writes, time_column_name)
+
+        # Save this event's manual matches for the next run
+        if identity_store is not None:
+            identity_store.add_matches(manual_matches)
+
+    # Assign the deferred swimmers their candidates over the whole run, keeping the confident assignments
+    if assignment and unresolved:
+        assigned = assign_matches(
+            list(unresolved),
+            name_index,
+            automatic_matches,
+            manual_matches,
+            [event_context for _, _, event_context in unresolved.values()],
+        )
+        for (lfirst_name, lsurname), (sfirst, ssurname, score) in assigned.items():
+            if score >= ASSIGNMENT_MIN_SCORE:
+                automatic_matches[(lfirst_name, lsurname)] = (sfirst, ssurname)
+                del unresolved[(lfirst_name, lsurname)]
+                progress_callback(f"Found assigned match: {lfirst_name.capitalize()} {lsurname.capitalize()} -> {sfirst.capitalize()} {ssurname.capitalize()} ({score}%)", "green")
+
+    # Ask about the other deferred swimmers, then match them
+    if deferred:
+        def available(scores):
+            # Candidates matched since they were scored are not available anymore
+            matched = set(automatic_matches.values()) | set(manual_matches.values())
+            return [score for score in scores if score[:2] not in matched]
+
+        if batch_review and unresolved:
+            progress_callback(f"Reviewing {len(unresolved)} unmatched swimmers...", "yellow")
+            prompt_batch_review(
+                [
+                    (lfirst_name, lsurname, available(scores), unresolved_events, event_context)
+                    for (lfirst_name, lsurname), (scores, unresolved_events, event_context) in unresolved.items()
+                ],
+                manual_matches,
+                progress_callback,
+                confirm_callback,
+                name_index,
+                automatic_matches=automatic_matches,
+            )
+        else:
+            for (lfirst_name, lsurname), (scores, _, event_context) in unresolved.items():
+                scores = available(scores)
+                if not scores:
+                    progress_callback(f"No potential matches found in qualifiers table for: {lfirst_name.capitalize()} {lsurname.capitalize()}", "red")
+                    continue
+                progress_callback(f"No exact match found for {lfirst_name.capitalize()} {lsurname.capitalize()}, requesting manual confirmation...", "yellow")
+                prompt_manual_match(
+                    lfirst_name,
+                    lsurname,
+                    scores,
+                    qualifiers_table,
+                    manual_matches,
+                    progress_callback,
+                    confirm_callback,
+                    name_index=name_index,
+                    automatic_matches=automatic_matches,
+                    event_context=event_context,
+                )
+
+        for tableIdx, lrowIdx, event, lfirst_name, lsurname in deferred:
+            sammy_name = automatic_matches.get((lfirst_name, lsurname)) or manual_matches.get((lfirst_name, lsurname))
+            if sammy_name is None:
+                # Only count the first row of an ignored swimmer, like when matching one by one
+                if (lfirst_name, lsurname) not in ignored_swimmers:
+                    ignored_swimmers.add((lfirst_name, lsurname))
+                    num_ignored += 1
+                continue
 
-            # Set the column type to string
-            leah_tables[tableIdx] = leah_tables[tableIdx].astype({time_column_name: str})
-            
-            # Set the time if it's not nan
-            leah_tables[tableIdx].at[lrowIdx, time_column_name] = str(time) if not pd.isnull(time) else "DNS"
+            num_matches += 1
+            swimmer = name_index.get_swimmer(*sammy_name)
+            record_match(time_writes, tableIdx, lrowIdx, swimmer, event, matched_events)
+
+            progress_callback(f"Successfully matched: {lfirst_name.capitalize()} {lsurname.capitalize()}", "green")
+
+        write_times(leah_tables, time_writes, time_column_name)
+
+        # Save the confirmed manual matches for the next run
+        if identity_store is not None:
+            identity_store.add_matches(manual_matches)
 
     progress_callback(f"Number of matches: {num_matches}/{total}")
     progress_callback(f"Number of ignored swimmers: {num_ignored}/{total}")
+    progress_callback(f"Number of ASA matches: {num_asa_matches}/{total}")
 
     return matched_events
 
-def combine_tables(leah_tables: list[pd.DataFrame], time_column_name: str) -> pd.DataFrame:
+def record_match(
+        time_writes: dict,
+        tableIdx: int,
+        lrowIdx,
+        swimmer: pd.DataFrame,
+        event: str,
+        matched_events: dict,
+) -> None:
     '''
-    Concatenate all tables into a single table.
+    Add the time of a matched swimmer to the times to write into its row of Leah's table (see write_times),
+    and add the event to its matched events.
     '''
-    ltable = leah_tables[0]
-    output_table = pd.DataFrame(columns=ltable.columns)
+    # Add the event to the matched events
+    sfirst_name = swimmer["First name"].values[0]
+    ssurname = swimmer["Surname"].values[0]
+    key = (sfirst_name, ssurname)
+    matched_events.setdefault(key, []).append(event)
 
-    header_row = pd.DataFrame([ltable.columns], columns=ltable.columns)
+    # Get the time
+    time = swimmer[event].values[0]
 
-    for tableIdx in range(len(leah_tables)):
-        # Add the header row
-        ltable = leah_tables[tableIdx]
-        ltable_with_header = pd.concat([ltable.iloc[:1], header_row, ltable.iloc[1:]])
-        output_table = pd.concat([output_table, ltable_with_header])
+    # Keep the time if it's not nan
+    time_writes.setdefault(tableIdx, []).append((lrowIdx, str(time) if not pd.isnull(time) else "DNS"))
+
+def write_times(leah_tables: list[pd.DataFrame], time_writes: dict, time_column_name: str) -> None:
+    '''
+    Write the recorded times into Leah's tables, with one assignment per table, and clear them.
+    The time column of a table with times is turned into strings once, before writing them.
+    '''
+    for tableIdx, writes in time_writes.items():
+        rows, times = zip(*writes)
+        leah_tables[tableIdx] = leah_tables[tableIdx].astype({time_column_name: str})
+        leah_tables[tableIdx].loc[list(rows), time_column_name] = list(times)
+    time_writes.clear()
+
+def combine_tables(leah_tables: list[pd.DataFrame], time_column_name: str) -> pd.DataFrame:
+    '''
+    Concatenate all tables into a single table.
+    The rows are gathered in a list and the table is built once at the end, as every table has the same columns.
+    '''
+    columns = leah_tables[0].columns
+    header_row = list(columns)
+
+    rows = []
+    for ltable in leah_tables:
+        # Add the header row under the event row
+        ltable_rows = ltable.to_numpy(dtype=object).tolist()
+        rows.extend(ltable_rows[:1])
+        rows.append(header_row)
+        rows.extend(ltable_rows[1:])
+    output_table = pd.DataFrame(rows, columns=columns, dtype=object)
 
     # Get rid of nan values in the Time column
     output_table[time_column_name] = output_table[time_column_name].replace("nan", "")
@@ -182,33 +396,42 @@ def get_extras_per_event(
         swimmer_info: dict,
         matched_events: dict,        
 ) -> dict:
-    # Keep track of extra swimmers for each event
-    extras_per_event = {} # Map from (event name, age range, gender) to a list of swimmers
-
-    for idx, srow in qualifiers_table.iterrows():
-        # Get all events swam by the swimmer
-        events_swam = set(event for event in set(events) if not pd.isnull(srow[event]) and srow[event] != "DNS")
-
-        # Missing events
-        missing_events = []
-
-        # Check if they have been matched for the same events
-        for ev in events_swam:
-            if (srow["First name"], srow["Surname"]) not in matched_events or ev not in matched_events[(srow["First name"], srow["Surname"])]:
-                missing_events.append(ev)
-
-        # Add the swimmer to the extras per event
-        for missing_event in missing_events:
-            # Get swimmer age range and gender
-            age_from, age_to, gender = swimmer_info[(srow["First name"], srow["Surname"])]
-
-            # If it's a final event, we make the age range 0-99
-            if is_final(missing_event):
-                age_from = 0
-                age_to = 99
-            
-            # Add the swimmer to the extras per event table
-            extras_per_event.setdefault((missing_event, age_from, age_to, gender), []).append(srow)
+    '''
+    Find the extra swimmers of each event: those with a time in Sammy's version (not empty nor DNS)
+    for an event they were not matched in.
+    Returns a map from (event name, age from, age to, gender) to the qualifiers rows of its extra swimmers,
+    in table order. Finals are for all ages.
+    '''
+    events = list(dict.fromkeys(events))
+    if not events or qualifiers_table.empty:
+        return {}
+
+    # Every (swimmer row, event) with a time, swimmer by swimmer
+    times = qualifiers_table[events]
+    row_positions, event_positions = np.nonzero((times.notna() & times.ne("DNS")).to_numpy(dtype=bool, na_value=False))
+    first_names = qualifiers_table["First name"].to_numpy(dtype=object)[row_positions]
+    surnames = qualifiers_table["Surname"].to_numpy(dtype=object)[row_positions]
+    event_names = np.array(events, dtype=object)[event_positions]
+
+    # Keep those that were not matched
+    matched_pairs = [(*name, event) for name, name_events in matched_events.items() for event in name_events]
+    missing = ~pd.MultiIndex.from_arrays([first_names, surnames, event_names]).isin(matched_pairs)
+    row_positions, first_names, surnames, event_names = row_positions[missing], first_names[missing], surnames[missing], event_names[missing]
+
+    # Swimmer age range and gender, but finals are for all ages
+    contexts = pd.DataFrame(
+        [swimmer_info[name] for name in zip(first_names, surnames)],
+        columns=["age_from", "age_to", "gender"],
+        dtype=object,
+    )
+    finals = np.array([is_final(event) for event in event_names], dtype=bool)
+    contexts.loc[finals, ["age_from", "age_to"]] = [0, 99]
+    contexts.insert(0, "event", event_names)
+
+    # Group the extra swimmers per event, age range and gender
+    extras_per_event = {}
+    for key, positions in contexts.groupby(["event", "age_from", "age_to", "gender"], sort=False).indices.items():
+        extras_per_event[key] = qualifiers_table.iloc[row_positions[positions]]
 
     return extras_per_event
 
@@ -218,6 +441,8 @@ def add_extras_to_leah_tables(
 ) -> list[pd.DataFrame]:
     """
     Insert extras into each Leah table before combining.
+    The extras of an event are the qualifiers rows of its extra swimmers, as a DataFrame (see get_extras_per_event)
+    or a list of rows.
     """
     
     for i in range(len(leah_tables)):
@@ -227,49 +452,31 @@ def add_extras_to_leah_tables(
         # Extract event name
         event_name = get_event_name(event_cell)
 
-        # Extract age range
-        age_range = re.search(REGEX_AGE_RANGE_LEAH, event_cell)
-        if age_range:
-            age_range = age_range.group(0)
-            if "under" in age_range.lower():
-                age_from = 0
-                age_to = int(age_range.split("&")[0].strip())
-            elif "over" in age_range.lower():
-                age_from = int(age_range.split("&")[0].strip())
-                age_to = 99
-            else:
-                if "-" in age_range:
-                    age_from, age_to = map(int, age_range.split("-"))
-                elif "/" in age_range:
-                    age_from, age_to = map(int, age_range.split("/"))
-                else:
-                    raise ValueError(f"Could not extract age range. Did not find - or /: {event_cell}")
-        elif is_final(event_cell):
-            age_from = 0
-            age_to = 99
-        else:
-            raise ValueError(f"Could not extract age range from event name: {event_cell}")
-
-        gender = "boys" if "boys" in event_cell.lower() else "girls"
+        # Extract age range and gender
+        age_from, age_to, gender = get_event_context(event_cell)
         key = (event_name, age_from, age_to, gender)
 
         # If extras_per_event has an entry, add extras to the table
         if key in extras_per_event:
+            num_columns = len(leah_table.columns)
+
             # Add extra label row
-            extra_label_row = pd.DataFrame([["EXTRA"] + [""] * (len(leah_table.columns) - 1)], columns=leah_table.columns)
-            leah_tables[i] = pd.concat([leah_tables[i], extra_label_row], ignore_index=True)
+            extra_rows = [["EXTRA"] + [""] * (num_columns - 1)]
+
+            # Add the correct columns to insert into Leah table, for each extra swimmer
+            extra_columns = ["First name", "Surname", "ASA", "DOB", "Group", event_name]
+            extras = extras_per_event[key]
+            if isinstance(extras, pd.DataFrame):
+                extra_values = extras[extra_columns].to_numpy(dtype=object).tolist()
+            else:
+                extra_values = [[extra_row[column] for column in extra_columns] for extra_row in extras]
 
-            # For each extra swimmer, create a row
-            for extra_row in extras_per_event[key]:
-                # Add the correct columns to insert into Leah table
-                extra_row = extra_row[["First name", "Surname", "ASA", "DOB", "Group", event_name]]
-                
-                # Pad the row with empty strings to match the number of columns in leah_table
-                padded_row = list(extra_row.values) + [""] * (len(leah_table.columns) - len(extra_row.values))
-                extra_row_df = pd.DataFrame([padded_row], columns=leah_table.columns)
+            # Pad the rows with empty strings to match the number of columns in leah_table
+            padding = [""] * (num_columns - len(extra_columns))
+            extra_rows.extend(values + padding for values in extra_values)
 
-                # Add it to the Leah table
-                leah_tables[i] = pd.concat([leah_tables[i], extra_row_df], ignore_index=True)
+            # Add them all to the Leah table at once
+            leah_tables[i] = pd.concat([leah_table, pd.DataFrame(extra_rows, columns=leah_table.columns)], ignore_index=True)
 
     return leah_tables
 
@@ -330,6 +537,8 @@ def leahify_qualifiers(
     confirm_callback,
     error_callback,
     output_path: str = "output.xlsx",
+    batch_review: bool = False,
+    assignment: bool = False,
 ) -> None:
     '''
     Turn Sammy's version of qualifiers into Leah's version.
@@ -341,6 +550,8 @@ def leahify_qualifiers(
         progress_callback: Called with progress messages (str)
         confirm_callback: Called for user confirmations, expects (message: str, data: dict) -> str
         error_callback: Called with error messages (str)
+        batch_review: Review the swimmers that can't be matched automatically all at once, at the end
+        assignment: Match confidently the swimmers whose optimal assignment is close enough, before asking
     '''
     try:
         output_path = output_path or "output.xlsx"
@@ -370,14 +581,19 @@ def leahify_qualifiers(
         progress_callback("Matching swimmers between files...", "yellow")
 
         # For each swimmer in Leah's version, find the corresponding time in Sammy's version
-        matched_events = match_swimmers(
-            qualifiers_table, 
-            leah_tables, 
-            events, 
-            time_column_name, 
-            confirm_callback=confirm_callback,
-            progress_callback=progress_callback
-        )
+        with IdentityStore() as identity_store:
+            matched_events = match_swimmers(
+                qualifiers_table, 
+                leah_tables, 
+                events, 
+                time_column_name, 
+                confirm_callback=confirm_callback,
+                progress_callback=progress_callback,
+                swimmer_info=swimmer_info,
+                identity_store=identity_store,
+                batch_review=batch_review,
+                assignment=assignment,
+            )
 
         progress_callback("Processing extra swimmers...")
 
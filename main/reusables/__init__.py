@@ -1,5 +1,10 @@
+from .names import *
 from .matching import *
 from .parsing import *
+from .results_formats import *
+from .pdf_cache import *
+from .results_store import *
+from .identity_store import *
 from .times import *
 from .finals import *
 from .entry import *
@@ -0,0 +1,106 @@
+'''
+Local SQLite store of the swimmer matches confirmed by hand (Leah's name -> Sammy's name), shared by all of the
+tools and kept between runs, so the same pairs don't need confirming again every week.
+'''
+
+import os
+import platform
+import sqlite3
+from datetime import datetime
+
+IDENTITY_STORE_FILE = "identities.db"
+
+IDENTITY_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    leah_first_name TEXT NOT NULL,
+    leah_surname TEXT NOT NULL,
+    sammy_first_name TEXT NOT NULL,
+    sammy_surname TEXT NOT NULL,
+    confirmed_at TEXT NOT NULL,
+    PRIMARY KEY (leah_first_name, leah_surname, sammy_first_name, sammy_surname)
+);
+CREATE INDEX IF NOT EXISTS matches_sammy ON matches (sammy_first_name, sammy_surname);
+"""
+
+
+def get_data_dir() -> str:
+    '''
+    Return the directory used for the app's local data, depending on the OS.
+    '''
+    system = platform.system()
+    if system == "Windows":
+        return os.path.join(os.path.expanduser("~"), "AppData", "Local", "ESCAuto")
+    elif system == "Darwin":
+        return os.path.join(os.path.expanduser("~"), "Library", "Application Support", "ESCAuto")
+    else:
+        return os.path.join(os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share"), "esc-auto")
+
+
+class IdentityStore:
+    '''
+    Confirmed matches between a swimmer's name in Leah's format (or the results PDF) and in Sammy's format.
+    A Leah name can have several Sammy names, e.g. siblings confirmed in different galas; the most recently
+    confirmed comes first.
+    '''
+    def __init__(self, path: str | None = None):
+        self.path = path or os.path.join(get_data_dir(), IDENTITY_STORE_FILE)
+        self.saved = set() # Pairs already in the store, so they are only written once per run
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self.connection = sqlite3.connect(self.path)
+            self.connection.executescript(IDENTITY_STORE_SCHEMA)
+        except (OSError, sqlite3.Error):
+            # The store is only an optimisation, so never fail a run because of it
+            self.connection = None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get_matches(self) -> dict[tuple[str, str], list[tuple[str, str]]]:
+        '''
+        Return every confirmed match, as Leah's name -> Sammy's names, most recent first.
+        '''
+        if self.connection is None:
+            return {}
+        rows = self.connection.execute(
+            "SELECT leah_first_name, leah_surname, sammy_first_name, sammy_surname FROM matches "
+            "ORDER BY confirmed_at DESC, rowid DESC"
+        ).fetchall()
+        matches = {}
+        for lfirst_name, lsurname, sfirst_name, ssurname in rows:
+            matches.setdefault((lfirst_name, lsurname), []).append((sfirst_name, ssurname))
+            self.saved.add(((lfirst_name, lsurname), (sfirst_name, ssurname)))
+        return matches
+
+    def add_matches(self, matches: dict[tuple[str, str], tuple[str, str]]) -> int:
+        '''
+        Write the new pairs of a dict of manual matches (Leah's name -> Sammy's name) in one transaction,
+        and return how many were written.
+        '''
+        new_pairs = [
+            (lname, sname) for lname, sname in matches.items()
+            if (lname, sname) not in self.saved and all(isinstance(part, str) for part in (*lname, *sname))
+        ]
+        if self.connection is None or not new_pairs:
+            return 0
+
+        confirmed_at = datetime.now().isoformat(timespec="seconds")
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO matches (leah_first_name, leah_surname, sammy_first_name, sammy_surname, confirmed_at) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (leah_first_name, leah_surname, sammy_first_name, sammy_surname) DO UPDATE SET confirmed_at = excluded.confirmed_at",
+                    [(*lname, *sname, confirmed_at) for lname, sname in new_pairs],
+                )
+        except sqlite3.Error:
+            return 0
+        self.saved.update(new_pairs)
+        return len(new_pairs)
@@ -1,5 +1,255 @@
+import re
+import numpy as np
 import pandas as pd
-from fuzzywuzzy import fuzz
+from rapidfuzz import process
+from rapidfuzz.distance import Indel
+from .names import normalise_name
+
+# Above this many candidates, get_close_matches only scores those that share a block with the swimmer
+BLOCKING_MIN_CANDIDATES = 2000
+# If fewer blocked candidates than this (a full page) pass the score cutoff, or none of them scores at least
+# BLOCKING_MIN_SCORE, every candidate is scored after all
+BLOCKING_MIN_RESULTS = 25
+BLOCKING_MIN_SCORE = 70
+# Swimmers assigned a candidate with at least this similarity are matched without asking
+ASSIGNMENT_MIN_SCORE = 90
+# The confirmation dialogs get this many candidates at a time, and only those with at least this similarity
+# (the others can still be searched for)
+CANDIDATE_PAGE_SIZE = 25
+CANDIDATE_MIN_SCORE = 40
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def soundex(name: str) -> str:
+    '''
+    American Soundex code of a name, e.g. "robert" and "rupert" -> "r163".
+    '''
+    letters = re.sub(r"[^a-z]", "", name.lower())
+    if not letters:
+        return ""
+    code = letters[0]
+    previous = SOUNDEX_CODES.get(letters[0])
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter)
+        if digit is not None and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # "h" and "w" do not separate letters with the same code, vowels do
+        if letter not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+def get_blocking_keys(surname: str) -> tuple[set[str], set[str]]:
+    '''
+    Return the blocks of a surname: its letter trigrams (padded, so short names have some) and the Soundex
+    codes of the whole surname and of each of its words. Punctuation and spaces are ignored, so that
+    "O'Neil" and "Oneil", or "Van der Berg" and "Vanderberg", share their trigrams.
+    '''
+    words = re.findall(r"[a-z]+", surname.lower())
+    letters = "".join(words)
+    padded = f"$${letters}$"
+    trigrams = {padded[i:i + 3] for i in range(len(padded) - 2)}
+    phonetic = {soundex(word) for word in words + [letters] if word}
+    return trigrams, phonetic
+
+
+class BlockingIndex:
+    '''
+    Inverted index from the blocks of each surname (see get_blocking_keys) to the rows with that surname,
+    so that a swimmer is only scored against the rows that look or sound like it.
+    '''
+    def __init__(self, surnames: list[str]):
+        trigram_rows = {}
+        phonetic_rows = {}
+        for position, surname in enumerate(surnames):
+            trigrams, phonetic = get_blocking_keys(surname)
+            for trigram in trigrams:
+                trigram_rows.setdefault(trigram, []).append(position)
+            for code in phonetic:
+                phonetic_rows.setdefault(code, []).append(position)
+        self.num_rows = len(surnames)
+        self.trigrams = {trigram: np.array(rows, dtype=np.int64) for trigram, rows in trigram_rows.items()}
+        self.phonetic = {code: np.array(rows, dtype=np.int64) for code, rows in phonetic_rows.items()}
+
+    def get_candidates(self, surname: str) -> np.ndarray:
+        '''
+        Return the (sorted) rows whose surname sounds the same as this one, or shares at least a third of its
+        trigrams. A single typo changes at most three trigrams, so misspelt surnames still share most of theirs.
+        '''
+        trigrams, phonetic = get_blocking_keys(surname)
+        postings = [self.trigrams[trigram] for trigram in trigrams if trigram in self.trigrams]
+        candidates = np.zeros(self.num_rows, dtype=bool)
+        if postings:
+            shared = np.bincount(np.concatenate(postings), minlength=self.num_rows)
+            candidates |= shared >= max(1, len(trigrams) // 3)
+        for code in phonetic:
+            if code in self.phonetic:
+                candidates[self.phonetic[code]] = True
+        return np.flatnonzero(candidates)
+
+
+def fits_event(swimmer_context: tuple[int, int, str], event_context: tuple[int, int, str]) -> bool:
+    '''
+    Check if a swimmer can swim in an event, given the (age from, age to, gender) of both:
+    the genders must be the same and the age ranges must overlap.
+    '''
+    age_from, age_to, gender = swimmer_context
+    event_age_from, event_age_to, event_gender = event_context
+    return gender == event_gender and age_from <= event_age_to and event_age_from <= age_to
+
+
+def normalise_membership_number(value) -> str | None:
+    '''
+    Normalise a membership (ASA) number read from a spreadsheet, or return None if there is none.
+    e.g. 123456.0, " 0123456" and "123456" -> "123456"
+    '''
+    if value is None or pd.isnull(value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    number = re.sub(r"\s", "", str(value)).upper()
+    if number.isdigit():
+        number = number.lstrip("0")
+    return number or None
+
+
+class NameIndex:
+    '''
+    Hash index of the swimmer names of a qualifiers table (in Sammy's format), built once per table.
+    - rows: (first name, surname) -> positions of the rows with that name
+    - exact: the key of "first name surname" (see normalise_name) -> the names that would score 100% against it,
+      in table order
+    - choices: the key of "first name surname" of each row, scored in one batch by get_close_matches
+    - blocking: for large tables, a BlockingIndex of the surnames of the choices
+    - members: membership (ASA) number -> name, for the numbers that belong to a single name
+    - contexts: given the swimmer info (age from, age to, gender) of each name, the (age from, age to, gender)
+      of each group of rows -> their positions, to partition the table by event (see for_event)
+    '''
+    def __init__(
+            self,
+            qualifiers_table: pd.DataFrame,
+            sfirst_name_col: str = "First name",
+            ssurname_col: str = "Surname",
+            swimmer_info: dict | None = None,
+            membership_col: str = "ASA",
+    ):
+        self.table = qualifiers_table
+        self.swimmer_info = swimmer_info or {}
+        self.sfirst_name_col = sfirst_name_col
+        self.ssurname_col = ssurname_col
+        self.rows = {}
+        self.exact = {}
+        self.row_names = [] # Name of each row that can be scored
+        self.choices = []
+        self.name_ids = {} # Name -> id, so that excluded names can be masked in one go
+        row_name_ids = []
+        surnames = []
+        for position, name in enumerate(zip(qualifiers_table[sfirst_name_col], qualifiers_table[ssurname_col])):
+            sfirst_name, ssurname = name
+            is_name = isinstance(sfirst_name, str) and isinstance(ssurname, str)
+            if name not in self.rows:
+                self.rows[name] = []
+                if is_name:
+                    self.exact.setdefault(normalise_name(sfirst_name + " " + ssurname), []).append(name)
+            self.rows[name].append(position)
+            if is_name:
+                self.row_names.append(name)
+                self.choices.append(normalise_name(sfirst_name + " " + ssurname))
+                row_name_ids.append(self.name_ids.setdefault(name, len(self.name_ids)))
+                surnames.append(normalise_name(ssurname))
+        self.row_name_ids = np.array(row_name_ids, dtype=np.int64)
+        self.choice_lengths = np.array([len(choice) for choice in self.choices], dtype=np.int64)
+        self.blocking = BlockingIndex(surnames) if len(surnames) >= BLOCKING_MIN_CANDIDATES else None
+
+        # A number shared by different names can't be trusted to pick one
+        self.members = {}
+        if membership_col in qualifiers_table.columns:
+            ambiguous = set()
+            names = zip(qualifiers_table[sfirst_name_col], qualifiers_table[ssurname_col])
+            for value, name in zip(qualifiers_table[membership_col], names):
+                number = normalise_membership_number(value)
+                if number is None or not all(isinstance(part, str) for part in name):
+                    continue
+                if self.members.setdefault(number, name) != name:
+                    ambiguous.add(number)
+            for number in ambiguous:
+                del self.members[number]
+
+        # Rows without swimmer info (None) are in every partition
+        self.contexts = {}
+        if swimmer_info is not None:
+            for name, positions in self.rows.items():
+                self.contexts.setdefault(swimmer_info.get(name), []).extend(positions)
+        self.pools = {} # Event context -> NameIndex of the rows that fit it
+
+    def for_event(self, event_context: tuple[int, int, str] | None) -> "NameIndex":
+        '''
+        Return the index of the rows whose age range and gender fit the event (age from, age to, gender),
+        built once per event context. Without swimmer info or event context, or if no row fits the event,
+        that is the whole index.
+        '''
+        if event_context is None or not self.contexts:
+            return self
+        if event_context not in self.pools:
+            positions = sorted(
+                position
+                for context, context_positions in self.contexts.items()
+                if context is None or fits_event(context, event_context)
+                for position in context_positions
+            )
+            if not positions or len(positions) == len(self.table):
+                self.pools[event_context] = self
+            else:
+                self.pools[event_context] = NameIndex(self.table.iloc[positions], self.sfirst_name_col, self.ssurname_col)
+        return self.pools[event_context]
+
+    def has_unmatched(self, matched) -> bool:
+        '''
+        Return whether any row is of a swimmer whose name is not in `matched`.
+        '''
+        matched_ids = [self.name_ids[name] for name in matched if name in self.name_ids]
+        return not np.isin(self.row_name_ids, matched_ids).all()
+
+    def get_swimmer(self, sfirst_name: str, ssurname: str) -> pd.DataFrame:
+        '''
+        Return the rows of the swimmer with this name (same as filtering the table on both columns).
+        '''
+        return self.table.iloc[self.rows.get((sfirst_name, ssurname), [])]
+
+    def find_member(self, value) -> tuple[str, str] | None:
+        '''
+        Return the name of the swimmer with this membership (ASA) number, or None if it is missing or unknown.
+        '''
+        number = normalise_membership_number(value)
+        return self.members.get(number) if number is not None else None
+
+    def find_exact(self, lfirst_name: str, lsurname: str, matched) -> tuple[str, str] | None:
+        '''
+        Return the first name in the table that matches the given Leah swimmer exactly, skipping the names
+        in `matched` (a set of the names already matched), or None.
+        '''
+        for name in self.exact.get(normalise_name(lfirst_name + " " + lsurname), []):
+            if name not in matched:
+                return name
+        return None
+
+
+def score_choices(query: str, choices: list[str], lengths: np.ndarray) -> np.ndarray:
+    '''
+    Score a normalised name against normalised choices (of the given lengths) in one batch.
+    '''
+    distances = process.cdist([query], choices, scorer=Indel.distance, dtype=np.int64)[0]
+    lensum = len(query) + lengths
+    return np.rint(100 * ((lensum - distances) / lensum)).astype(np.int64)
 
 
 def get_close_matches(
@@ -10,20 +260,273 @@ def get_close_matches(
         manual_matches: dict,
         sfirst_name_col: str = "First name",
         ssurname_col: str = "Surname",
+        score_cutoff: int | None = None,
+        limit: int | None = None,
+        name_index: NameIndex | None = None,
+        blocked: bool = False,
 ) -> list[tuple[str, str, int]]:
     '''
-    Get the closest matches for a swimmer in Sammy's version.
+    Get the closest matches for a swimmer in Sammy's version, best first (ties in table order).
+    The swimmer is scored against every row in one batch. Scores are the fuzz.ratio similarity (0-100),
+    computed from the Indel distance like fuzzywuzzy does.
+    If `blocked` and the table is large, only the rows that share a block with the swimmer's surname are scored
+    (and returned), unless fewer than BLOCKING_MIN_RESULTS of them pass the cutoff or none of them scores at
+    least BLOCKING_MIN_SCORE: every row is scored then. The swimmer is almost always among the blocked rows
+    (see benchmarks/bench_blocking.py), and the others can still be searched for by name.
+    Only scores of at least `score_cutoff` are kept, and only the best `limit` matches, if given.
     '''
-    scores = []
-    for _, srow in qualifiers_table.iterrows():
-        # Skip automatic and manual matches
-        if (srow[sfirst_name_col], srow[ssurname_col]) in automatic_matches.values() or \
-            (srow[sfirst_name_col], srow[ssurname_col]) in manual_matches.values():
-            continue
+    if name_index is None:
+        name_index = NameIndex(qualifiers_table, sfirst_name_col, ssurname_col)
+
+    # Names already matched are skipped
+    matched = set(automatic_matches.values()) | set(manual_matches.values())
+
+    return rank_close_matches(name_index, lfirst_name, lsurname, matched, score_cutoff, limit, blocked)[0]
+
+
+def rank_close_matches(
+        name_index: NameIndex,
+        lfirst_name: str,
+        lsurname: str,
+        matched,
+        score_cutoff: int | None = None,
+        limit: int | None = None,
+        blocked: bool = False,
+) -> tuple[list[tuple[str, str, int]], int]:
+    '''
+    Rank the closest matches for a swimmer among the rows of name_index, except the names in `matched`
+    (see get_close_matches).
+    Returns the best `limit` matches, and how many matches there are in all, so that the others can be
+    ranked later without sorting every row now.
+    '''
+    if not name_index.choices:
+        return [], 0
+
+    query = normalise_name(lfirst_name + " " + lsurname)
+
+    def score(positions=None):
+        if positions is None:
+            return score_choices(query, name_index.choices, name_index.choice_lengths)
+        return score_choices(query, [name_index.choices[p] for p in positions], name_index.choice_lengths[positions])
+
+    keep = np.ones(len(name_index.choices), dtype=bool)
+    matched_ids = [name_index.name_ids[name] for name in matched if name in name_index.name_ids]
+    if matched_ids:
+        keep &= ~np.isin(name_index.row_name_ids, matched_ids)
+
+    if blocked and name_index.blocking is not None:
+        # Unscored rows keep a score of -1
+        candidates = name_index.blocking.get_candidates(normalise_name(lsurname))
+        candidates = candidates[keep[candidates]]
+        scores = np.full(len(name_index.choices), -1, dtype=np.int64)
+        scores[candidates] = score(candidates)
+        found = scores[candidates]
+        if score_cutoff is not None:
+            found = found[found >= score_cutoff]
+        if len(found) < BLOCKING_MIN_RESULTS or not (found >= BLOCKING_MIN_SCORE).any():
+            scores = score()
+        else:
+            keep &= scores >= 0
+    else:
+        scores = score()
+
+    if score_cutoff is not None:
+        keep &= scores >= score_cutoff
+    positions = np.flatnonzero(keep)
+    total = len(positions)
 
-        scores.append((srow[sfirst_name_col], srow[ssurname_col], fuzz.ratio(lfirst_name + " " + lsurname, srow[sfirst_name_col].lower() + " " + srow[ssurname_col].lower())))
-    scores.sort(key=lambda x: x[2], reverse=True)
-    return scores
+    # Best first, and equal scores in table order: one distinct key per row
+    order_keys = (100 - scores[positions]) * len(name_index.choices) + positions
+    if limit is not None and limit < total:
+        # Only sort the best `limit` rows
+        best = np.argpartition(order_keys, limit)[:limit]
+        positions, order_keys = positions[best], order_keys[best]
+    positions = positions[np.argsort(order_keys)]
+
+    return [(*name_index.row_names[position], int(scores[position])) for position in positions], total
+
+
+def linear_sum_assignment(cost: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Solve the linear sum assignment problem: pick at most one column per row and one row per column,
+    for as many rows (or columns) as possible, with the smallest total cost.
+    Same result as scipy.optimize.linear_sum_assignment: (rows, columns), sorted by row.
+    This is the shortest augmenting path version of the Hungarian algorithm, O(n^2 m), with the inner
+    loop over columns vectorised.
+    '''
+    cost = np.asarray(cost, dtype=float)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    num_rows, num_cols = cost.shape
+
+    # Potentials of the rows and columns, and the row assigned to each column, with a dummy column 0
+    # (rows are 1-based here, 0 is unassigned)
+    u = np.zeros(num_rows + 1)
+    v = np.zeros(num_cols + 1)
+    assigned_row = np.zeros(num_cols + 1, dtype=np.int64)
+    previous_col = np.zeros(num_cols + 1, dtype=np.int64)
+
+    for row in range(1, num_rows + 1):
+        # Find the shortest augmenting path from this row to a free column
+        assigned_row[0] = row
+        col = 0
+        min_reduced = np.full(num_cols + 1, np.inf)
+        used = np.zeros(num_cols + 1, dtype=bool)
+        while True:
+            used[col] = True
+            current_row = assigned_row[col]
+            free = ~used[1:]
+            reduced = cost[current_row - 1] - u[current_row] - v[1:]
+            better = free & (reduced < min_reduced[1:])
+            min_reduced[1:][better] = reduced[better]
+            previous_col[1:][better] = col
+
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            next_col = int(np.argmin(candidates)) + 1
+            delta = candidates[next_col - 1]
+
+            used_cols = np.flatnonzero(used)
+            u[assigned_row[used_cols]] += delta
+            v[used_cols] -= delta
+            min_reduced[1:][free] -= delta
+
+            col = next_col
+            if assigned_row[col] == 0:
+                break
+
+        # Flip the assignments along the path
+        while col:
+            prev = previous_col[col]
+            assigned_row[col] = assigned_row[prev]
+            col = prev
+
+    cols = np.flatnonzero(assigned_row[1:])
+    rows = assigned_row[1:][cols] - 1
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def assign_matches(
+        leah_names: list[tuple[str, str]],
+        name_index: NameIndex,
+        automatic_matches: dict,
+        manual_matches: dict,
+        event_contexts: list[tuple[int, int, str] | None] | None = None,
+) -> dict[tuple[str, str], tuple[str, str, int]]:
+    '''
+    Assign each of the Leah swimmers a different swimmer of Sammy's that isn't matched yet, so that the
+    total similarity is the highest: one swimmer's best candidate is not taken by another who fits it less.
+    The similarity matrix is computed in one batch. Given the event context of each Leah swimmer,
+    candidates who don't fit it score 0, unless none does.
+    Returns Leah's name -> (first name, surname, similarity) of the assigned swimmer.
+    '''
+    matched = set(automatic_matches.values()) | set(manual_matches.values())
+    names = [name for name in name_index.name_ids if name not in matched]
+    if not leah_names or not names:
+        return {}
+
+    queries = [normalise_name(lfirst_name + " " + lsurname) for lfirst_name, lsurname in leah_names]
+    choices = [normalise_name(sfirst_name + " " + ssurname) for sfirst_name, ssurname in names]
+    distances = process.cdist(queries, choices, scorer=Indel.distance, dtype=np.int64)
+    lensum = np.array([len(query) for query in queries])[:, None] + np.array([len(choice) for choice in choices])[None, :]
+    scores = np.rint(100 * ((lensum - distances) / lensum)).astype(np.int64)
+
+    if event_contexts is not None and name_index.swimmer_info:
+        swimmer_contexts = [name_index.swimmer_info.get(name) for name in names]
+        fits = {} # Event context -> candidates who fit it
+        for row, event_context in enumerate(event_contexts):
+            if event_context is None:
+                continue
+            if event_context not in fits:
+                fits[event_context] = np.array([
+                    context is None or fits_event(context, event_context) for context in swimmer_contexts
+                ])
+            if fits[event_context].any():
+                scores[row, ~fits[event_context]] = 0
+
+    rows, cols = linear_sum_assignment(-scores)
+    return {leah_names[row]: (*names[col], int(scores[row, col])) for row, col in zip(rows, cols)}
+
+
+def format_candidates(scores: list[tuple[str, str, int]]) -> list[dict]:
+    '''
+    Format scored candidates (first name, surname, similarity) for the confirmation dialog.
+    '''
+    return [
+        {
+            "sfirst_name": sfirst_name,
+            "ssurname": ssurname,
+            "sammy_name": f"{sfirst_name.capitalize()} {ssurname.capitalize()}",
+            "similarity": score,
+        }
+        for sfirst_name, ssurname, score in scores
+    ]
+
+
+def get_candidate_data(
+    lfirst_name: str,
+    lsurname: str,
+    name_index: NameIndex,
+    matched=(),
+    event_context: tuple[int, int, str] | None = None,
+    scores: list[tuple[str, str, int]] | None = None,
+) -> dict:
+    '''
+    Return the candidate fields of a confirmation request, so that the dialog only gets one page of candidates
+    whatever the size of the table. Candidates are the swimmers who fit the event (in a large table, those who
+    share a block with the surname), like in find_swimmer, except those in `matched`:
+    - candidates: the best CANDIDATE_PAGE_SIZE candidates with at least CANDIDATE_MIN_SCORE similarity
+    - total_candidates: how many candidates have at least CANDIDATE_MIN_SCORE similarity
+    - more_candidates(offset): the page of those candidates starting at offset
+    - search_candidates(text): the best page of swimmers whose name contains text, whatever their similarity
+    The first page is taken from `scores` (best first) if they were already ranked, e.g. by find_swimmer.
+    '''
+    # Only count the candidates if the first page is known
+    limit = 0 if scores is not None else CANDIDATE_PAGE_SIZE
+
+    # Look among all swimmers if none of those who fit the event is left
+    pool = name_index.for_event(event_context)
+    if not pool.has_unmatched(matched):
+        pool = name_index
+    page, total = rank_close_matches(pool, lfirst_name, lsurname, matched, CANDIDATE_MIN_SCORE, limit, blocked=True)
+    if scores is not None:
+        page = [score for score in scores if score[2] >= CANDIDATE_MIN_SCORE and score[:2] not in matched]
+        page = page[:CANDIDATE_PAGE_SIZE]
+        # Rank again if some of them were matched since they were scored
+        if len(page) < min(total, CANDIDATE_PAGE_SIZE):
+            page, _ = rank_close_matches(pool, lfirst_name, lsurname, matched, CANDIDATE_MIN_SCORE, CANDIDATE_PAGE_SIZE, blocked=True)
+
+    def more_candidates(offset: int) -> list[dict]:
+        if offset >= total:
+            return []
+        ranked, _ = rank_close_matches(pool, lfirst_name, lsurname, matched, CANDIDATE_MIN_SCORE, offset + CANDIDATE_PAGE_SIZE, blocked=True)
+        return format_candidates(ranked[offset:])
+
+    def search_candidates(text: str) -> list[dict]:
+        text = normalise_name(text)
+        if not text:
+            return format_candidates(page)
+        excluded = set(matched)
+        positions = [
+            position for position, choice in enumerate(name_index.choices)
+            if text in choice and name_index.row_names[position] not in excluded
+        ]
+        if not positions:
+            return []
+        query = normalise_name(lfirst_name + " " + lsurname)
+        found = score_choices(query, [name_index.choices[p] for p in positions], name_index.choice_lengths[positions])
+        best = np.argsort(-found, kind="stable")[:CANDIDATE_PAGE_SIZE]
+        return format_candidates([(*name_index.row_names[positions[i]], int(found[i])) for i in best])
+
+    return {
+        "candidates": format_candidates(page),
+        "total_candidates": total,
+        "more_candidates": more_candidates,
+        "search_candidates": search_candidates,
+    }
 
 
 def prompt_manual_match(
@@ -36,29 +539,27 @@ def prompt_manual_match(
     confirm_callback,
     sfirst_name_col: str = "First name",
     ssurname_col: str = "Surname",
+    name_index: NameIndex | None = None,
+    automatic_matches: dict[tuple[str, str], tuple[str, str]] | None = None,
+    event_context: tuple[int, int, str] | None = None,
 ) -> pd.DataFrame:
     """
-    Prompt the user to manually confirm a match from a list of scored candidates.
+    Prompt the user to manually confirm a match from the closest candidates, best first (see find_swimmer).
+    The dialog gets them a page at a time, and can search the other swimmers (see get_candidate_data).
     Returns the matched swimmer DataFrame.
     """
     progress_callback(f"Trying to match... {lfirst_name.capitalize()} {lsurname.capitalize()}", "yellow")
 
-    candidates = [
-        {
-            "sfirst_name": sfirst_name,
-            "ssurname": ssurname,
-            "sammy_name": f"{sfirst_name.capitalize()} {ssurname.capitalize()}",
-            "similarity": score,
-        }
-        for sfirst_name, ssurname, score in scores
-    ]
+    if name_index is None:
+        name_index = NameIndex(qualifiers_table, sfirst_name_col, ssurname_col)
+    matched = set(manual_matches.values()) | set((automatic_matches or {}).values())
 
     match_data = {
         "mode": "manual_match_list",
         "leah_name": f"{lfirst_name.capitalize()} {lsurname.capitalize()}",
         "leah_first_name": lfirst_name,
         "leah_surname": lsurname,
-        "candidates": candidates,
+        **get_candidate_data(lfirst_name, lsurname, name_index, matched, event_context, scores),
     }
 
     response = confirm_callback(match_data)
@@ -84,10 +585,7 @@ def prompt_manual_match(
             return pd.DataFrame()
 
         manual_matches[(lfirst_name, lsurname)] = (sfirst_name, ssurname)
-        swimmer = qualifiers_table[
-            (qualifiers_table[sfirst_name_col] == sfirst_name) &
-            (qualifiers_table[ssurname_col] == ssurname)
-        ]
+        swimmer = name_index.get_swimmer(sfirst_name, ssurname)
         progress_callback(
             f"Manual match confirmed: {lfirst_name.capitalize()} {lsurname.capitalize()} -> {str(sfirst_name).capitalize()} {str(ssurname).capitalize()}",
             "green",
@@ -98,53 +596,70 @@ def prompt_manual_match(
     return pd.DataFrame()
 
 
-def match_swimmer(
+def find_swimmer(
     lfirst_name: str,
     lsurname: str,
     qualifiers_table: pd.DataFrame,
     automatic_matches: dict[tuple[str, str], tuple[str, str]],
     manual_matches: dict[tuple[str, str], tuple[str, str]],
     progress_callback,
-    confirm_callback,
     sfirst_name_col: str = "First name",
     ssurname_col: str = "Surname",
-) -> pd.DataFrame:
+    name_index: NameIndex | None = None,
+    event_context: tuple[int, int, str] | None = None,
+    known_matches: dict[tuple[str, str], list[tuple[str, str]]] | None = None,
+) -> tuple[pd.DataFrame | None, list[tuple[str, str, int]]]:
     """
-    Find and return the swimmer row in qualifiers_table matching the given Leah swimmer.
-    
-    Args:
-        lfirst_name: First name from Leah's file
-        lsurname: Surname from Leah's file
-        qualifiers_table: Sammy's qualifiers DataFrame
-        automatic_matches: Dict of previously confirmed automatic matches
-        manual_matches: Dict of previously confirmed manual matches
-        progress_callback: Callback for progress messages (message, color)
-        confirm_callback: Callback for user confirmations (message, data) -> response
-        sfirst_name_col: Column name for first name in Sammy's file
-        ssurname_col: Column name for surname in Sammy's file
+    Find the swimmer row in qualifiers_table matching the given Leah swimmer, without asking the user.
+    Returns the swimmer and no candidates, or None and the first page of scored candidates to confirm
+    by hand (best first, and empty if none scores at least CANDIDATE_MIN_SCORE).
+    See match_swimmer for the arguments.
     """
+    if name_index is None:
+        name_index = NameIndex(qualifiers_table, sfirst_name_col, ssurname_col)
+    # Swimmers who fit the event
+    pool = name_index.for_event(event_context)
+
     # Check automatic matches first
     key = (lfirst_name, lsurname)
     if key in automatic_matches:
         sfirst, ssurname = automatic_matches[key]
-        swimmer = qualifiers_table[
-            (qualifiers_table[sfirst_name_col] == sfirst) &
-            (qualifiers_table[ssurname_col] == ssurname)
-        ]
+        swimmer = name_index.get_swimmer(sfirst, ssurname)
         progress_callback(f"Found automatic match: {lfirst_name.capitalize()} {lsurname.capitalize()}", "green")
-        return swimmer
+        return swimmer, []
     
     # Check manual matches already confirmed
     if key in manual_matches:
         sfirst, ssurname = manual_matches[key]
-        swimmer = qualifiers_table[
-            (qualifiers_table[sfirst_name_col] == sfirst) &
-            (qualifiers_table[ssurname_col] == ssurname)
-        ]
+        swimmer = name_index.get_swimmer(sfirst, ssurname)
         progress_callback(f"Found previous manual match: {lfirst_name.capitalize()} {lsurname.capitalize()}", "green")
-        return swimmer
+        return swimmer, []
 
-    # Compute close matches
+    # Names already matched, looked up in one set from here on
+    matched = set(automatic_matches.values()) | set(manual_matches.values())
+
+    # Exact match (100% similarity), found without scoring every swimmer.
+    # A swimmer with the exact name outside of the event's age range or gender still matches.
+    exact_name = pool.find_exact(lfirst_name, lsurname, matched)
+    if exact_name is None and pool is not name_index:
+        exact_name = name_index.find_exact(lfirst_name, lsurname, matched)
+    if exact_name is not None:
+        sfirst, ssurname = exact_name
+        automatic_matches[key] = (sfirst, ssurname)
+        swimmer = name_index.get_swimmer(sfirst, ssurname)
+        progress_callback(f"Found exact match: {lfirst_name.capitalize()} {lsurname.capitalize()} -> {sfirst.capitalize()} {ssurname.capitalize()}", "green")
+        return swimmer, []
+
+    # Match confirmed in a previous run, if that swimmer is in the table and not matched yet
+    if known_matches and key in known_matches:
+        for sfirst, ssurname in known_matches[key]:
+            if (sfirst, ssurname) in name_index.rows and (sfirst, ssurname) not in matched:
+                manual_matches[key] = (sfirst, ssurname)
+                swimmer = name_index.get_swimmer(sfirst, ssurname)
+                progress_callback(f"Found remembered match: {lfirst_name.capitalize()} {lsurname.capitalize()} -> {str(sfirst).capitalize()} {str(ssurname).capitalize()}", "green")
+                return swimmer, []
+
+    # Compute close matches. In large tables, only the swimmers who share a block with the surname are scored.
     scores = get_close_matches(
         qualifiers_table,
         lfirst_name,
@@ -152,27 +667,102 @@ def match_swimmer(
         automatic_matches,
         manual_matches,
         sfirst_name_col=sfirst_name_col,
-        ssurname_col=ssurname_col
+        ssurname_col=ssurname_col,
+        score_cutoff=CANDIDATE_MIN_SCORE,
+        limit=CANDIDATE_PAGE_SIZE,
+        name_index=pool,
+        blocked=True,
     )
+    # Look among all swimmers if none of those who fit the event is left
+    if not scores and pool is not name_index and not pool.has_unmatched(matched):
+        scores = get_close_matches(
+            qualifiers_table,
+            lfirst_name,
+            lsurname,
+            automatic_matches,
+            manual_matches,
+            sfirst_name_col=sfirst_name_col,
+            ssurname_col=ssurname_col,
+            score_cutoff=CANDIDATE_MIN_SCORE,
+            limit=CANDIDATE_PAGE_SIZE,
+            name_index=name_index,
+            blocked=True,
+        )
     
     if not scores:
-        error_msg = f"No potential matches found in qualifiers table for: {lfirst_name.capitalize()} {lsurname.capitalize()}"
-        progress_callback(error_msg, "red")
-        return pd.DataFrame()
-    
+        return None, []
+
     first_candidate = scores[0]
 
-    # Exact match (100% similarity)
+    # Near-identical long names can still round to 100% similarity
     if first_candidate[2] == 100:
         sfirst, ssurname = first_candidate[0], first_candidate[1]
         automatic_matches[key] = (sfirst, ssurname)
-        swimmer = qualifiers_table[
-            (qualifiers_table[sfirst_name_col] == sfirst) &
-            (qualifiers_table[ssurname_col] == ssurname)
-        ]
+        swimmer = name_index.get_swimmer(sfirst, ssurname)
         progress_callback(f"Found exact match: {lfirst_name.capitalize()} {lsurname.capitalize()} -> {sfirst.capitalize()} {ssurname.capitalize()}", "green")
+        return swimmer, []
+
+    return None, scores
+
+
+def match_swimmer(
+    lfirst_name: str,
+    lsurname: str,
+    qualifiers_table: pd.DataFrame,
+    automatic_matches: dict[tuple[str, str], tuple[str, str]],
+    manual_matches: dict[tuple[str, str], tuple[str, str]],
+    progress_callback,
+    confirm_callback,
+    sfirst_name_col: str = "First name",
+    ssurname_col: str = "Surname",
+    name_index: NameIndex | None = None,
+    event_context: tuple[int, int, str] | None = None,
+    known_matches: dict[tuple[str, str], list[tuple[str, str]]] | None = None,
+) -> pd.DataFrame:
+    """
+    Find and return the swimmer row in qualifiers_table matching the given Leah swimmer.
+    If it can't be found automatically, the user is asked to pick it from the closest matches.
+    
+    Args:
+
+        lfirst_name: First name from Leah's file
+        lsurname: Surname from Leah's file
+        qualifiers_table: Sammy's qualifiers DataFrame
+        automatic_matches: Dict of previously confirmed automatic matches
+        manual_matches: Dict of previously confirmed manual matches
+        progress_callback: Callback for progress messages (message, color)
+        confirm_callback: Callback for user confirmations (message, data) -> response
+        sfirst_name_col: Column name for first name in Sammy's file
+        ssurname_col: Column name for surname in Sammy's file
+        name_index: NameIndex of qualifiers_table, built once by the caller when matching many swimmers
+        event_context: (age from, age to, gender) of the event, to only look for the swimmer among those
+            who fit it (see NameIndex.for_event)
+        known_matches: Matches confirmed in previous runs (see IdentityStore), Leah's name -> Sammy's names
+    """
+    if name_index is None:
+        name_index = NameIndex(qualifiers_table, sfirst_name_col, ssurname_col)
+
+    swimmer, scores = find_swimmer(
+        lfirst_name,
+        lsurname,
+        qualifiers_table,
+        automatic_matches,
+        manual_matches,
+        progress_callback,
+        sfirst_name_col=sfirst_name_col,
+        ssurname_col=ssurname_col,
+        name_index=name_index,
+        event_context=event_context,
+        known_matches=known_matches,
+    )
+    if swimmer is not None:
         return swimmer
 
+    if not scores:
+        error_msg = f"No potential matches found in qualifiers table for: {lfirst_name.capitalize()} {lsurname.capitalize()}"
+        progress_callback(error_msg, "red")
+        return pd.DataFrame()
+
     # Otherwise, prompt for manual match
     progress_callback(f"No exact match found for {lfirst_name.capitalize()} {lsurname.capitalize()}, requesting manual confirmation...", "yellow")
     
@@ -186,4 +776,61 @@ def match_swimmer(
         ssurname_col=ssurname_col,
         progress_callback=progress_callback,
         confirm_callback=confirm_callback,
+        name_index=name_index,
+        automatic_matches=automatic_matches,
+        event_context=event_context,
     )
+
+
+def prompt_batch_review(
+    unresolved: list[tuple[str, str, list[tuple[str, str, int]], list[str], tuple[int, int, str] | None]],
+    manual_matches: dict[tuple[str, str], tuple[str, str]],
+    progress_callback,
+    confirm_callback,
+    name_index: NameIndex,
+    automatic_matches: dict[tuple[str, str], tuple[str, str]] | None = None,
+) -> None:
+    """
+    Prompt the user to review every unresolved swimmer at once, instead of one dialog per swimmer.
+    Each unresolved swimmer is (Leah first name, Leah surname, scored candidates, events, event context),
+    and gets its candidates a page at a time like in prompt_manual_match.
+    Accepted matches are added to manual_matches, and the other swimmers are ignored.
+    """
+    matched = set(manual_matches.values()) | set((automatic_matches or {}).values())
+    match_data = {
+        "mode": "manual_match_batch",
+        "swimmers": [
+            {
+                "leah_name": f"{lfirst_name.capitalize()} {lsurname.capitalize()}",
+                "leah_first_name": lfirst_name,
+                "leah_surname": lsurname,
+                "events": events,
+                **get_candidate_data(lfirst_name, lsurname, name_index, matched, event_context, scores),
+            }
+            for lfirst_name, lsurname, scores, events, event_context in unresolved
+        ],
+    }
+
+    response = confirm_callback(match_data)
+
+    if not isinstance(response, dict):
+        raise ValueError("confirm_callback must return a dict with an 'action' field")
+
+    if str(response.get("action", "")).lower() == "exit":
+        raise KeyboardInterrupt("User cancelled operation")
+
+    # One decision per swimmer, in order. Missing decisions are ignored.
+    decisions = list(response.get("decisions", []))
+    decisions += [{"action": "ignore"}] * (len(unresolved) - len(decisions))
+
+    for (lfirst_name, lsurname, *_), decision in zip(unresolved, decisions):
+        sfirst_name = decision.get("sfirst_name")
+        ssurname = decision.get("ssurname")
+        if str(decision.get("action", "")).lower() == "accept" and sfirst_name and ssurname:
+            manual_matches[(lfirst_name, lsurname)] = (sfirst_name, ssurname)
+            progress_callback(
+                f"Manual match confirmed: {lfirst_name.capitalize()} {lsurname.capitalize()} -> {str(sfirst_name).capitalize()} {str(ssurname).capitalize()}",
+                "green",
+            )
+        else:
+            progress_callback(f"Ignored swimmer: {lfirst_name.capitalize()} {lsurname.capitalize()}", "yellow")
@@ -0,0 +1,49 @@
+'''
+Normalised swimmer names, shared by the tools so that names are cleaned and folded once per table
+instead of on every comparison.
+'''
+
+import unicodedata
+from functools import lru_cache
+import pandas as pd
+
+NAME_KEY_COLUMN = "Name key"
+
+
+@lru_cache(maxsize=65536)
+def normalise_name(name: str) -> str:
+    '''
+    Return the key of a name, equal for names that only differ by case, accents, spacing or the garbage
+    " -" left by reading the PDF.
+    e.g. "Zoë  O'Neil -" -> "zoe o'neil"
+    '''
+    name = str(name).replace(" -", "")
+    # Fold accents: decompose the letters, then drop the combining marks
+    name = "".join(char for char in unicodedata.normalize("NFKD", name) if not unicodedata.combining(char))
+    return " ".join(name.casefold().split())
+
+def get_name_keys(names) -> pd.Categorical:
+    '''
+    Return the normalised keys of a sequence of names, as a categorical (each distinct key is stored once,
+    and rows are integer codes into them).
+    '''
+    return pd.Categorical([normalise_name(name) for name in names])
+
+def add_name_keys(table: pd.DataFrame, name_col: str = "Name", key_col: str = NAME_KEY_COLUMN) -> pd.DataFrame:
+    '''
+    Add the normalised keys of a name column to a table, as a categorical column.
+    '''
+    table[key_col] = get_name_keys(table[name_col])
+    return table
+
+def get_key_rows(table: pd.DataFrame, key_col: str = NAME_KEY_COLUMN) -> dict[str, list]:
+    '''
+    Return the index labels of the rows of each name key, in table order.
+    '''
+    codes = table[key_col].cat.codes.to_numpy()
+    categories = table[key_col].cat.categories
+    rows = {}
+    for label, code in zip(table.index, codes):
+        if code >= 0:
+            rows.setdefault(categories[code], []).append(label)
+    return rows
@@ -1,12 +1,43 @@
+import hashlib
+import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import pandas as pd
 from pypdf import PdfReader
 
 
 REGEX_EVENT_NAME = r"\b(25|50|100|200)\s*SC\s*Meter\s*(Freestyle|Backstroke|Breaststroke|Butterfly|IM)"
 
+REGEX_EVENT_NUMBER = r"^\s*Event\s*(\d+)"
+
 KEYWORDS = ['NT', 'NS', 'DQ']
 
+REGEX_TIME = re.compile(r"\d{1,2}[:.]\d{2}(?:[:.]\d{2})?$")
+
+CLUBS = ("Acton", "Ealing") # Default clubs whose swimmers are read from results PDFs
+
+# Tokens of a swimmer line, classified as they are scanned. Tokens are separated by spaces or commas.
+SWIMMER_TOKEN = re.compile(
+    r"(?P<comma>,)"
+    r"|(?P<time>\d{1,2}[:.]\d{2}(?:[:.]\d{2})?(?![^\s,]))"
+    r"|(?P<keyword>[^\s,]*?(?:" + "|".join(KEYWORDS) + r")[^\s,]*)"
+    r"|(?P<word>[^\s,]*[A-Za-z][^\s,]*)"
+    r"|(?P<other>[^\s,]+)"
+)
+
+EVENT_HEADER_LINES = 2 # Lines after an event header that are read as column headings/details
+
+SECTION_PRELIM = "prelim"
+SECTION_FINAL = "final"
+
+PARSER_VERSION = 3 # Bump whenever the parsed tables change, so cached tables are re-parsed
+
+PDF_WORKERS = os.cpu_count() or 1 # Default number of processes used to extract page text
+MIN_PAGES_PER_WORKER = 4 # Below this, starting a process costs more than it saves
+CHUNKS_IN_FLIGHT_PER_WORKER = 2 # Chunks submitted ahead of the one being yielded, per worker
+
 
 def get_event_name(row_str) -> str:
     '''
@@ -31,9 +62,46 @@ def get_event_name(row_str) -> str:
     else:
         raise ValueError(f"Invalid event name: {row_str}")    
 
+def get_event_number(row_str) -> int:
+    '''
+    Extract the event number from the input string.
+    e.g. "Event  21   Girls 8 & Under 25 SC Meter Breaststroke" -> 21
+    '''
+    match = re.search(REGEX_EVENT_NUMBER, str(row_str), re.IGNORECASE)
+
+    if match:
+        return int(match.group(1))
+    else:
+        raise ValueError(f"Invalid event number: {row_str}")
+
+def parse_event_selection(selection: str) -> set[int] | None:
+    '''
+    Parse a selection of event numbers such as "12-15, 20" into a set of event numbers.
+    Returns None (all events) if the selection is empty.
+    '''
+    if not selection or not selection.strip():
+        return None
+
+    events = set()
+    for part in selection.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        match = re.fullmatch(r"(\d+)\s*-\s*(\d+)|(\d+)", part)
+        if match is None:
+            raise ValueError(f"Invalid event selection: {part}")
+        if match.group(3):
+            events.add(int(match.group(3)))
+        else:
+            first, last = int(match.group(1)), int(match.group(2))
+            events.update(range(min(first, last), max(first, last) + 1))
+    return events
+
+@lru_cache(maxsize=65536)
 def parse_name(name: str) -> tuple[str, str]:
     '''
     Parse the name into first name and surname.
+    The same names come up in every event, so they are only parsed once.
     '''
     names = str(name).split(",")
 
@@ -48,92 +116,155 @@ def parse_name(name: str) -> tuple[str, str]:
     else:
         raise ValueError(f"Invalid name: {name}")
     
-def get_tokens(line):
+class ClubPatterns:
     """
-    Split a line into tokens, where tokens are separated by spaces or commas.
+    Patterns compiled once for a list of clubs.
+    - club: a line starting with one of the clubs
+    - swimmer_line: a swimmer entry, i.e. one of the clubs followed by a token containing a number
+    - page_filter: over the raw text of a page, the lines read_pdf needs, i.e. swimmer entries, event headers
+      and the two lines after each event header
     """
-    # Use regex to split by spaces or commas, but keep the delimiters as tokens
-    return re.split(r'(\s+|,)', line)
-    
-def is_swimmer_line(line):
+    def __init__(self, clubs):
+        clubs_regex = "|".join(re.escape(club) for club in clubs)
+        self.clubs = tuple(clubs)
+        self.club = re.compile(rf"(?P<club>{clubs_regex})(?=[\s,]|$)")
+        self.swimmer_line = re.compile(rf"(?P<club>{clubs_regex})(?:\s+|,)[^\s,]*\d")
+        # [^\S\n] is whitespace within a line
+        self.page_filter = re.compile(
+            rf"^(?P<event>[^\S\n]*Event[^\n]*(?:\n(?![^\S\n]*Event)[^\n]*){{0,{EVENT_HEADER_LINES}}})"
+            rf"|^(?:{clubs_regex})(?:[^\S\n]+|,)[^\s,]*\d[^\n]*",
+            re.MULTILINE,
+        )
+
+@lru_cache(maxsize=None)
+def get_club_patterns(clubs=CLUBS) -> ClubPatterns:
+    """
+    Return the compiled patterns for a tuple of clubs.
+    """
+    return ClubPatterns(clubs)
+
+def get_clubs_key(clubs) -> str:
+    """
+    Short key for a list of clubs, so the cached tables of one list of clubs are not used for another.
+    """
+    return "clubs-" + hashlib.sha256("|".join(clubs).encode()).hexdigest()[:12]
+
+def filter_page_lines(texts, clubs=CLUBS):
+    """
+    Drop the lines of other clubs (and any other line read_pdf ignores) from the raw text of each page,
+    before anything is tokenised. Yields the list of lines kept for each page.
+    Because the lines following an event header can run over onto the next page, each page carries
+    over how many of those are still owed to the next one.
+    """
+    page_filter = get_club_patterns(tuple(clubs)).page_filter
+    owed = 0
+    for text in texts:
+        lines = []
+        pos = 0
+        # Keep the lines owed by an event header at the end of the previous page
+        while owed and pos <= len(text):
+            end = text.find('\n', pos)
+            end = len(text) if end == -1 else end
+            line = text[pos:end]
+            if line.strip().startswith("Event"):
+                break
+            lines.append(line)
+            owed -= 1
+            pos = end + 1
+        owed = 0
+
+        for match in page_filter.finditer(text, pos):
+            lines.extend(match.group().split('\n'))
+            if match.group("event") is not None and match.end() == len(text):
+                owed = EVENT_HEADER_LINES - match.group().count('\n')
+        yield lines
+
+def is_swimmer_line(line, clubs=CLUBS):
     """
     Check if a line represents a swimmer entry.
-    We can do this by checking if there is a number after "Acton" or "Ealing".
+    We can do this by checking if there is a number after "Acton" or "Ealing" (or one of the given clubs).
     """
-    tokens = get_tokens(line)
-    return len(tokens) > 1 and (tokens[0] == "Acton" or tokens[0] == "Ealing") and contains_digit(tokens[2])
+    return get_club_patterns(tuple(clubs)).swimmer_line.match(line) is not None
 
-def parse_swimmer(line):
+def parse_swimmer(line, clubs=CLUBS):
     """
     Takes a string of this form "Acton 107 LastNames, FirstName MiddleNameInitials 56.30  NT".
     We skip swimmers from Northolt or St Helens.
     Returns a tuple of (Name, Seed Time, Time).
     The name is in the format "LastNames, FirstName"
     """
-    # Split by spaces or commas
-    tokens = get_tokens(line)
+    match = get_club_patterns(tuple(clubs)).club.match(line)
+    if match is None:
+        raise ValueError(f"Line does not start with {' or '.join(clubs)}\n{line}")
+    return scan_swimmer_tokens(line, match.end())
 
-    # Skip "Acton" or "Ealing"
-    if tokens[0] == "Acton" or tokens[0] == "Ealing":
-        tokens.pop(0)
-    else:
-        raise ValueError(f"Line does not start with 'Acton'\n{line}")
-    
-    # Skip garbage tokens
-    while tokens and not re.search(r'[A-Za-z]', tokens[0]):
-        tokens.pop(0)
-    
-    # Extract last names up to the comma delimiter.
-    if "," not in tokens:
-        raise ValueError("No comma found between last and first names")
-    comma_index = tokens.index(",")
-    last_names = [token.strip() for token in tokens[:comma_index] if re.search(r'[A-Za-z]', token)]
-    if not last_names:
-        raise ValueError("No last names found in line")
-    tokens = tokens[comma_index + 1:]
-    
-    # Extract first name (and possibly middle name or initials) until we hit a time or keyword
+def scan_swimmer_line(line, clubs=CLUBS):
+    """
+    Classify and parse a line in one go.
+    Returns None if the line is not a swimmer entry, otherwise the (Name, Seed Time, Time) tuple of parse_swimmer.
+    """
+    match = get_club_patterns(tuple(clubs)).swimmer_line.match(line)
+    if match is None:
+        return None
+    return scan_swimmer_tokens(line, match.end("club"))
+
+def scan_swimmer_tokens(line, pos: int):
+    """
+    Single left-to-right pass over the tokens of a swimmer line, starting after the club name.
+    Tokens are separated by spaces or commas, and each one is classified by SWIMMER_TOKEN as it is read:
+    garbage before the name is skipped, last names run up to the comma, first names run up to the first
+    time or keyword, which is the achieved time, and the next time or keyword is the seed time.
+    """
+    last_names = []
     first_name = []
-    while tokens and not is_time(tokens[0]) and extract_keyword(tokens[0]) is None:
-        token = tokens.pop(0).strip()
-        if token:
-            first_name.append(token)
-    
-    if not first_name:
-        raise ValueError("No first name found in line")
-    
-    # Join last names and first name
-    name = f"{' '.join(last_names)}, {' '.join(first_name)}"
+    achieved_time = None
+    seed_time = None
+    state = "garbage"
+
+    for token in SWIMMER_TOKEN.finditer(line, pos):
+        kind = token.lastgroup
+        if state == "garbage":
+            # Skip garbage tokens until the first token containing a letter
+            if kind == "word" or kind == "keyword":
+                last_names.append(token.group())
+                state = "last_names"
+        elif state == "last_names":
+            # Extract last names up to the comma delimiter.
+            if kind == "comma":
+                state = "first_name"
+            elif kind == "word" or kind == "keyword":
+                last_names.append(token.group())
+        elif state == "first_name":
+            # Extract first name (and possibly middle name or initials) until we hit a time or keyword
+            if kind == "time" or kind == "keyword":
+                if not first_name:
+                    raise ValueError("No first name found in line")
+                achieved_time = token.group()
+                state = "seed_time"
+            else:
+                first_name.append(token.group())
+        elif kind == "time" or kind == "keyword":
+            # Skip garbage tokens until the seed time
+            seed_time = token.group()
+            break
 
-    # Now we should have a time or keyword left
-    if not tokens:
+    if state == "garbage" or state == "last_names":
+        raise ValueError("No comma found between last and first names")
+    if state == "first_name":
+        if not first_name:
+            raise ValueError("No first name found in line")
         raise ValueError("No time or keyword found in line")
-    
-    # Remove garbage tokens
-    while tokens and not is_time(tokens[0]) and extract_keyword(tokens[0]) is None:
-        tokens.pop(0)
-    
-    # Extract the achieved time
-    if not tokens:
-        raise ValueError("Expected a time or keyword after name")
-    achieved_time = tokens.pop(0).strip()
-    
-    # Remove garbage tokens
-    while tokens and not is_time(tokens[0]) and extract_keyword(tokens[0]) is None:
-        tokens.pop(0)
 
-    seed_time = tokens.pop(0).strip() if tokens else None
+    # Join last names and first name
+    name = f"{' '.join(last_names)}, {' '.join(first_name)}"
 
     return name, seed_time, achieved_time
 
-def contains_digit(x):
-    return any(c.isdigit() for c in x)
-
 def is_time(s):
     """
     Times are stored in 'xx:xx.xx' or 'xx.xx' format
     """
-    return re.match(r'^\d{1,2}[:.]\d{2}([:.]\d{2})?$', s) is not None or re.match(r'^\d{1,2}[:.]\d{2}$', s) is not None
+    return REGEX_TIME.match(s) is not None
 
 def extract_keyword(x):
     for kw in KEYWORDS:
@@ -141,61 +272,245 @@ def extract_keyword(x):
             return kw
     return None
 
-def read_pdf(pdf_path, isQualifiers: bool):
+def extract_pages(pdf_path, page_numbers: list[int]) -> list[str]:
+    """
+    Extract the text of the given pages (0-indexed) of a PDF.
+    Each worker process opens its own reader, since readers cannot be shared between processes.
+    """
+    reader = PdfReader(pdf_path)
+    return [reader.pages[i].extract_text() or "" for i in page_numbers]
+
+def iter_page_texts(pdf_path, workers: int = 1):
+    """
+    Yield the text of each page of a PDF, in page order.
+    With more than one worker, the pages are split into chunks which are extracted by a process pool.
+    Chunks are yielded back in order, so the event/table boundaries are the same as a sequential read.
+    Only a couple of chunks per worker are in flight at a time, so a consumer that stops early (or reads
+    slowly) does not leave the pool extracting the rest of the PDF.
+    """
+    reader = PdfReader(pdf_path)
+    page_numbers = list(range(len(reader.pages)))
+    workers = min(workers, len(page_numbers) // MIN_PAGES_PER_WORKER)
+
+    if workers <= 1:
+        for i in page_numbers:
+            yield reader.pages[i].extract_text() or ""
+        return
+
+    # Use a few chunks per worker so a slow chunk does not hold up the whole pool
+    chunk_size = max(MIN_PAGES_PER_WORKER, -(-len(page_numbers) // (workers * 4)))
+    chunks = [page_numbers[i:i + chunk_size] for i in range(0, len(page_numbers), chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Chunks waiting to be yielded, in page order
+        pending = deque()
+        try:
+            for chunk in chunks:
+                pending.append(executor.submit(extract_pages, pdf_path, chunk))
+                if len(pending) >= CHUNKS_IN_FLIGHT_PER_WORKER * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            # Stopped early: drop the chunks that have not started
+            for future in pending:
+                future.cancel()
+
+def iter_pdf_lines(pdf_path, workers: int = 1, clubs=None):
+    """
+    Yield the text lines of a PDF one page at a time, so only the current page is held in memory.
+    If clubs are given, the lines of other clubs are dropped from the raw page text (see filter_page_lines).
+    """
+    texts = iter_page_texts(pdf_path, workers)
+    if clubs is None:
+        page_lines = (text.split('\n') for text in texts)
+    else:
+        page_lines = filter_page_lines(texts, clubs)
+    for lines in page_lines:
+        yield from lines
+
+def get_section_type(details: list[str], repeated: bool) -> str:
+    """
+    Decide whether an event section of a results PDF holds prelim or final results.
+    Sections marked as preliminaries in their column headings/details are prelims. Full results list the final
+    of an event before its prelims, so a section whose event header has already been seen is a prelim too.
+    """
+    details_str = " ".join(details)
+    if repeated or "Preliminaries" in details_str or ("Prelim" in details_str and "Final" not in details_str):
+        return SECTION_PRELIM
+    return SECTION_FINAL
+
+def get_time_columns(isQualifiers: bool) -> tuple[str, str]:
+    """
+    Return the names of the (previous time, time) columns of the event tables.
+    """
+    if isQualifiers:
+        return "Seed Time", "Time"
+    return "Qualifiers Time", "Finals Time"
+
+def iter_event_tables(lines, isQualifiers: bool, sections=None, events=None, clubs=CLUBS):
+    """
+    Walk the lines of a results PDF and yield a DataFrame per event as soon as its lines have been read.
+    Lines are consumed lazily, so an event is yielded before the pages of the following events are extracted.
+    Each table is tagged with its section type in table.attrs["section"] and its event number in
+    table.attrs["event_number"]. Only sections whose type is in `sections` and whose event number is in `events`
+    are kept (all of them if None), and the swimmer lines of the others are skipped without parsing.
+    Only the swimmers of the given clubs are read.
+    """
+    prev_time, cur_time = get_time_columns(isQualifiers)
+
+    seen_headers = set()
+
+    lines = iter(lines)
+    line = next(lines, None)
+    while line is not None:
+        if not line.strip().startswith("Event"):
+            line = next(lines, None)
+            continue
+
+        header = " ".join(line.split())
+        repeated = header in seen_headers
+        seen_headers.add(header)
+
+        try:
+            event_number = get_event_number(header)
+        except ValueError:
+            event_number = None
+
+        # Skip the event header and the line after it (the column headings)
+        details = [next(lines, None) or ""]
+        line = next(lines, None)
+
+        # Skip event details
+        if line is not None and "Prelim" in line:
+            details.append(line)
+            line = next(lines, None)
+
+        section = get_section_type(details, repeated)
+
+        # Skip the whole section if it would be thrown away
+        if (sections is not None and section not in sections) or (events is not None and event_number not in events):
+            while line is not None and not line.strip().startswith("Event"):
+                line = next(lines, None)
+            continue
+
+        # Collect swimmer data for this event
+        swimmers = []
+        while line is not None and not line.strip().startswith("Event"):
+            swimmer = scan_swimmer_line(line, clubs)
+            if swimmer is not None:
+                name, seed_time, time = swimmer
+                swimmers.append({
+                    "Name": name,
+                    prev_time: seed_time, # Here we take the seed time as the qualifier time
+                    cur_time: time # This is the finals time
+                })
+            line = next(lines, None)
+
+        # If any swimmers were found, make a DataFrame
+        if swimmers:
+            table = pd.DataFrame(swimmers)
+            table.attrs["section"] = section
+            table.attrs["event_number"] = event_number
+            yield table
+
+def iter_pdf_tables(pdf_path, isQualifiers: bool, workers: int = 1, cache=None, events=None, clubs=CLUBS):
+    """
+    Generator version of read_pdf: yield each event table as soon as its pages are parsed.
+    If `events` is given, only the tables of those event numbers are yielded.
+    Only the swimmers of the given clubs are read, and the lines of other clubs are dropped from the raw
+    page text before any parsing.
+    If a PdfTableCache is given, the tables of an unchanged PDF are loaded from it instead of parsed,
+    and the tables of a new PDF are stored in it once the whole PDF has been read.
+    `events` only filters the tables: pages are still read in order, up to the last table the caller asks
+    for, and the whole PDF if its tables are to be cached.
+    """
+    if cache is not None:
+        key = cache.key(pdf_path, f"v{PARSER_VERSION}", "heats" if isQualifiers else "finals", get_clubs_key(clubs))
+        cached_tables = cache.get(key)
+        if cached_tables is not None:
+            for table in cached_tables:
+                if events is None or table.attrs.get("event_number") in events:
+                    yield table
+            return
+        parsed_tables = []
+
+    # For finals, the prelim sections are not needed, so they are not parsed at all
+    sections = None if isQualifiers else {SECTION_FINAL}
+
+    # The cache must hold every event, so events are only skipped while parsing when there is no cache
+    parse_events = events if cache is None else None
+
+    lines = iter_pdf_lines(pdf_path, workers, clubs)
+    for table in iter_event_tables(lines, isQualifiers, sections, parse_events, clubs):
+        if cache is not None:
+            # Store a copy, since callers are free to modify the tables they get
+            parsed_tables.append(table.copy())
+        if events is None or table.attrs["event_number"] in events:
+            yield table
+
+    if cache is not None:
+        cache.put(key, parsed_tables)
+
+class PdfEventIndex:
+    """
+    Index of the event tables of a results PDF by event number.
+    Tables are pulled lazily from an iter_pdf_tables stream, so looking up an event only reads the PDF
+    up to (and just past) that event. Consecutive tables with the same event number are joined.
+    """
+    def __init__(self, tables):
+        self._tables = iter(tables)
+        self._index = {}
+        self._last_event = None
+        self._done = False
+
+    def _read_next(self):
+        table = next(self._tables, None)
+        if table is None:
+            self._done = True
+            return
+
+        event_number = table.attrs.get("event_number")
+        if event_number in self._index:
+            self._index[event_number] = pd.concat([self._index[event_number], table], ignore_index=True)
+        else:
+            self._index[event_number] = table
+        self._last_event = event_number
+
+    def get(self, event_number: int):
+        """
+        Return the table for the event number, or None if the PDF has no results for it.
+        """
+        # Read until the stream has moved past the event, in case its results continue in another section
+        while not self._done and (event_number not in self._index or self._last_event == event_number):
+            self._read_next()
+        return self._index.get(event_number)
+
+    def read_all(self) -> dict:
+        """
+        Read the rest of the PDF and return the whole index.
+        """
+        while not self._done:
+            self._read_next()
+        return self._index
+
+def index_pdf_tables(pdf_path, isQualifiers: bool, events=None, workers: int = 1, cache=None, clubs=CLUBS) -> PdfEventIndex:
+    """
+    Read a results PDF into an index of its tables keyed by the event number in the "Event N" header.
+    Events not in `events` (if given) are skipped.
+    """
+    return PdfEventIndex(iter_pdf_tables(pdf_path, isQualifiers, workers, cache, events, clubs))
+
+def read_pdf(pdf_path, isQualifiers: bool, workers: int = 1, cache=None, events=None, clubs=CLUBS):
     """
     Read a PDF file (either heat results of full results) and return the list of pdf tables.
     - For heat results (qualifiers), this will return all of the tables.
     - For finals, this will return only the finals tables (since there are also prelim tables which are not necessary).
       The finals tables contain both the prelim time and the finals time.
+    Every table is tagged as a prelim or final section in table.attrs["section"], and with its event number
+    in table.attrs["event_number"].
+    Page text is extracted by up to `workers` processes, and tables are reused from `cache` when given.
+    If `events` is given, only the tables of those event numbers are returned.
+    Only the swimmers of `clubs` are read (Acton and Ealing by default).
     """
-    # Define column name for times in resulting DataFrame
-    if isQualifiers:
-        prev_time = "Seed Time"
-        cur_time = "Time"
-    else:
-        prev_time = "Qualifiers Time"
-        cur_time = "Finals Time"
-
-    # Read the results PDF
-    # Read the qualifiers results PDF
-    reader = PdfReader(pdf_path)
-   
-    # Extract text from each page and split into lines
-    lines = []
-    for page in reader.pages:
-        text = page.extract_text() or ""
-        lines += text.split('\n')
-    
-    pdf_tables = []  # This will hold a DataFrame per event
-    idx = 0
-    while idx < len(lines):
-        if lines[idx].strip().startswith("Event"):
-            idx += 2
-           
-            # Skip event details
-            if idx < len(lines) and "Prelim" in lines[idx]:
-                idx += 1
-           
-            # Collect swimmer data for this event
-            swimmers = []
-            while idx < len(lines) and not lines[idx].strip().startswith("Event"):
-                if is_swimmer_line(lines[idx]):
-                    name, seed_time, time = parse_swimmer(lines[idx])
-                    swimmers.append({
-                        "Name": name,
-                        prev_time: seed_time, # Here we take the seed time as the qualifier time
-                        cur_time: time # This is the finals time
-                    })
-                idx += 1
-            # If any swimmers were found, make a DataFrame
-            if swimmers:
-                df = pd.DataFrame(swimmers)
-                pdf_tables.append(df)
-        else:
-            idx += 1
-    
-    if isQualifiers:
-        return pdf_tables
-    else:
-        # Only keep even tables (index-wise) because odd ones are qualifiers
-        return pdf_tables[::2]
+    return list(iter_pdf_tables(pdf_path, isQualifiers, workers, cache, events, clubs))
@@ -0,0 +1,137 @@
+'''
+On-disk cache of the event tables parsed from results PDFs.
+Entries are keyed by the PDF's content hash, so re-running a check against an unchanged PDF skips parsing.
+'''
+
+import hashlib
+import os
+import pickle
+import platform
+
+CACHE_MAX_BYTES = 200 * 1024 * 1024 # Least recently used entries are evicted above this size
+CACHE_SUFFIX = ".pkl"
+
+
+def get_cache_dir() -> str:
+    '''
+    Return the directory used for the parsed PDF cache, depending on the OS.
+    '''
+    system = platform.system()
+    if system == "Windows":
+        return os.path.join(os.path.expanduser("~"), "AppData", "Local", "ESCAuto", "cache")
+    elif system == "Darwin":
+        return os.path.join(os.path.expanduser("~"), "Library", "Caches", "ESCAuto")
+    else:
+        return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "esc-auto")
+
+
+def file_sha256(path) -> str:
+    '''
+    Return the SHA-256 hex digest of a file's content.
+    '''
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PdfTableCache:
+    '''
+    Size-bounded LRU cache of lists of DataFrames, stored as pickles in a directory.
+    The modification time of an entry is its last use, and the oldest entries are evicted first.
+    '''
+    def __init__(self, cache_dir: str | None = None, max_bytes: int = CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir or get_cache_dir()
+        self.max_bytes = max_bytes
+        self._digests = {} # (path, size, mtime) -> content hash, so a file is only hashed once
+
+    def key(self, pdf_path, *variant) -> str:
+        '''
+        Build the cache key from the PDF content and anything else the parsed tables depend on
+        (e.g. the parser version and whether it was read as heats or finals).
+        '''
+        stat = os.stat(pdf_path)
+        file_id = (os.path.abspath(pdf_path), stat.st_size, stat.st_mtime_ns)
+        if file_id not in self._digests:
+            self._digests[file_id] = file_sha256(pdf_path)
+        return "-".join([self._digests[file_id]] + [str(part) for part in variant])
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + CACHE_SUFFIX)
+
+    def get(self, key: str):
+        '''
+        Return the cached tables for the key, or None if they are not cached or cannot be read back.
+        '''
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                tables = pickle.load(f)
+            # Mark the entry as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Unpickling can fail in many ways (truncated file, pickle from another pandas version...),
+            # so drop the bad entry and parse the PDF again
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return tables
+
+    def put(self, key: str, tables) -> None:
+        '''
+        Store the tables for the key, then evict old entries if the cache is too big.
+        '''
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            # Write to a temporary file first so a reader never sees a half-written entry
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self.evict()
+        except OSError:
+            # The cache is only an optimisation, so never fail a check because of it
+            pass
+
+    def evict(self) -> None:
+        '''
+        Delete the least recently used entries until the cache fits in max_bytes.
+        '''
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(CACHE_SUFFIX):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # Evicted by another process in the meantime
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        '''
+        Delete every entry in the cache.
+        '''
+        if not os.path.isdir(self.cache_dir):
+            return
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(CACHE_SUFFIX):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,225 @@
+'''
+Readers for the structured results exported by meet software, as an alternative to scraping the results PDF:
+- Lenex (.lef, or .lxf when zipped), an XML format, streamed with iterparse
+- SDIF (.sd3/.cl2), a fixed-width text format
+They return the same event tables as read_pdf.
+'''
+
+import os
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+import pandas as pd
+from .parsing import get_club_patterns, get_time_columns, iter_pdf_tables, PdfEventIndex, CLUBS, SECTION_FINAL, SECTION_PRELIM
+
+LENEX_EXTENSIONS = (".lef", ".lxf")
+SDIF_EXTENSIONS = (".sd3", ".cl2")
+
+# File dialog filter for every results file the checks accept
+RESULTS_FILETYPES = [('Results files', '*.pdf *.lef *.lxf *.sd3 *.cl2'), ('PDF files', '*.pdf')]
+
+# Lenex result statuses, written like they are in the results PDF
+LENEX_STATUSES = {"DSQ": "DQ", "DNS": "NS", "WDR": "NS", "DNF": "DNF"}
+# Lenex rounds that are not finals: timed finals, fastest heats and prelims
+LENEX_HEAT_ROUNDS = {None, "TIM", "FHT", "PRE"}
+LENEX_FINAL_ROUNDS = {None, "TIM", "FIN"}
+# Lenex rounds that lead to another one: prelims, semi-finals and swim-offs
+LENEX_PRELIM_ROUNDS = {"PRE", "SEM", "SOP"}
+
+# SDIF times that are not times, written like they are in the results PDF
+SDIF_KEYWORDS = {"SCR": "NS"}
+
+
+def format_lenex_time(swimtime):
+    '''
+    Convert a Lenex time to the results PDF format.
+    e.g. "00:01:02.34" -> "1:02.34", "00:00:09.87" -> "9.87"
+    '''
+    if swimtime is None or ":" not in swimtime:
+        return swimtime
+    hours, minutes, seconds = swimtime.split(":")
+    minutes = int(hours) * 60 + int(minutes)
+    if minutes:
+        return f"{minutes}:{seconds}"
+    # Drop the leading zero of the seconds, but not of "0.xx"
+    return seconds[1:] if seconds.startswith("0") and seconds[1] != "." else seconds
+
+def is_club(name, clubs=CLUBS) -> bool:
+    '''
+    Check if a club name from a results file is one of the clubs, e.g. "Ealing Swimming Club" for "Ealing".
+    '''
+    return name is not None and get_club_patterns(tuple(clubs)).club.match(name.strip()) is not None
+
+@contextmanager
+def open_lenex(path):
+    '''
+    Open the XML of a Lenex file, unzipping it if needed.
+    '''
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            name = next((n for n in archive.namelist() if n.lower().endswith(".lef")), archive.namelist()[0])
+            with archive.open(name) as f:
+                yield f
+    else:
+        with open(path, "rb") as f:
+            yield f
+
+def iter_lenex_tables(lenex_path, isQualifiers: bool, events=None, clubs=CLUBS, all_rounds: bool = False):
+    '''
+    Yield the event tables of a Lenex results file, one per Lenex event, in the format of iter_pdf_tables.
+    The XML is streamed, and only the athletes of the given clubs are kept.
+    For heats (qualifiers), the time is the swim of the heat/prelim and the seed time is the entry time.
+    For finals, the previous time is the prelim swim of the athlete (or its entry time for timed finals).
+    With all_rounds, every round is yielded, prelims and finals alike, each tagged with its section.
+    '''
+    prev_time, cur_time = get_time_columns(isQualifiers)
+
+    lenex_events = {} # eventid -> (event number, round, preveventid)
+    swims = [] # (name, eventid, entry time, time)
+    keep_club = False
+
+    with open_lenex(lenex_path) as f:
+        for action, elem in ET.iterparse(f, events=("start", "end")):
+            if action == "start":
+                if elem.tag == "CLUB":
+                    keep_club = is_club(elem.get("name"), clubs) or is_club(elem.get("shortname"), clubs)
+                continue
+
+            if elem.tag == "EVENT":
+                number = elem.get("number")
+                lenex_events[elem.get("eventid")] = (
+                    int(number) if number and number.isdigit() else None,
+                    elem.get("round"),
+                    elem.get("preveventid"),
+                )
+                elem.clear()
+            elif elem.tag == "ATHLETE":
+                if keep_club:
+                    name = f"{' '.join(filter(None, [elem.get('nameprefix'), elem.get('lastname')]))}, {elem.get('firstname')}"
+                    entry_times = {entry.get("eventid"): entry.get("entrytime") for entry in elem.iter("ENTRY")}
+                    for result in elem.iter("RESULT"):
+                        eventid = result.get("eventid")
+                        entry_time = result.get("entrytime") or entry_times.get(eventid)
+                        time = LENEX_STATUSES.get(result.get("status")) or result.get("swimtime")
+                        swims.append((name, eventid, format_lenex_time(entry_time) or "NT", format_lenex_time(time) or "NS"))
+                elem.clear()
+            elif elem.tag == "CLUB":
+                elem.clear()
+
+    # Time of each athlete in each event, to find the prelim time of finalists
+    times = {(name, eventid): time for name, eventid, _, time in swims}
+
+    rows = {eventid: [] for eventid in lenex_events}
+    for name, eventid, entry_time, time in swims:
+        if eventid not in lenex_events:
+            continue
+        _, round_, preveventid = lenex_events[eventid]
+        if all_rounds:
+            rows[eventid].append({"Name": name, prev_time: times.get((name, preveventid), entry_time), cur_time: time})
+        elif isQualifiers and round_ in LENEX_HEAT_ROUNDS:
+            rows[eventid].append({"Name": name, prev_time: entry_time, cur_time: time})
+        elif not isQualifiers and round_ in LENEX_FINAL_ROUNDS:
+            rows[eventid].append({"Name": name, prev_time: times.get((name, preveventid), entry_time), cur_time: time})
+
+    for eventid, (event_number, round_, _) in lenex_events.items():
+        if not rows[eventid] or (events is not None and event_number not in events):
+            continue
+        table = pd.DataFrame(rows[eventid])
+        table.attrs["section"] = SECTION_PRELIM if round_ in LENEX_PRELIM_ROUNDS else SECTION_FINAL
+        table.attrs["event_number"] = event_number
+        yield table
+
+def sdif_field(record: str, start: int, end: int) -> str:
+    '''
+    Return a field of an SDIF record, given its (1-based, inclusive) start and end columns from the SDIF spec.
+    '''
+    return record[start - 1:end].strip()
+
+def iter_sdif_tables(sdif_path, isQualifiers: bool, events=None, clubs=CLUBS, all_rounds: bool = False):
+    '''
+    Yield the event tables of an SDIF results file, one per event number, in the format of iter_pdf_tables.
+    Individual results (D0 records) belong to the team (C1 record) above them, and only those of the given
+    clubs are kept.
+    For heats (qualifiers), the time is the prelim time (or finals time for timed finals).
+    For finals, only the swimmers with a finals time are kept, and the previous time is their prelim time.
+    With all_rounds, each event gives a prelim table (the swimmers with a prelim time) and then a final table
+    (the other swimmers, and those with a finals time), each tagged with its section.
+    '''
+    prev_time, cur_time = get_time_columns(isQualifiers)
+
+    rows = {} # (event number, section) -> rows
+    keep_team = False
+    with open(sdif_path, encoding="latin-1") as f:
+        for record in f:
+            code = record[:2]
+            if code == "C1":
+                keep_team = is_club(sdif_field(record, 18, 47), clubs)
+            elif code == "D0" and keep_team:
+                match = re.match(r"\d+", sdif_field(record, 73, 76))
+                if match is None:
+                    continue
+                event_number = int(match.group())
+                if events is not None and event_number not in events:
+                    continue
+
+                name = sdif_field(record, 12, 39)
+                seed_time, prelim_time, finals_time = (
+                    SDIF_KEYWORDS.get(time, time) for time in [
+                        sdif_field(record, 89, 96), sdif_field(record, 98, 105), sdif_field(record, 116, 123),
+                    ]
+                )
+
+                if all_rounds:
+                    if prelim_time:
+                        rows.setdefault((event_number, SECTION_PRELIM), []).append(
+                            {"Name": name, prev_time: seed_time or "NT", cur_time: prelim_time}
+                        )
+                    if finals_time or not prelim_time:
+                        rows.setdefault((event_number, SECTION_FINAL), []).append(
+                            {"Name": name, prev_time: prelim_time or seed_time or "NT", cur_time: finals_time or "NS"}
+                        )
+                    continue
+
+                if isQualifiers:
+                    row = {"Name": name, prev_time: seed_time or "NT", cur_time: prelim_time or finals_time or "NS"}
+                elif finals_time:
+                    row = {"Name": name, prev_time: prelim_time or seed_time or "NT", cur_time: finals_time}
+                else:
+                    continue
+                rows.setdefault((event_number, SECTION_FINAL), []).append(row)
+
+    # Prelims before finals within an event
+    for event_number, section in sorted(rows, key=lambda key: (key[0], key[1] != SECTION_PRELIM)):
+        table = pd.DataFrame(rows[(event_number, section)])
+        table.attrs["section"] = section
+        table.attrs["event_number"] = event_number
+        yield table
+
+def iter_results_tables(results_path, isQualifiers: bool, workers: int = 1, cache=None, events=None, clubs=CLUBS, all_rounds: bool = False):
+    '''
+    Yield the event tables of a results file: a Lenex or SDIF export, or else a results PDF.
+    `workers` and `cache` are only used for PDFs, since the structured formats are fast to read.
+    With all_rounds, the prelim and final tables of every event are yielded, tagged with their section
+    in table.attrs["section"]. A PDF read as heats already has every section, so it is read as heats then.
+    '''
+    extension = os.path.splitext(str(results_path))[1].lower()
+    if extension in LENEX_EXTENSIONS:
+        return iter_lenex_tables(results_path, isQualifiers, events, clubs, all_rounds)
+    if extension in SDIF_EXTENSIONS:
+        return iter_sdif_tables(results_path, isQualifiers, events, clubs, all_rounds)
+    return iter_pdf_tables(results_path, isQualifiers or all_rounds, workers, cache, events, clubs)
+
+def read_results(results_path, isQualifiers: bool, workers: int = 1, cache=None, events=None, clubs=CLUBS, all_rounds: bool = False):
+    '''
+    Read a results file (PDF, Lenex or SDIF) and return its list of event tables, like read_pdf.
+    With all_rounds, both the prelims and finals are read (see iter_results_tables).
+    '''
+    return list(iter_results_tables(results_path, isQualifiers, workers, cache, events, clubs, all_rounds))
+
+def index_results(results_path, isQualifiers: bool, events=None, workers: int = 1, cache=None, clubs=CLUBS) -> PdfEventIndex:
+    '''
+    Read a results file (PDF, Lenex or SDIF) into an index of its tables keyed by event number,
+    like index_pdf_tables.
+    '''
+    return PdfEventIndex(iter_results_tables(results_path, isQualifiers, workers, cache, events, clubs))
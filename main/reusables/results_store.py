@@ -0,0 +1,108 @@
+'''
+Local SQLite store of the event tables read from many results PDFs, tagged by meet.
+Files are recorded by content hash, so a PDF that has already been ingested is not read again.
+'''
+
+import os
+import sqlite3
+from datetime import datetime
+import pandas as pd
+
+RESULTS_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    sha256 TEXT NOT NULL UNIQUE,
+    meet TEXT NOT NULL,
+    path TEXT NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    meet TEXT NOT NULL,
+    event_number INTEGER,
+    section TEXT NOT NULL,
+    name TEXT NOT NULL,
+    seed_time TEXT,
+    time TEXT
+);
+CREATE INDEX IF NOT EXISTS results_meet_event ON results (meet, event_number);
+CREATE INDEX IF NOT EXISTS results_name ON results (name);
+"""
+
+
+class ResultsStore:
+    '''
+    Results of many galas in one SQLite database.
+    Each row of the results table is a swimmer of an event table, with its seed (or prelim) time and its time.
+    '''
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(RESULTS_STORE_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def has_file(self, sha256: str) -> bool:
+        '''
+        Check if a file with this content hash has already been ingested.
+        '''
+        row = self.connection.execute("SELECT 1 FROM files WHERE sha256 = ?", (sha256,)).fetchone()
+        return row is not None
+
+    def add_tables(self, sha256: str, meet: str, path: str, tables) -> int:
+        '''
+        Add the event tables of a file, as returned by read_pdf, and return the number of results added.
+        The file and its results are written in one transaction, so a failed write leaves nothing behind.
+        '''
+        rows = []
+        for table in tables:
+            # The first column is the name, then the previous (seed/qualifiers) time and the time
+            name_col, prev_time_col, cur_time_col = table.columns[:3]
+            for name, prev_time, cur_time in zip(table[name_col], table[prev_time_col], table[cur_time_col]):
+                rows.append((table.attrs.get("event_number"), table.attrs.get("section", ""), name, prev_time, cur_time))
+
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO files (sha256, meet, path, ingested_at) VALUES (?, ?, ?, ?)",
+                (sha256, meet, path, datetime.now().isoformat(timespec="seconds")),
+            )
+            file_id = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO results (file_id, meet, event_number, section, name, seed_time, time) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(file_id, meet, *row) for row in rows],
+            )
+        return len(rows)
+
+    def get_meets(self) -> list[str]:
+        '''
+        Return the meets in the store, in the order they were ingested.
+        '''
+        rows = self.connection.execute("SELECT meet FROM files GROUP BY meet ORDER BY MIN(id)").fetchall()
+        return [row[0] for row in rows]
+
+    def get_results(self, meet: str | None = None, event_number: int | None = None, name: str | None = None):
+        '''
+        Return the stored results as a DataFrame, optionally only those of a meet, event number and/or swimmer name.
+        '''
+        conditions = []
+        params = []
+        for column, value in [("meet", meet), ("event_number", event_number), ("name", name)]:
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        return pd.read_sql_query(
+            f"SELECT meet, event_number, section, name, seed_time, time FROM results{where} ORDER BY rowid",
+            self.connection,
+            params=params,
+        )
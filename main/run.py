@@ -1,4 +1,10 @@
+import multiprocessing
+
+
 def main():
+    # Needed so the frozen app can start the PDF extraction worker processes
+    multiprocessing.freeze_support()
+
     # Launch GUI
     try:
         from gui_app import main as gui_main
@@ -1,6 +1,7 @@
 import pandas as pd
 
-from check_qualifiers.main import has_recorded_time
+from check_qualifiers.main import has_recorded_time, check_qualifiers
+from reusables import IdentityStore, PdfTableCache
 
 
 def test_has_recorded_time():
@@ -12,3 +13,67 @@ def test_has_recorded_time():
     assert not has_recorded_time("   ")
     assert not has_recorded_time(float("nan"))
     assert not has_recorded_time(pd.NA)
+
+
+LENEX = """<?xml version="1.0" encoding="UTF-8"?>
+<LENEX version="3.0">
+  <MEETS>
+    <MEET name="Club Champs">
+      <SESSIONS>
+        <SESSION number="1">
+          <EVENTS>
+            <EVENT eventid="10" number="1" round="TIM"><SWIMSTYLE distance="50" stroke="FREE"/></EVENT>
+          </EVENTS>
+        </SESSION>
+      </SESSIONS>
+      <CLUBS>
+        <CLUB name="Ealing Swimming Club">
+          <ATHLETES>
+            <ATHLETE athleteid="1" firstname="Jane" lastname="Doe">
+              <RESULTS><RESULT eventid="10" swimtime="00:00:34.50" entrytime="00:00:35.00"/></RESULTS>
+            </ATHLETE>
+            <ATHLETE athleteid="2" firstname="Samuel" lastname="Berg">
+              <RESULTS><RESULT eventid="10" swimtime="00:00:40.00" entrytime="NT"/></RESULTS>
+            </ATHLETE>
+          </ATHLETES>
+        </CLUB>
+      </CLUBS>
+    </MEET>
+  </MEETS>
+</LENEX>
+"""
+
+
+def test_check_qualifiers_uses_given_stores(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    results_path = tmp_path / "results.lef"
+    results_path.write_text(LENEX, encoding="utf-8")
+    leah_path = tmp_path / "leah.xlsx"
+    pd.DataFrame([
+        ["Event  1   Girls 9-10 50 SC Meter Freestyle", None, None, None, None, None],
+        ["Lane", "Name", "Age", "Team", "Seed Time", "Time"],
+        ["1", "Doe, Jane", 9, "Ealing", "35.00", "34.50"],
+        ["EXTRA", None, None, None, None, None],
+        ["Sam", "Berg", 9, "Ealing", "NT", "40.00"],
+    ]).to_excel(leah_path, header=False, index=False)
+
+    messages, errors = [], []
+    store = IdentityStore(str(tmp_path / "identities.db"))
+    check_qualifiers(
+        str(leah_path),
+        str(results_path),
+        lambda message, colour=None: messages.append(message),
+        lambda data: {"action": "accept", "sfirst_name": data["candidates"][0]["sfirst_name"], "ssurname": data["candidates"][0]["ssurname"]},
+        lambda message, colour=None: errors.append(message),
+        identity_store=store,
+        cache=PdfTableCache(str(tmp_path / "pdf_cache")),
+    )
+
+    assert errors == []
+    assert "✅ QUALIFIER CHECK COMPLETED!" in messages
+    # The confirmed match is in the given store, which is left open, and nothing is written to the default ones
+    assert store.get_matches() == {("samuel", "berg"): [("Sam", "Berg")]}
+    store.close()
+    assert not (tmp_path / "data").exists()
+    assert not (tmp_path / "cache").exists()
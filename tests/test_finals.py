@@ -1,5 +1,7 @@
 import pandas as pd
 from reusables.finals import is_final, rename_final_column
+from check_finals.main import check_finals
+from reusables import IdentityStore, PdfTableCache
 
 
 def test_main_events():
@@ -18,3 +20,66 @@ def test_rename_final_column():
     rename_final_column(tables, "Time")
     assert "Time" in tables[0].columns
     assert "Finals" not in tables[0].columns
+
+
+LENEX = """<?xml version="1.0" encoding="UTF-8"?>
+<LENEX version="3.0">
+  <MEETS>
+    <MEET name="Club Champs">
+      <SESSIONS>
+        <SESSION number="1">
+          <EVENTS>
+            <EVENT eventid="10" number="1" round="PRE"><SWIMSTYLE distance="50" stroke="FREE"/></EVENT>
+            <EVENT eventid="11" number="1" round="FIN" preveventid="10"><SWIMSTYLE distance="50" stroke="FREE"/></EVENT>
+          </EVENTS>
+        </SESSION>
+      </SESSIONS>
+      <CLUBS>
+        <CLUB name="Ealing Swimming Club">
+          <ATHLETES>
+            <ATHLETE athleteid="1" firstname="Jane" lastname="Doe">
+              <RESULTS>
+                <RESULT eventid="10" swimtime="00:00:34.50"/>
+                <RESULT eventid="11" swimtime="00:00:34.10"/>
+              </RESULTS>
+            </ATHLETE>
+          </ATHLETES>
+        </CLUB>
+      </CLUBS>
+    </MEET>
+  </MEETS>
+</LENEX>
+"""
+
+
+def test_check_finals_uses_given_stores(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    results_path = tmp_path / "results.lef"
+    results_path.write_text(LENEX, encoding="utf-8")
+    finals_path = tmp_path / "finals.xlsx"
+    pd.DataFrame([
+        ["Event 1 50m free girls", None, None, None, None, None, None, None],
+        ["Lane", "First name", "Surname", "Club", "Age", "Qualifier 50 Free", "Place", "50 Free"],
+        ["1", "Janet", "Doe", "Ealing", 9, "34.50", "1", "34.10"],
+    ]).to_excel(finals_path, sheet_name="Finals", header=False, index=False)
+
+    messages, errors = [], []
+    store = IdentityStore(str(tmp_path / "identities.db"))
+    check_finals(
+        str(finals_path),
+        str(results_path),
+        lambda message, colour=None: messages.append(message),
+        lambda data: {"action": "accept", "sfirst_name": data["candidates"][0]["sfirst_name"], "ssurname": data["candidates"][0]["ssurname"]},
+        lambda message, colour=None: errors.append(message),
+        identity_store=store,
+        cache=PdfTableCache(str(tmp_path / "pdf_cache")),
+    )
+
+    assert errors == []
+    assert "✅ FINALS CHECK COMPLETED!" in messages
+    # The confirmed match is in the given store, which is left open, and nothing is written to the default ones
+    assert store.get_matches() == {("jane", "doe"): [("Janet", "Doe")]}
+    store.close()
+    assert not (tmp_path / "data").exists()
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,44 @@
+import pandas as pd
+from reusables.identity_store import IdentityStore
+from leahify_qualifiers.main import match_swimmers
+
+
+def test_add_and_get_matches(tmp_path):
+    path = str(tmp_path / "identities.db")
+    with IdentityStore(path) as store:
+        assert store.get_matches() == {}
+        assert store.add_matches({("sam", "smith"): ("Samuel", "Smith")}) == 1
+        # Pairs already written are not written again
+        assert store.add_matches({("sam", "smith"): ("Samuel", "Smith"), ("jon", "doe"): ("John", "Doe")}) == 1
+
+    with IdentityStore(path) as store:
+        assert store.get_matches() == {("sam", "smith"): [("Samuel", "Smith")], ("jon", "doe"): [("John", "Doe")]}
+        assert store.add_matches({("sam", "smith"): ("Samuel", "Smith")}) == 0
+
+
+def test_match_swimmers_remembers_manual_matches(tmp_path):
+    qualifiers = pd.DataFrame([{"First name": "Samuel", "Surname": "Smith", "25m Free": "19.50"}])
+
+    def leah_tables():
+        return [pd.DataFrame([
+            ["Event 21 Boys 8 & Under 25 SC Meter Freestyle", None, None, None, None, None],
+            ["1", "Smith, Sam", "Acton", None, None, None],
+        ], columns=["Lane", "Name", "Team", "Age", "DOB", "Time"])]
+
+    prompts = []
+    def confirm(data):
+        prompts.append(data["leah_name"])
+        return {"action": "accept", "sfirst_name": "Samuel", "ssurname": "Smith"}
+
+    path = str(tmp_path / "identities.db")
+    for _ in range(2):
+        tables = leah_tables()
+        with IdentityStore(path) as store:
+            matched_events = match_swimmers(
+                qualifiers, tables, ["25m Free"], "Time", confirm, lambda *args: None, identity_store=store,
+            )
+        assert matched_events == {("Samuel", "Smith"): ["25m Free"]}
+        assert tables[0]["Time"].tolist()[1] == "19.50"
+
+    # Only the first run asked
+    assert prompts == ["Sam Smith"]
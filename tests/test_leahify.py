@@ -1,6 +1,10 @@
 import pandas as pd
 from leahify_qualifiers import TIME_COLUMN_INDEX
-from leahify_qualifiers.main import add_time_column, combine_tables, restore_final_column, get_extras_per_event, add_extras_to_leah_tables
+from leahify_qualifiers.extract_tables import split_tables
+from leahify_qualifiers.main import GROUPS, load_qualifiers, add_time_column, combine_tables, restore_final_column, get_extras_per_event, add_extras_to_leah_tables, get_event_context, match_swimmers, write_times
+import numpy as np
+import openpyxl
+import pytest
 
 
 def test_add_time_column():
@@ -25,6 +29,12 @@ def test_combine_tables():
     assert "Time" in out.columns
     assert "" in out["Time"].values
     assert "19.50" in out["Time"].values
+    # Each table gets the header row under its event row
+    assert out["Lane"].tolist() == [
+        "Event 1 Boys 8 & Under 25 SC Meter Free", "Lane", "Lane", "1",
+        "Event 2 Girls 8 & Under 25 SC Meter Free", "Lane", "Lane", "1",
+    ]
+    assert out.index.tolist() == list(range(8))
 
 
 def test_restore_final_column():
@@ -59,6 +69,188 @@ def test_get_extras_per_event():
     assert len(extras[("25m Breast", 0, 8, "girls")]) == 1
 
 
+def test_split_tables():
+    df = pd.DataFrame([
+        ["Seals Girls 9-10", np.nan, np.nan],
+        ["First name", "Surname", "25m Free"],
+        ["Jane", "Doe", "19.50"],
+        ["Ann", "Roe", np.nan],
+        [np.nan, np.nan, np.nan],
+        [np.nan, np.nan, np.nan],
+        ["Seals Boys 11 & Over", np.nan, np.nan],
+        ["First name", "Surname", "25m Free"],
+        ["John", "Smith", "DNS"],
+    ])
+    tables, events, swimmer_info = split_tables(df, [("First name", 0)])
+    assert events == []
+    assert [table.values.tolist() for table in tables] == [[["Jane", "Doe", "19.50"], ["Ann", "Roe", np.nan]], [["John", "Smith", "DNS"]]]
+    assert tables[0].columns.tolist() == ["First name", "Surname", "25m Free"]
+    assert swimmer_info == {("Jane", "Doe"): (9, 10, "girls"), ("Ann", "Roe"): (9, 10, "girls"), ("John", "Smith"): (11, 99, "boys")}
+
+    # Leah's tables start with their event row, under the header
+    df = pd.DataFrame([
+        ["Event 1 Girls 9-10 25 SC Meter Freestyle", np.nan],
+        ["Lane", "Name"],
+        ["1", "Doe, Jane"],
+        ["Event 2 Boys 9-10 25 SC Meter Freestyle", np.nan],
+        ["Lane", "Name"],
+    ])
+    tables, events, _ = split_tables(df, [("Lane", 0)], get_events=True)
+    assert events == ["Event 1 Girls 9-10 25 SC Meter Freestyle", "Event 2 Boys 9-10 25 SC Meter Freestyle"]
+    assert [table.iloc[:, 0].tolist() for table in tables] == [["Event 1 Girls 9-10 25 SC Meter Freestyle", "1"], ["Event 2 Boys 9-10 25 SC Meter Freestyle"]]
+
+
+def test_load_qualifiers_opens_workbook_once(tmp_path, monkeypatch):
+    path = tmp_path / "sammy.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        for number, group in enumerate(GROUPS):
+            pd.DataFrame([
+                [f"{group} Girls 9-10", None],
+                ["First name", "Surname"],
+                [f"Swimmer{number}", "Smith"],
+            ]).to_excel(writer, sheet_name=group, header=False, index=False)
+
+    opened = []
+    load_workbook = openpyxl.load_workbook
+    def counting_load_workbook(*args, **kwargs):
+        opened.append(args)
+        return load_workbook(*args, **kwargs)
+    monkeypatch.setattr(openpyxl, "load_workbook", counting_load_workbook)
+
+    qualifiers_table, swimmer_info = load_qualifiers(str(path))
+    assert len(opened) == 1
+    assert qualifiers_table["First name"].tolist() == [f"Swimmer{number}" for number in range(len(GROUPS))]
+    assert swimmer_info[("Swimmer0", "Smith")] == (9, 10, "girls")
+
+
+def test_get_extras_per_event_skips_dns_and_groups_finals():
+    qualifiers = pd.DataFrame([
+        {"First name": "jane", "Surname": "doe", "ASA": "A1", "DOB": "2002-02-02", "Group": "Dolphins", "25m Free": "19.50", "100m IM Final": "DNS"},
+        {"First name": "ann", "Surname": "roe", "ASA": "A2", "DOB": "2003-03-03", "Group": "Seals", "25m Free": np.nan, "100m IM Final": "1:30.00"},
+        {"First name": "john", "Surname": "poe", "ASA": "A3", "DOB": "2004-04-04", "Group": "Seals", "25m Free": "18.00", "100m IM Final": "1:25.00"},
+    ])
+    swimmer_info = {("jane", "doe"): (0, 8, "girls"), ("ann", "roe"): (9, 10, "girls"), ("john", "poe"): (9, 10, "boys")}
+    matched_events = {("john", "poe"): ["25m Free"]}
+
+    extras = get_extras_per_event(qualifiers, ["25m Free", "100m IM Final", "25m Free"], swimmer_info, matched_events)
+
+    # Empty and DNS times are not extras, and finals are for all ages
+    assert {key: rows["First name"].tolist() for key, rows in extras.items()} == {
+        ("25m Free", 0, 8, "girls"): ["jane"],
+        ("100m IM Final", 0, 99, "girls"): ["ann"],
+        ("100m IM Final", 0, 99, "boys"): ["john"],
+    }
+
+
+def test_get_event_context():
+    assert get_event_context("Event 21 Girls 8 & Under 25 SC Meter Freestyle") == (0, 8, "girls")
+    assert get_event_context("Event 3 Boys 15 & Over 50 SC Meter Butterfly") == (15, 99, "boys")
+    assert get_event_context("Event 7 Boys 9-10 25 SC Meter Backstroke") == (9, 10, "boys")
+    assert get_event_context("Event 40 Girls 200 SC Meter Freestyle") == (0, 99, "girls")
+
+
+def test_match_swimmers_by_asa():
+    qualifiers = pd.DataFrame([
+        {"First name": "Jane", "Surname": "Doe", "ASA": 123456.0, "25m Free": "19.50"},
+        {"First name": "John", "Surname": "Smith", "ASA": "654321", "25m Free": "21.00"},
+    ])
+    leah_tables = [
+        pd.DataFrame([
+            ["Event 21 Girls 8 & Under 25 SC Meter Freestyle", None, None, None, None, None],
+            ["1", "Dough, Janey", "Acton", "0123456", "2002-02-02", None],
+            ["2", "Smith, John", "Ealing", None, "2003-03-03", None],
+        ], columns=["Lane", "Name", "Team", "ASA", "DOB", "Time"]),
+    ]
+    messages = []
+    # Neither swimmer needs confirming: Jane by her ASA number, despite the misspelt name, and John by name
+    matched_events = match_swimmers(
+        qualifiers, leah_tables, ["25m Free"], "Time",
+        confirm_callback=lambda data: pytest.fail("manual match requested"),
+        progress_callback=lambda message, color=None: messages.append(message),
+    )
+
+    assert matched_events == {("Jane", "Doe"): ["25m Free"], ("John", "Smith"): ["25m Free"]}
+    assert leah_tables[0]["Time"].tolist()[1:] == ["19.50", "21.00"]
+    assert "Number of ASA matches: 1/2" in messages
+
+
+def test_match_swimmers_batch_review():
+    qualifiers = pd.DataFrame([
+        {"First name": "Samuel", "Surname": "Smith", "25m Free": "19.50", "25m Back": "22.00"},
+        {"First name": "Ann", "Surname": "Roe", "25m Free": "21.00", "25m Back": "23.00"},
+        {"First name": "Jane", "Surname": "Doe", "25m Free": "20.00", "25m Back": None},
+    ])
+    def leah_table(event_cell, names):
+        rows = [[event_cell, None, None, None, None, None]]
+        rows += [[str(lane), name, "Acton", None, None, None] for lane, name in enumerate(names, 1)]
+        return pd.DataFrame(rows, columns=["Lane", "Name", "Team", "Age", "DOB", "Time"])
+    leah_tables = [
+        leah_table("Event 1 Open 25 SC Meter Freestyle", ["Smith, Sam", "Doe, Jane", "Roh, Anne"]),
+        leah_table("Event 2 Open 25 SC Meter Backstroke", ["Smith, Sam"]),
+    ]
+
+    requests = []
+    def confirm(data):
+        requests.append(data)
+        return {"action": "accept", "decisions": [{"action": "accept", "sfirst_name": "Samuel", "ssurname": "Smith"}]}
+
+    matched_events = match_swimmers(
+        qualifiers, leah_tables, ["25m Free", "25m Back"], "Time", confirm, lambda *args: None, batch_review=True,
+    )
+
+    # One review for all of the unmatched swimmers, without the candidates matched exactly in the meantime
+    assert len(requests) == 1 and requests[0]["mode"] == "manual_match_batch"
+    swimmers = requests[0]["swimmers"]
+    assert [(swimmer["leah_name"], swimmer["events"]) for swimmer in swimmers] == [
+        ("Sam Smith", ["25m Free", "25m Back"]),
+        ("Anne Roh", ["25m Free"]),
+    ]
+    # Candidates too far from the name are only found by searching
+    assert [(c["sfirst_name"], c["ssurname"]) for c in swimmers[0]["candidates"]] == [("Samuel", "Smith")]
+    assert [(c["sfirst_name"], c["ssurname"]) for c in swimmers[0]["search_candidates"]("roe")] == [("Ann", "Roe")]
+
+    # Anne Roh had no decision, so she is ignored
+    assert matched_events == {("Samuel", "Smith"): ["25m Free", "25m Back"], ("Jane", "Doe"): ["25m Free"]}
+    assert leah_tables[0]["Time"].tolist()[1:3] == ["19.50", "20.00"]
+    assert leah_tables[1]["Time"].tolist()[1] == "22.00"
+
+
+def test_write_times():
+    leah_tables = [
+        pd.DataFrame({"Name": ["Doe, Jane", "Roe, Ann", "Smith, Sam"], "Time": [np.nan, np.nan, np.nan]}),
+        pd.DataFrame({"Name": ["Doe, John"], "Time": [np.nan]}),
+    ]
+    time_writes = {0: [(0, "19.50"), (2, "DNS")]}
+    write_times(leah_tables, time_writes, "Time")
+    assert leah_tables[0]["Time"].tolist()[::2] == ["19.50", "DNS"]
+    assert pd.isnull(leah_tables[0].at[1, "Time"])
+    # Tables without times are left as they are
+    assert leah_tables[1]["Time"].dtype == float
+    assert time_writes == {}
+
+
+def test_match_swimmers_assignment():
+    qualifiers = pd.DataFrame([
+        {"First name": "Samuel", "Surname": "Smith", "25m Free": "19.50"},
+        {"First name": "Samuel", "Surname": "Smyth", "25m Free": "21.00"},
+    ])
+    leah_tables = [pd.DataFrame([
+        ["Event 1 Open 25 SC Meter Freestyle", None, None, None, None, None],
+        ["1", "Smith, Samuell", "Acton", None, None, None],
+        ["2", "Smythe, Samuel", "Acton", None, None, None],
+    ], columns=["Lane", "Name", "Team", "Age", "DOB", "Time"])]
+
+    # Both swimmers are close enough to their assigned candidate to be matched without asking
+    matched_events = match_swimmers(
+        qualifiers, leah_tables, ["25m Free"], "Time",
+        confirm_callback=lambda data: pytest.fail("manual match requested"),
+        progress_callback=lambda *args: None,
+        assignment=True,
+    )
+    assert matched_events == {("Samuel", "Smith"): ["25m Free"], ("Samuel", "Smyth"): ["25m Free"]}
+    assert leah_tables[0]["Time"].tolist()[1:] == ["19.50", "21.00"]
+
+
 def test_add_extras_to_leah_tables_no_extras():
     # Verify add_extras_to_leah_tables processes tables without error
     leah_tables = [
@@ -89,7 +281,10 @@ def test_add_extras_to_leah_tables_with_extras():
     extras = {
         ("25m Free", 0, 8, "girls"): [swimmer_df.iloc[0]],
     }
+    # The extras can also be given as a DataFrame, like get_extras_per_event returns them
+    from_frame = add_extras_to_leah_tables([leah_tables[0].copy()], {("25m Free", 0, 8, "girls"): swimmer_df})
     result = add_extras_to_leah_tables(leah_tables, extras)
+    pd.testing.assert_frame_equal(from_frame[0], result[0])
     # Verify that Jane Doe was added to the appropriate event table
     added = False
     for row in result[0].itertuples(index=False):
@@ -1,6 +1,10 @@
+import itertools
+import random
+import numpy as np
 import pandas as pd
 import pytest
-from reusables.matching import get_close_matches, match_swimmer
+from reusables import matching
+from reusables.matching import get_close_matches, rank_close_matches, find_swimmer, match_swimmer, soundex, fits_event, normalise_membership_number, linear_sum_assignment, assign_matches, get_candidate_data, NameIndex, CANDIDATE_MIN_SCORE, CANDIDATE_PAGE_SIZE, BLOCKING_MIN_RESULTS
 
 
 def mock_df():
@@ -77,3 +81,260 @@ def test_match_swimmer_exit():
             progress_callback=mock_progress_callback,
             confirm_callback=lambda data: {"action": "exit"}
         )
+
+
+def test_name_index():
+    df = pd.concat([mock_df(), pd.DataFrame([{"First name": "Jane", "Surname": "Doe", "25m Free": "21.00"}])], ignore_index=True)
+    index = NameIndex(df)
+    assert index.get_swimmer("john", "smith")["25m Free"].tolist() == ["19.50"]
+    assert index.get_swimmer("nobody", "here").empty
+
+    # Both spellings of Jane Doe match exactly, in table order, skipping matched names
+    assert index.find_exact("jane", "doe", set()) == ("jane", "doe")
+    assert index.find_exact("jane", "doe", {("jane", "doe")}) == ("Jane", "Doe")
+    assert index.find_exact("jon", "smyth", set()) is None
+
+
+def test_name_index_members():
+    df = mock_df().assign(ASA=[123456.0, "0654321", None])
+    df = pd.concat([df, pd.DataFrame([{"First name": "Jane", "Surname": "Doe", "ASA": "123456"}])], ignore_index=True)
+    assert normalise_membership_number(" 0654321 ") == "654321"
+    assert normalise_membership_number(float("nan")) is None
+
+    index = NameIndex(df)
+    assert index.find_member(654321) == ("john", "smith")
+    # The number is given to two different names, so it is not used
+    assert index.find_member("123456") is None
+    assert index.find_member(None) is None
+
+
+def test_match_swimmer_exact_skips_fuzzy(monkeypatch):
+    df = mock_df()
+    automatic = {}
+    # Fuzzy scoring must not run when the exact lookup hits
+    monkeypatch.setattr(matching, "get_close_matches", lambda *args, **kwargs: pytest.fail("fuzzy scoring ran"))
+    swimmer = match_swimmer(
+        "john", "smith", df, automatic, {},
+        progress_callback=mock_progress_callback,
+        confirm_callback=lambda data: {"action": "ignore"},
+        name_index=NameIndex(df),
+    )
+    assert swimmer.index.tolist() == [1]
+    assert automatic[("john", "smith")] == ("john", "smith")
+
+
+
+def test_fits_event():
+    assert fits_event((9, 10, "girls"), (9, 10, "girls"))
+    assert fits_event((9, 10, "girls"), (0, 99, "girls"))
+    assert fits_event((0, 8, "boys"), (8, 9, "boys"))
+    assert not fits_event((9, 10, "girls"), (9, 10, "boys"))
+    assert not fits_event((11, 12, "girls"), (9, 10, "girls"))
+
+
+def test_match_swimmer_event_pool():
+    df = pd.DataFrame([
+        {"First name": "noah", "Surname": "wright", "25m Free": "20.10"},
+        {"First name": "ann", "Surname": "wright", "25m Free": "19.50"},
+        {"First name": "amelia", "Surname": "wright", "25m Free": "22.00"},
+    ])
+    swimmer_info = {
+        ("noah", "wright"): (9, 10, "boys"),
+        ("ann", "wright"): (9, 10, "girls"),
+    }
+    index = NameIndex(df, swimmer_info=swimmer_info)
+    # Amelia has no swimmer info, so she is in every pool
+    assert index.for_event((9, 10, "girls")).choices == ["ann wright", "amelia wright"]
+    assert index.for_event((9, 10, "girls")) is index.for_event((9, 10, "girls"))
+    assert index.for_event(None) is index
+    # No one fits the event, so everyone is a candidate
+    assert index.for_event((15, 99, "boys")).choices == ["amelia wright"]
+
+    # Only the swimmers who fit the event are offered
+    offered = []
+    def confirm(data):
+        offered.extend(candidate["sammy_name"] for candidate in data["candidates"])
+        return {"action": "ignore"}
+    match_swimmer(
+        "anne", "wright", df, {}, {}, mock_progress_callback, confirm,
+        name_index=index, event_context=(9, 10, "girls"),
+    )
+    assert offered == ["Ann Wright", "Amelia Wright"]
+
+    # An exact name outside of the event still matches
+    swimmer = match_swimmer(
+        "noah", "wright", df, {}, {}, mock_progress_callback, confirm,
+        name_index=index, event_context=(9, 10, "girls"),
+    )
+    assert swimmer.index.tolist() == [0]
+
+
+def test_get_close_matches_cutoff_and_limit():
+    df = mock_df()
+    scores = get_close_matches(df, "jon", "smyth", {}, {})
+    assert [score[:2] for score in scores] == [("john", "smith"), ("jane", "doe"), ("ann", "o'neil")]
+    assert get_close_matches(df, "jon", "smyth", {}, {}, limit=1) == scores[:1]
+    assert get_close_matches(df, "jon", "smyth", {}, {}, score_cutoff=scores[0][2]) == scores[:1]
+    # Matched names are skipped
+    assert get_close_matches(df, "jon", "smyth", {("a", "b"): ("john", "smith")}, {}) == scores[1:]
+
+
+def test_get_candidate_data(monkeypatch):
+    monkeypatch.setattr(matching, "CANDIDATE_PAGE_SIZE", 1)
+    monkeypatch.setattr(matching, "CANDIDATE_MIN_SCORE", 30)
+    df = mock_df()
+    index = NameIndex(df)
+    scores = get_close_matches(df, "jon", "smyth", {}, {}, name_index=index)
+    data = get_candidate_data("jon", "smyth", index)
+
+    # Only the candidates scoring at least CANDIDATE_MIN_SCORE are paged, a page at a time
+    assert [score[:2] for score in scores] == [("john", "smith"), ("jane", "doe"), ("ann", "o'neil")]
+    assert data["total_candidates"] == 2
+    assert [(c["sfirst_name"], c["ssurname"], c["similarity"]) for c in data["candidates"]] == scores[:1]
+    assert [(c["sfirst_name"], c["ssurname"], c["similarity"]) for c in data["more_candidates"](1)] == scores[1:2]
+    assert data["more_candidates"](2) == []
+
+    # Matched swimmers are neither counted nor paged, even if they were scored before being matched
+    data = get_candidate_data("jon", "smyth", index, matched={("john", "smith")}, scores=scores)
+    assert data["total_candidates"] == 1
+    assert [(c["sfirst_name"], c["ssurname"]) for c in data["candidates"]] == [("jane", "doe")]
+    assert data["more_candidates"](1) == []
+
+    # Searching finds any swimmer not matched yet, whatever their similarity
+    data = get_candidate_data("jon", "smyth", index, matched={("jane", "doe")})
+    assert [c["sammy_name"] for c in data["search_candidates"]("O'NEIL")] == ["Ann O'neil"]
+    assert data["search_candidates"]("doe") == []
+    assert data["search_candidates"]("  ") == data["candidates"]
+
+
+def test_get_close_matches_limit():
+    df = mock_df()
+    index = NameIndex(df)
+    scores = get_close_matches(df, "jon", "smyth", {}, {}, name_index=index)
+
+    # The best candidates come first however many are kept, and the cutoff drops the weak ones
+    for limit in range(len(scores) + 1):
+        assert get_close_matches(df, "jon", "smyth", {}, {}, limit=limit, name_index=index) == scores[:limit]
+    assert get_close_matches(df, "jon", "smyth", {}, {}, score_cutoff=scores[1][2], name_index=index) == scores[:2]
+
+
+# Leah's spelling -> Sammy's spelling of swimmers seen in past galas
+HISTORICAL_PAIRS = [
+    (("jon", "smyth"), ("john", "smith")),
+    (("sofia", "oneil"), ("sofia", "o'neil")),
+    (("isla", "vanderberg"), ("isla", "van der berg")),
+    (("amelia", "mcdonald"), ("amelia", "macdonald")),
+    (("noah", "smith-jones"), ("noah", "jones")),
+    (("olivia", "wilson"), ("olivia", "willson")),
+    (("sam", "davis"), ("samuel", "davies")),
+    (("oliver", "taylor"), ("olivier", "tayler")),
+]
+
+
+def large_df(size=2500):
+    rng = random.Random(0)
+    syllables = ["ab", "ber", "cha", "dal", "el", "fin", "gar", "han", "ish", "jo", "kel", "lan", "mor", "nov", "ol", "pat"]
+    # Made up surnames, some of them built on the surnames of the historical pairs
+    stems = ["smith", "jones", "o'neil", "van der", "macdon", "wil", "davi", "tay"] + [""] * 8
+    rows = [
+        {
+            "First name": rng.choice(["jane", "john", "sam", "ann", "leo"]),
+            "Surname": rng.choice(stems) + "".join(rng.choice(syllables) for _ in range(rng.randint(1, 3))),
+        }
+        for _ in range(size)
+    ]
+    rows += [{"First name": first, "Surname": surname} for _, (first, surname) in HISTORICAL_PAIRS]
+    return pd.DataFrame(rows)
+
+
+def test_soundex():
+    assert soundex("Robert") == soundex("Rupert") == "r163"
+    assert soundex("Ashcraft") == "a261"
+    assert soundex("Tymczak") == "t522"
+    assert soundex("Lee") == "l000"
+
+
+def test_blocking_recall():
+    df = large_df()
+    name_index = NameIndex(df)
+    assert name_index.blocking is not None
+    exhaustive_index = NameIndex(df)
+    exhaustive_index.blocking = None
+
+    # The candidates of find_swimmer: a page of those with at least CANDIDATE_MIN_SCORE similarity
+    options = dict(score_cutoff=CANDIDATE_MIN_SCORE, limit=CANDIDATE_PAGE_SIZE)
+    for (lfirst_name, lsurname), sammy_name in HISTORICAL_PAIRS:
+        blocked, blocked_total = rank_close_matches(name_index, lfirst_name, lsurname, (), blocked=True, **options)
+        exhaustive, exhaustive_total = rank_close_matches(exhaustive_index, lfirst_name, lsurname, (), **options)
+        # Recall: the swimmer is on the first page, and the best candidate is the same as in the exhaustive scan
+        assert sammy_name in [candidate[:2] for candidate in blocked]
+        assert blocked[0] == exhaustive[0]
+        # Only the blocked candidates are scored
+        assert blocked_total < exhaustive_total
+        # Unless asked to, every candidate is scored
+        assert get_close_matches(df, lfirst_name, lsurname, {}, {}, name_index=name_index, **options) == exhaustive
+
+
+def test_blocking_falls_back_to_every_candidate():
+    df = large_df()
+    name_index = NameIndex(df)
+    exhaustive = get_close_matches(df, "leo", "quartz", {}, {}, score_cutoff=CANDIDATE_MIN_SCORE, name_index=name_index)
+
+    # No surname looks like this one, so the block is too small and every candidate is scored
+    assert len(name_index.blocking.get_candidates("quartz")) < BLOCKING_MIN_RESULTS
+    blocked = get_close_matches(df, "leo", "quartz", {}, {}, score_cutoff=CANDIDATE_MIN_SCORE, name_index=name_index, blocked=True)
+    assert blocked == exhaustive
+
+
+def test_find_swimmer_scores_blocked_candidates(monkeypatch):
+    df = large_df()
+    name_index = NameIndex(df)
+    scored = []
+    score_choices = matching.score_choices
+    def mock_score_choices(query, choices, lengths):
+        scored.append(len(choices))
+        return score_choices(query, choices, lengths)
+    monkeypatch.setattr(matching, "score_choices", mock_score_choices)
+
+    swimmer, scores = find_swimmer("jon", "smyth", df, {}, {}, mock_progress_callback, name_index=name_index)
+    assert swimmer is None
+    assert scores[0][:2] == ("john", "smith")
+    assert scored == [len(name_index.blocking.get_candidates("smyth"))]
+    assert scored[0] < len(df)
+
+
+def test_linear_sum_assignment():
+    # Greedy would give row 0 its best column (95) and leave row 1 with 60
+    rows, cols = linear_sum_assignment(-np.array([[95, 93], [94, 60]]))
+    assert rows.tolist() == [0, 1] and cols.tolist() == [1, 0]
+
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        cost = rng.integers(0, 20, size=(rng.integers(1, 6), rng.integers(1, 6)))
+        rows, cols = linear_sum_assignment(cost)
+        size = min(cost.shape)
+        square = cost if cost.shape[0] <= cost.shape[1] else cost.T
+        best = min(
+            sum(square[row, col] for row, col in enumerate(permutation))
+            for permutation in itertools.permutations(range(max(cost.shape)), size)
+        )
+        assert len(set(rows.tolist())) == len(set(cols.tolist())) == size
+        assert cost[rows, cols].sum() == best
+
+
+def test_assign_matches():
+    df = pd.DataFrame([
+        {"First name": "noah", "Surname": "wright"},
+        {"First name": "ann", "Surname": "wright"},
+        {"First name": "jane", "Surname": "doe"},
+    ])
+    swimmer_info = {("noah", "wright"): (9, 10, "boys"), ("ann", "wright"): (9, 10, "girls")}
+    index = NameIndex(df, swimmer_info=swimmer_info)
+
+    # Jane Doe is already matched, and each swimmer gets a different candidate
+    assigned = assign_matches([("anne", "wright"), ("noa", "wright")], index, {("x", "y"): ("jane", "doe")}, {})
+    assert assigned == {("anne", "wright"): ("ann", "wright", 95), ("noa", "wright"): ("noah", "wright", 95)}
+
+    # A boy is not assigned a girl, however close the names are
+    assigned = assign_matches([("ann", "wright")], index, {}, {}, [(9, 10, "boys")])
+    assert assigned[("ann", "wright")][:2] == ("noah", "wright")
@@ -0,0 +1,23 @@
+import pandas as pd
+from reusables.names import NAME_KEY_COLUMN, add_name_keys, get_key_rows, normalise_name
+from reusables.matching import NameIndex
+
+
+def test_normalise_name():
+    assert normalise_name("Zoë  O'Neil -") == "zoe o'neil"
+    assert normalise_name("  JOHN Smith ") == "john smith"
+    assert normalise_name("Renée Müller") == normalise_name("renee muller")
+
+
+def test_add_name_keys_and_get_key_rows():
+    table = pd.DataFrame({"Name": ["Zoë O'Neil", "John Smith -", "zoe o'neil"]}, index=[3, 5, 8])
+    add_name_keys(table)
+    assert isinstance(table[NAME_KEY_COLUMN].dtype, pd.CategoricalDtype)
+    assert list(table[NAME_KEY_COLUMN]) == ["zoe o'neil", "john smith", "zoe o'neil"]
+    assert get_key_rows(table) == {"zoe o'neil": [3, 8], "john smith": [5]}
+
+
+def test_name_index_accents_match_exactly():
+    df = pd.DataFrame([{"First name": "Zoë", "Surname": "Müller"}, {"First name": "Ann", "Surname": "Smith"}])
+    index = NameIndex(df)
+    assert index.find_exact("zoe", "muller", set()) == ("Zoë", "Müller")
@@ -1,5 +1,7 @@
 import pytest
-from reusables.parsing import get_event_name, parse_name, parse_swimmer, is_time, extract_keyword, REGEX_EVENT_NAME
+from concurrent.futures import ThreadPoolExecutor
+from reusables import parsing
+from reusables.parsing import get_event_name, parse_name, parse_swimmer, is_time, extract_keyword, iter_event_tables, scan_swimmer_line, get_section_type, get_event_number, parse_event_selection, PdfEventIndex, filter_page_lines, SECTION_FINAL, SECTION_PRELIM, REGEX_EVENT_NAME
 
 
 def test_get_event_name():
@@ -66,3 +68,170 @@ def test_parse_swimmer_invalid_club_name():
 def test_parse_swimmer_invalid():
     with pytest.raises(ValueError):
         parse_swimmer("Acton 107 Last, First foo bar")
+
+
+RESULT_LINES = [
+    "Event  1   Girls 8 & Under 25 SC Meter Freestyle",
+    "Name Age Team Seed Time Finals Time",
+    "Acton 107 Doe, Jane 20.10  21.00",
+    "Northolt 108 Roe, Ann 22.00  22.50",
+    "Event  2   Boys 8 & Under 25 SC Meter Freestyle",
+    "Name Age Team Seed Time Finals Time",
+    "Ealing 109 Smith, John 19.50  NT",
+]
+
+
+def test_iter_event_tables():
+    tables = list(iter_event_tables(RESULT_LINES, isQualifiers=True))
+    assert len(tables) == 2
+    assert tables[0].to_dict("records") == [{"Name": "Doe, Jane", "Seed Time": "21.00", "Time": "20.10"}]
+    assert tables[1].to_dict("records") == [{"Name": "Smith, John", "Seed Time": "NT", "Time": "19.50"}]
+
+
+def test_iter_event_tables_is_lazy():
+    def lines():
+        yield from RESULT_LINES[:4]
+        # The first event must be yielded before anything past the next header is read
+        yield RESULT_LINES[4]
+        raise AssertionError("Read past the first event")
+
+    tables = iter_event_tables(lines(), isQualifiers=False)
+    first = next(tables)
+    assert list(first.columns) == ["Name", "Qualifiers Time", "Finals Time"]
+
+
+def test_scan_swimmer_line():
+    assert scan_swimmer_line("Acton 107 LastNames, FirstName M 56.30  52.10") == ("LastNames, FirstName M", "52.10", "56.30")
+    assert scan_swimmer_line("Ealing 12 Van Der Berg, Ann 1:02.45 q NT") == ("Van Der Berg, Ann", "NT", "1:02.45")
+    assert scan_swimmer_line("Acton Team Scores") is None
+    assert scan_swimmer_line("Northolt 108 Roe, Ann 22.00  22.50") is None
+    with pytest.raises(ValueError):
+        scan_swimmer_line("Acton 107 Last First 59.99")
+
+
+FULL_RESULT_LINES = [
+    "Event  1   Girls 8 & Under 25 SC Meter Freestyle",
+    "Name Age Team Prelim Time Finals Time",
+    "A - Final",
+    "Acton 107 Doe, Jane 20.10  21.00",
+    "Event  1   Girls 8 & Under 25 SC Meter Freestyle",
+    "Name Age Team Seed Time Prelim Time",
+    "Preliminaries",
+    "Acton 107 Doe, Jane 21.00  22.00",
+    # Would raise if the prelim section was parsed
+    "Acton 108 Malformed Line 22.00",
+]
+
+
+def test_iter_event_tables_skips_prelims():
+    tables = list(iter_event_tables(FULL_RESULT_LINES, isQualifiers=False, sections={SECTION_FINAL}))
+    assert len(tables) == 1
+    assert tables[0].attrs["section"] == SECTION_FINAL
+    assert tables[0].to_dict("records") == [{"Name": "Doe, Jane", "Qualifiers Time": "21.00", "Finals Time": "20.10"}]
+
+
+def test_get_section_type():
+    assert get_section_type(["Name Age Team Prelim Time Finals Time"], repeated=False) == SECTION_FINAL
+    assert get_section_type(["Name Age Team Seed Time Finals Time"], repeated=False) == SECTION_FINAL
+    assert get_section_type(["Name Age Team Seed Time Prelim Time", "Preliminaries"], repeated=False) == SECTION_PRELIM
+    assert get_section_type(["Name Age Team Seed Time Finals Time"], repeated=True) == SECTION_PRELIM
+
+
+def test_get_event_number():
+    assert get_event_number("Event  21   Girls 8 & Under 25 SC Meter Breaststroke") == 21
+    assert get_event_number("Event 1 25m back 2016 & under girls (8 & under)") == 1
+    with pytest.raises(ValueError):
+        get_event_number("Girls 8 & Under")
+
+
+def test_pdf_event_index():
+    lines = RESULT_LINES + [
+        "Event  2   Boys 8 & Under 25 SC Meter Freestyle",
+        "Name Age Team Seed Time Finals Time",
+        "Acton 110 Brown, Leo 18.00  NT",
+    ]
+    index = PdfEventIndex(iter_event_tables(lines, isQualifiers=True))
+
+    assert index.get(1)["Name"].tolist() == ["Doe, Jane"]
+    # Event 2 was split over two sections, which are joined
+    assert index.get(2)["Name"].tolist() == ["Smith, John", "Brown, Leo"]
+    assert index.get(3) is None
+    assert sorted(index.read_all()) == [1, 2]
+
+
+def test_iter_event_tables_skips_unwanted_events():
+    tables = list(iter_event_tables(RESULT_LINES, isQualifiers=True, events={2}))
+    assert len(tables) == 1
+    assert tables[0].attrs["event_number"] == 2
+
+
+def test_parse_event_selection():
+    assert parse_event_selection("") is None
+    assert parse_event_selection("12-15, 20") == {12, 13, 14, 15, 20}
+    assert parse_event_selection("3") == {3}
+    with pytest.raises(ValueError):
+        parse_event_selection("12 to 15")
+
+
+def test_scan_swimmer_line_clubs():
+    line = "Northolt 108 Roe, Ann 22.00  22.50"
+    assert scan_swimmer_line(line, clubs=("Northolt",)) == ("Roe, Ann", "22.50", "22.00")
+    assert scan_swimmer_line("Acton 107 Doe, Jane 20.10  21.00", clubs=("Northolt",)) is None
+
+
+def test_filter_page_lines():
+    pages = [
+        "\n".join(RESULT_LINES[:3] + ["Northolt 108 Roe, Ann 22.00  22.50", "Page 1 of 2"]),
+        # The event header at the end of the page owes its two following lines to the next page
+        "Event  2   Boys 8 & Under 25 SC Meter Freestyle",
+        "Name Age Team Seed Time Finals Time\nPreliminaries\nTeam Scores\nEaling 109 Green, Tom 19.00  18.50",
+    ]
+    lines = [line for page_lines in filter_page_lines(pages) for line in page_lines]
+    assert lines == RESULT_LINES[:3] + [
+        "Event  2   Boys 8 & Under 25 SC Meter Freestyle",
+        "Name Age Team Seed Time Finals Time",
+        "Preliminaries",
+        "Ealing 109 Green, Tom 19.00  18.50",
+    ]
+
+    # Filtering does not change the parsed tables
+    all_lines = "\n".join(pages).split("\n")
+    filtered = [table.to_dict("records") for table in iter_event_tables(lines, isQualifiers=True)]
+    unfiltered = [table.to_dict("records") for table in iter_event_tables(all_lines, isQualifiers=True)]
+    assert filtered == unfiltered
+
+
+class FakePage:
+    def __init__(self, number):
+        self.number = number
+
+    def extract_text(self):
+        return f"page {self.number}"
+
+
+class FakeReader:
+    def __init__(self, pdf_path):
+        self.pages = [FakePage(i) for i in range(100)]
+
+
+def test_iter_page_texts_bounds_chunks_in_flight(monkeypatch):
+    submitted = []
+
+    class RecordingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, *args):
+            submitted.append(args[1])
+            return super().submit(fn, *args)
+
+    monkeypatch.setattr(parsing, "PdfReader", FakeReader)
+    monkeypatch.setattr(parsing, "ProcessPoolExecutor", RecordingExecutor)
+
+    # Pages come back in order, as with a sequential read
+    assert list(parsing.iter_page_texts("results.pdf", workers=2)) == [f"page {i}" for i in range(100)]
+    assert len(submitted) > 2 * parsing.CHUNKS_IN_FLIGHT_PER_WORKER
+
+    # A consumer that stops early only gets a few chunks extracted ahead of it
+    submitted.clear()
+    texts = parsing.iter_page_texts("results.pdf", workers=2)
+    assert next(texts) == "page 0"
+    assert len(submitted) == 2 * parsing.CHUNKS_IN_FLIGHT_PER_WORKER
+    texts.close()
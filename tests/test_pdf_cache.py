@@ -0,0 +1,103 @@
+import os
+import pandas as pd
+from reusables.pdf_cache import PdfTableCache, file_sha256
+from reusables import parsing
+from reusables.parsing import read_pdf, get_clubs_key, PARSER_VERSION, CLUBS
+
+
+def mock_tables():
+    return [
+        pd.DataFrame([{"Name": "Doe, Jane", "Seed Time": "21.00", "Time": "20.10"}]),
+        pd.DataFrame([{"Name": "Smith, John", "Seed Time": "NT", "Time": "19.50"}]),
+    ]
+
+
+def test_put_and_get(tmp_path):
+    cache = PdfTableCache(str(tmp_path))
+    assert cache.get("missing") is None
+
+    cache.put("key", mock_tables())
+    tables = cache.get("key")
+    assert len(tables) == 2
+    assert tables[0].equals(mock_tables()[0])
+
+
+def test_bad_entry_is_dropped(tmp_path):
+    cache = PdfTableCache(str(tmp_path))
+    cache.put("key", mock_tables())
+    path = os.path.join(str(tmp_path), "key.pkl")
+    # A pickle that fails to load with something other than an UnpicklingError
+    with open(path, "wb") as f:
+        f.write(b"\x80\x05csome_missing_module\nThing\n.")
+
+    assert cache.get("key") is None
+    assert not os.path.exists(path)
+
+
+def test_key_depends_on_content_and_variant(tmp_path):
+    pdf = tmp_path / "results.pdf"
+    pdf.write_bytes(b"first")
+    cache = PdfTableCache(str(tmp_path / "cache"))
+    key = cache.key(str(pdf), "v1", "heats")
+
+    assert key.startswith(file_sha256(str(pdf)))
+    assert key != cache.key(str(pdf), "v1", "finals")
+    assert key != cache.key(str(pdf), "v2", "heats")
+
+    pdf.write_bytes(b"second")
+    assert key != cache.key(str(pdf), "v1", "heats")
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = PdfTableCache(str(tmp_path), max_bytes=10 ** 9)
+    for key in ["a", "b", "c"]:
+        cache.put(key, mock_tables())
+    # Make "a" the oldest entry but then use it, so "b" becomes the least recently used
+    for age, key in enumerate(["c", "b", "a"]):
+        path = os.path.join(str(tmp_path), key + ".pkl")
+        os.utime(path, (1000 - age, 1000 - age))
+    cache.get("a")
+
+    entry_size = os.path.getsize(os.path.join(str(tmp_path), "a.pkl"))
+    cache.max_bytes = 2 * entry_size
+    cache.evict()
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_read_pdf_uses_cache(tmp_path):
+    # Not a real PDF, so this only works if the tables come from the cache
+    pdf = tmp_path / "results.pdf"
+    pdf.write_bytes(b"not a pdf")
+    cache = PdfTableCache(str(tmp_path / "cache"))
+    cache.put(cache.key(str(pdf), f"v{PARSER_VERSION}", "heats", get_clubs_key(CLUBS)), mock_tables())
+
+    tables = read_pdf(str(pdf), isQualifiers=True, cache=cache)
+    assert len(tables) == 2
+    assert tables[1].iloc[0]["Name"] == "Smith, John"
+
+
+def test_read_pdf_caches_every_event(tmp_path, monkeypatch):
+    pdf = tmp_path / "results.pdf"
+    pdf.write_bytes(b"not a pdf")
+    cache = PdfTableCache(str(tmp_path / "cache"))
+
+    parsed = []
+    def mock_iter_event_tables(lines, isQualifiers, sections, events, clubs):
+        parsed.append(events)
+        for event_number, table in enumerate(mock_tables(), start=1):
+            table.attrs["event_number"] = event_number
+            yield table
+    monkeypatch.setattr(parsing, "iter_pdf_lines", lambda pdf_path, workers, clubs: iter([]))
+    monkeypatch.setattr(parsing, "iter_event_tables", mock_iter_event_tables)
+
+    # Only the selected event is returned, but every event is parsed and cached
+    tables = read_pdf(str(pdf), isQualifiers=True, cache=cache, events={2})
+    assert [table.attrs["event_number"] for table in tables] == [2]
+    assert parsed == [None]
+
+    tables = read_pdf(str(pdf), isQualifiers=True, cache=cache, events={1})
+    assert [table.attrs["event_number"] for table in tables] == [1]
+    assert len(parsed) == 1
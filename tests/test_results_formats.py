@@ -0,0 +1,134 @@
+import zipfile
+from reusables.results_formats import read_results, format_lenex_time, SECTION_FINAL, SECTION_PRELIM
+
+
+LENEX = """<?xml version="1.0" encoding="UTF-8"?>
+<LENEX version="3.0">
+  <MEETS>
+    <MEET name="Club Champs">
+      <SESSIONS>
+        <SESSION number="1">
+          <EVENTS>
+            <EVENT eventid="10" number="1" round="PRE"><SWIMSTYLE distance="50" stroke="FREE"/></EVENT>
+            <EVENT eventid="11" number="1" round="FIN" preveventid="10"><SWIMSTYLE distance="50" stroke="FREE"/></EVENT>
+            <EVENT eventid="20" number="2" round="TIM"><SWIMSTYLE distance="25" stroke="BACK"/></EVENT>
+          </EVENTS>
+        </SESSION>
+      </SESSIONS>
+      <CLUBS>
+        <CLUB name="Ealing Swimming Club" shortname="Ealing">
+          <ATHLETES>
+            <ATHLETE athleteid="1" firstname="Jane" lastname="Doe">
+              <ENTRIES><ENTRY eventid="10" entrytime="00:00:35.00"/></ENTRIES>
+              <RESULTS>
+                <RESULT eventid="10" swimtime="00:00:34.50"/>
+                <RESULT eventid="11" swimtime="00:00:34.10"/>
+                <RESULT eventid="20" swimtime="00:01:02.34" entrytime="NT"/>
+              </RESULTS>
+            </ATHLETE>
+            <ATHLETE athleteid="2" firstname="Sam" lastname="Berg" nameprefix="van">
+              <RESULTS><RESULT eventid="20" status="DSQ" swimtime="00:00:20.00" entrytime="00:00:21.00"/></RESULTS>
+            </ATHLETE>
+          </ATHLETES>
+        </CLUB>
+        <CLUB name="Northolt">
+          <ATHLETES>
+            <ATHLETE athleteid="3" firstname="Ann" lastname="Roe">
+              <RESULTS><RESULT eventid="20" swimtime="00:00:19.00"/></RESULTS>
+            </ATHLETE>
+          </ATHLETES>
+        </CLUB>
+      </CLUBS>
+    </MEET>
+  </MEETS>
+</LENEX>
+"""
+
+
+def sdif_record(code, fields):
+    '''
+    Build a 160 column SDIF record from {start column: value}.
+    '''
+    record = [" "] * 160
+    record[0:2] = code
+    for start, value in fields.items():
+        record[start - 1:start - 1 + len(value)] = value
+    return "".join(record)
+
+
+SDIF = "\n".join([
+    sdif_record("C1", {18: "Acton Swimming Club"}),
+    sdif_record("D0", {12: "Doe, Jane", 73: "   1", 89: "   35.00", 98: "   34.50", 116: "   34.10"}),
+    sdif_record("D0", {12: "Smith, John", 73: "   2", 89: "      NT", 116: " 1:02.34"}),
+    sdif_record("C1", {18: "Northolt"}),
+    sdif_record("D0", {12: "Roe, Ann", 73: "   2", 89: "   21.00", 116: "   19.00"}),
+]) + "\n"
+
+
+def test_format_lenex_time():
+    assert format_lenex_time("00:01:02.34") == "1:02.34"
+    assert format_lenex_time("00:00:09.87") == "9.87"
+    assert format_lenex_time("00:00:34.50") == "34.50"
+    assert format_lenex_time("NT") == "NT"
+
+
+def test_read_lenex_heats(tmp_path):
+    path = tmp_path / "results.lef"
+    path.write_text(LENEX)
+
+    tables = read_results(str(path), isQualifiers=True)
+    assert [(table.attrs["event_number"], table.attrs["section"]) for table in tables] == [(1, SECTION_PRELIM), (2, SECTION_FINAL)]
+    assert tables[0].to_dict("records") == [{"Name": "Doe, Jane", "Seed Time": "35.00", "Time": "34.50"}]
+    assert tables[1].to_dict("records") == [
+        {"Name": "Doe, Jane", "Seed Time": "NT", "Time": "1:02.34"},
+        {"Name": "van Berg, Sam", "Seed Time": "21.00", "Time": "DQ"},
+    ]
+
+
+def test_read_lenex_finals_zipped(tmp_path):
+    path = tmp_path / "results.lxf"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("results.lef", LENEX)
+
+    tables = read_results(str(path), isQualifiers=False, events={1})
+    assert len(tables) == 1
+    assert tables[0].to_dict("records") == [{"Name": "Doe, Jane", "Qualifiers Time": "34.50", "Finals Time": "34.10"}]
+
+
+def test_read_lenex_all_rounds(tmp_path):
+    path = tmp_path / "results.lef"
+    path.write_text(LENEX)
+
+    tables = read_results(str(path), isQualifiers=True, all_rounds=True)
+    assert [(table.attrs["event_number"], table.attrs["section"]) for table in tables] == [
+        (1, SECTION_PRELIM), (1, SECTION_FINAL), (2, SECTION_FINAL),
+    ]
+    assert tables[0].to_dict("records") == [{"Name": "Doe, Jane", "Seed Time": "35.00", "Time": "34.50"}]
+    # The previous time of a final is the prelim swim
+    assert tables[1].to_dict("records") == [{"Name": "Doe, Jane", "Seed Time": "34.50", "Time": "34.10"}]
+
+
+def test_read_sdif(tmp_path):
+    path = tmp_path / "results.cl2"
+    path.write_text(SDIF)
+
+    heats = read_results(str(path), isQualifiers=True)
+    assert [table.attrs["event_number"] for table in heats] == [1, 2]
+    assert heats[0].to_dict("records") == [{"Name": "Doe, Jane", "Seed Time": "35.00", "Time": "34.50"}]
+    assert heats[1].to_dict("records") == [{"Name": "Smith, John", "Seed Time": "NT", "Time": "1:02.34"}]
+
+    finals = read_results(str(path), isQualifiers=False, clubs=("Northolt",))
+    assert finals[0].to_dict("records") == [{"Name": "Roe, Ann", "Qualifiers Time": "21.00", "Finals Time": "19.00"}]
+
+
+def test_read_sdif_all_rounds(tmp_path):
+    path = tmp_path / "results.cl2"
+    path.write_text(SDIF)
+
+    tables = read_results(str(path), isQualifiers=True, all_rounds=True)
+    assert [(table.attrs["event_number"], table.attrs["section"]) for table in tables] == [
+        (1, SECTION_PRELIM), (1, SECTION_FINAL), (2, SECTION_FINAL),
+    ]
+    assert tables[0].to_dict("records") == [{"Name": "Doe, Jane", "Seed Time": "35.00", "Time": "34.50"}]
+    assert tables[1].to_dict("records") == [{"Name": "Doe, Jane", "Seed Time": "34.50", "Time": "34.10"}]
+    assert tables[2].to_dict("records") == [{"Name": "Smith, John", "Seed Time": "NT", "Time": "1:02.34"}]
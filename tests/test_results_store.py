@@ -0,0 +1,112 @@
+import pandas as pd
+from reusables.results_store import ResultsStore
+import ingest_results.main as ingest_main
+from ingest_results import ingest_results
+
+
+def mock_tables():
+    heats = pd.DataFrame([{"Name": "Doe, Jane", "Seed Time": "21.00", "Time": "20.10"}])
+    heats.attrs.update(section="final", event_number=1)
+    finals = pd.DataFrame([{"Name": "Smith, John", "Qualifiers Time": "19.00", "Finals Time": "18.50"}])
+    finals.attrs.update(section="final", event_number=2)
+    return [heats, finals]
+
+
+def test_add_and_get_results(tmp_path):
+    with ResultsStore(str(tmp_path / "results.db")) as store:
+        assert not store.has_file("abc")
+        assert store.add_tables("abc", "Gala 1", "gala1.pdf", mock_tables()) == 2
+        assert store.has_file("abc")
+        assert store.get_meets() == ["Gala 1"]
+
+        results = store.get_results(meet="Gala 1", event_number=2)
+        assert results.to_dict("records") == [{
+            "meet": "Gala 1", "event_number": 2, "section": "final",
+            "name": "Smith, John", "seed_time": "19.00", "time": "18.50",
+        }]
+
+
+def test_ingest_results_skips_ingested_files(tmp_path, monkeypatch):
+    folder = tmp_path / "pdfs"
+    folder.mkdir()
+    (folder / "gala1.pdf").write_bytes(b"gala 1")
+    (folder / "gala2.pdf").write_bytes(b"gala 2")
+    # Same content as gala1.pdf under another name
+    (folder / "gala1_copy.pdf").write_bytes(b"gala 1")
+
+    read = []
+    def read_results_file(pdf_path, clubs):
+        read.append(pdf_path)
+        return mock_tables()
+    monkeypatch.setattr(ingest_main, "read_results_file", read_results_file)
+
+    store_path = str(tmp_path / "results.db")
+    errors = []
+    ingest_results(str(folder), store_path, lambda *args: None, lambda *args: errors.append(args), workers=1)
+    assert len(read) == 2
+    assert errors == []
+
+    ingest_results(str(folder), store_path, lambda *args: None, lambda *args: errors.append(args), workers=1)
+    assert len(read) == 2
+
+    with ResultsStore(store_path) as store:
+        assert sorted(store.get_meets()) == ["gala1", "gala2"]
+        assert len(store.get_results()) == 4
+
+
+LENEX = """<?xml version="1.0" encoding="UTF-8"?>
+<LENEX version="3.0">
+  <MEETS>
+    <MEET name="Club Champs">
+      <SESSIONS>
+        <SESSION number="1">
+          <EVENTS>
+            <EVENT eventid="10" number="1" round="PRE"><SWIMSTYLE distance="50" stroke="FREE"/></EVENT>
+            <EVENT eventid="11" number="1" round="FIN" preveventid="10"><SWIMSTYLE distance="50" stroke="FREE"/></EVENT>
+          </EVENTS>
+        </SESSION>
+      </SESSIONS>
+      <CLUBS>
+        <CLUB name="Ealing Swimming Club">
+          <ATHLETES>
+            <ATHLETE athleteid="1" firstname="Jane" lastname="Doe">
+              <ENTRIES><ENTRY eventid="10" entrytime="00:00:35.00"/></ENTRIES>
+              <RESULTS>
+                <RESULT eventid="10" swimtime="00:00:34.50"/>
+                <RESULT eventid="11" swimtime="00:00:34.10"/>
+              </RESULTS>
+            </ATHLETE>
+          </ATHLETES>
+        </CLUB>
+      </CLUBS>
+    </MEET>
+  </MEETS>
+</LENEX>
+"""
+
+
+def test_ingest_results_keeps_lenex_finals(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    folder = tmp_path / "results"
+    folder.mkdir()
+    (folder / "champs.lef").write_text(LENEX)
+
+    store_path = str(tmp_path / "results.db")
+    errors = []
+    ingest_results(str(folder), store_path, lambda *args: None, lambda *args: errors.append(args), workers=1)
+    assert errors == []
+
+    with ResultsStore(store_path) as store:
+        assert store.get_results(meet="champs").to_dict("records") == [
+            {"meet": "champs", "event_number": 1, "section": "prelim", "name": "Doe, Jane", "seed_time": "35.00", "time": "34.50"},
+            {"meet": "champs", "event_number": 1, "section": "final", "name": "Doe, Jane", "seed_time": "34.50", "time": "34.10"},
+        ]
+
+
+def test_read_results_file_skips_the_pdf_cache(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ingest_main, "read_results", lambda *args, **kwargs: calls.append(kwargs) or [])
+
+    assert ingest_main.read_results_file("gala1.pdf") == []
+    assert calls[0]["cache"] is None
+    assert calls[0]["all_rounds"]